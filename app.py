@@ -1,12 +1,28 @@
-from flask import Flask, request, jsonify, render_template, send_from_directory
+import time
+import threading
+# Measured from here: the startup report splits worker start-up into imports and component setup
+_startup_began = time.perf_counter()
+
+from flask import Flask, Response, request, jsonify, render_template, send_from_directory, stream_with_context, url_for
 from flask_cors import CORS
 import os
 import json
 import uuid
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from werkzeug.utils import secure_filename
 from text_processor import TextProcessor
 from mcq_generator import MCQGenerator
 from file_handler import FileHandler
+from question_cache import QuestionCache
+from question_bank import QuestionBank
+from job_queue import JobQueue
+from llm_backend import backend_stats, warm_up_backend
+from metrics import parse_strategies
+from question_strategies import strategies
+from session_store import SessionSweeper, create_session_store
+
+_imports_done = time.perf_counter()
 
 app = Flask(__name__)
 CORS(app)
@@ -21,8 +37,65 @@ os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 
 # Initialize components
 text_processor = TextProcessor()
-mcq_generator = MCQGenerator()
+question_cache = QuestionCache()
+question_bank = QuestionBank(text_processor=text_processor)
+mcq_generator = MCQGenerator(question_cache=question_cache, question_bank=question_bank)
 file_handler = FileHandler()
+job_queue = JobQueue()
+session_store = create_session_store()
+session_sweeper = SessionSweeper(session_store, file_handler)
+# Under gunicorn.conf.py the app may be loaded in the master before workers
+# fork; threads don't survive a fork, so each worker starts its sweeper in after_fork()
+if os.getenv('PREFORK_SERVER') != '1':
+    session_sweeper.start()
+
+def after_fork():
+    """
+    Per-worker setup under a preforking server (gunicorn.conf.py calls it in
+    every worker): fresh SQLite connections and the session sweeper thread
+    """
+    question_cache.after_fork()
+    question_bank.after_fork()
+    job_queue.after_fork()
+    session_store.after_fork()
+    session_sweeper.start()
+
+# Time this worker took to become ready; the slow optional pieces (PDF/DOCX
+# engines, the Gemini SDK) load on first use or in warm_up()
+startup_report = {
+    'imports_ms': round((_imports_done - _startup_began) * 1000, 1),
+    'components_ms': round((time.perf_counter() - _imports_done) * 1000, 1),
+    'warm_up': None
+}
+print(f"🚀 App ready in {startup_report['imports_ms'] + startup_report['components_ms']:.0f} ms "
+      f"(imports {startup_report['imports_ms']:.0f} ms, components {startup_report['components_ms']:.0f} ms)")
+
+def warm_up():
+    """
+    Load what the first requests would otherwise wait for: the document
+    engines and the model client. Selected by WARM_UP ("background" runs it
+    in a thread, "blocking" before serving); a server hook can also call it.
+    """
+    timings = {}
+    started = time.perf_counter()
+    file_handler.warm_up()
+    timings['document_engines_ms'] = round((time.perf_counter() - started) * 1000, 1)
+    started = time.perf_counter()
+    try:
+        warm_up_backend(mcq_generator.gemini_generator.backend)
+    except Exception as e:
+        print(f"⚠️ Model client warm-up failed: {str(e)}")
+    timings['model_client_ms'] = round((time.perf_counter() - started) * 1000, 1)
+    startup_report['warm_up'] = timings
+    print(f"🔥 Warm-up done: document engines {timings['document_engines_ms']:.0f} ms, "
+          f"model client {timings['model_client_ms']:.0f} ms")
+    return timings
+
+_warm_up_mode = os.getenv('WARM_UP', 'off').lower()
+if _warm_up_mode == 'blocking':
+    warm_up()
+elif _warm_up_mode == 'background':
+    threading.Thread(target=warm_up, name='warm-up', daemon=True).start()
 
 @app.route('/')
 def index():
@@ -41,38 +114,52 @@ def upload_file():
             return jsonify({'error': 'No file selected'}), 400
         
         if file:
-            # Generate unique filename
             filename = secure_filename(file.filename)
-            unique_filename = f"{uuid.uuid4()}_{filename}"
-            filepath = os.path.join(app.config['UPLOAD_FOLDER'], unique_filename)
-            
-            # Save file
-            file.save(filepath)
-            
-            # Extract text from file
-            extracted_text = file_handler.extract_text(filepath)
             
-            if not extracted_text:
-                return jsonify({'error': 'Could not extract text from file'}), 400
+            # Sessions are keyed by the file's content digest, so re-uploads of the
+            # same document reuse the already-extracted text
+            session_id = _file_digest(file.stream)
+            session_data = session_store.get(session_id)
             
-            # Process and clean text
-            processed_text = text_processor.process_text(extracted_text)
-            
-            # Store processed text temporarily (in production, use a database)
-            session_id = str(uuid.uuid4())
-            session_data = {
-                'text': processed_text,
-                'filename': filename,
-                'filepath': filepath
-            }
-            
-            # Save session data (in production, use Redis or database)
-            with open(f'session_{session_id}.json', 'w') as f:
-                json.dump(session_data, f)
+            if session_data is None:
+                # Generate unique filename
+                unique_filename = f"{uuid.uuid4()}_{filename}"
+                filepath = os.path.join(app.config['UPLOAD_FOLDER'], unique_filename)
+                
+                # Save file
+                file.save(filepath)
+                
+                # Extract text from file
+                extracted_text = file_handler.extract_text(filepath)
+                
+                if not extracted_text:
+                    file_handler.cleanup_file(filepath)
+                    return jsonify({'error': 'Could not extract text from file'}), 400
+                
+                # Process and clean text
+                processed_text = text_processor.process_text(extracted_text)
+                
+                # Store processed text until the session expires; the sweeper
+                # deletes the uploaded file along with the expired session
+                session_data = {
+                    'text': processed_text,
+                    'filename': filename,
+                    'filepath': filepath
+                }
+                existing = session_store.add(session_id, session_data)
+                if existing is not None:
+                    # A concurrent upload of the same document got there first;
+                    # keep its session and drop this copy of the file
+                    file_handler.cleanup_file(filepath)
+                    processed_text = existing['text']
+            else:
+                print(f"Reusing extracted text for {filename} (session {session_id[:12]})")
+                processed_text = session_data['text']
             
             return jsonify({
                 'success': True,
                 'session_id': session_id,
+                'file_digest': session_id,
                 'filename': filename,
                 'text_preview': processed_text[:500] + '...' if len(processed_text) > 500 else processed_text
             })
@@ -80,40 +167,190 @@ def upload_file():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def _file_digest(stream):
+    """SHA-256 hex digest of an uploaded file stream, rewound afterwards"""
+    digest = hashlib.sha256()
+    for block in iter(lambda: stream.read(1024 * 1024), b''):
+        digest.update(block)
+    stream.seek(0)
+    return digest.hexdigest()
+
+def _content_from_request():
+    """
+    Pull the study material out of a generation request
+    
+    Uploaded files are saved so the (possibly slow) extraction can run later,
+    outside the request if the generation is queued as a job.
+    
+    Returns:
+        Tuple of ((kind, value), error_response); exactly one of them is None.
+        kind is 'file' (value is the saved path), 'text' (value is the raw text)
+        or 'processed' (value is text already processed by /upload).
+    """
+    # Reuse text extracted by /upload when the client refers to its session
+    session_id = request.form.get('session_id') or request.form.get('file_digest')
+    if session_id:
+        session_data = session_store.get(session_id)
+        if session_data is None:
+            return None, (jsonify({
+                'error': 'Session expired or not found. Please upload the file again.',
+                'session_expired': True
+            }), 404)
+        return ('processed', session_data['text']), None
+    # Check if it's a file upload or text input
+    if 'file' in request.files:
+        # Handle file upload
+        file = request.files['file']
+        if file.filename == '':
+            return None, (jsonify({'error': 'No file selected'}), 400)
+        # Generate unique filename
+        filename = secure_filename(file.filename)
+        unique_filename = f"{uuid.uuid4()}_{filename}"
+        filepath = os.path.join(app.config['UPLOAD_FOLDER'], unique_filename)
+        # Save file
+        file.save(filepath)
+        return ('file', filepath), None
+    elif 'text_content' in request.form:
+        # Handle text input
+        text_content = request.form['text_content']
+        if not text_content or len(text_content.strip()) < 50:
+            return None, (jsonify({'error': 'Please provide at least 50 characters of text'}), 400)
+        return ('text', text_content.strip()), None
+    else:
+        return None, (jsonify({'error': 'No content provided'}), 400)
+
+def _process_content(content):
+    """
+    Turn content from _content_from_request into processed text
+    
+    Raises:
+        ValueError: If no text could be extracted from an uploaded file
+    """
+    kind, value = content
+    if kind == 'processed':
+        return value
+    if kind == 'file':
+        # Extract text from file; the upload isn't kept for a session so drop it right away
+        try:
+            extracted_text = file_handler.extract_text(value)
+        finally:
+            file_handler.cleanup_file(value)
+        if not extracted_text:
+            raise ValueError('Could not extract text from file')
+        # Process and clean text
+        return text_processor.process_text(extracted_text)
+    # Process and clean text
+    return text_processor.process_text(value)
+
+def _processed_text_from_request():
+    """
+    Extract and clean the study material sent with a generation request
+    
+    Returns:
+        Tuple of (processed_text, error_response); exactly one of them is None
+    """
+    content, error_response = _content_from_request()
+    if error_response:
+        return None, error_response
+    try:
+        return _process_content(content), None
+    except ValueError as e:
+        return None, (jsonify({'error': str(e)}), 400)
+
+def _wants_async():
+    """Whether the client asked for generation to be queued as a background job"""
+    return request.form.get('async', '').lower() in ('1', 'true', 'yes')
+
+def _run_generation_job(content, num_questions, difficulty):
+    """Background job: extract, process and generate questions"""
+    processed_text = _process_content(content)
+    questions = mcq_generator.generate_questions(
+        processed_text,
+        num_questions=num_questions,
+        difficulty=difficulty
+    )
+    return {'questions': questions, 'total_questions': len(questions)}
+
+def _wants_stream():
+    """Whether the client asked for questions to be streamed as NDJSON"""
+    if request.form.get('stream', '').lower() in ('1', 'true', 'yes'):
+        return True
+    return 'application/x-ndjson' in request.headers.get('Accept', '')
+
+def _iter_questions_from_file(filepath, num_questions, difficulty):
+    """
+    Stream an uploaded file through extraction, cleaning, chunking and generation
+    
+    Pages flow through as they are extracted, so the first chunk is sent to the
+    model before the rest of the document has been parsed.
+    """
+    try:
+        chunk_size = mcq_generator.gemini_generator.chunk_size
+        estimated_length = file_handler.estimate_text_length(filepath)
+        expected_chunks = -(-estimated_length // chunk_size) if estimated_length else None
+        segments = text_processor.iter_process(file_handler.iter_text(filepath))
+        chunks = text_processor.iter_chunks(segments, chunk_size)
+        yield from mcq_generator.iter_questions_from_chunks(
+            chunks,
+            num_questions=num_questions,
+            difficulty=difficulty,
+            expected_chunks=expected_chunks
+        )
+    finally:
+        file_handler.cleanup_file(filepath)
+
+def _stream_questions(questions):
+    """Yield one NDJSON line per generated question, then a summary line"""
+    total = 0
+    try:
+        for question in questions:
+            yield json.dumps({'type': 'question', 'index': total, 'question': question}, ensure_ascii=False) + '\n'
+            total += 1
+    except Exception as e:
+        yield json.dumps({'type': 'error', 'error': f'MCQ generation failed: {str(e)}'}) + '\n'
+        return
+    yield json.dumps({'type': 'done', 'success': True, 'total_questions': total}) + '\n'
+
 @app.route('/generate-mcq', methods=['POST'])
 def generate_mcq():
     """Generate MCQ questions from uploaded content or text input"""
     try:
-        # Check if it's a file upload or text input
-        if 'file' in request.files:
-            # Handle file upload
-            file = request.files['file']
-            if file.filename == '':
-                return jsonify({'error': 'No file selected'}), 400
-            # Generate unique filename
-            filename = secure_filename(file.filename)
-            unique_filename = f"{uuid.uuid4()}_{filename}"
-            filepath = os.path.join(app.config['UPLOAD_FOLDER'], unique_filename)
-            # Save file
-            file.save(filepath)
-            # Extract text from file
-            extracted_text = file_handler.extract_text(filepath)
-            if not extracted_text:
-                return jsonify({'error': 'Could not extract text from file'}), 400
-            # Process and clean text
-            processed_text = text_processor.process_text(extracted_text)
-        elif 'text_content' in request.form:
-            # Handle text input
-            text_content = request.form['text_content']
-            if not text_content or len(text_content.strip()) < 50:
-                return jsonify({'error': 'Please provide at least 50 characters of text'}), 400
-            # Process and clean text
-            processed_text = text_processor.process_text(text_content.strip())
-        else:
-            return jsonify({'error': 'No content provided'}), 400
         # Get quiz settings
         num_questions = int(request.form.get('num_questions', 10))
         difficulty = request.form.get('difficulty', 'medium')
+        # Queue the whole extraction + generation as a job if requested
+        if _wants_async():
+            content, error_response = _content_from_request()
+            if error_response:
+                return error_response
+            job_id = job_queue.enqueue(_run_generation_job, content, num_questions, difficulty)
+            return jsonify({
+                'success': True,
+                'job_id': job_id,
+                'status': JobQueue.QUEUED,
+                'status_url': url_for('get_job', job_id=job_id)
+            }), 202
+        # Stream questions as they are produced if requested
+        if _wants_stream():
+            content, error_response = _content_from_request()
+            if error_response:
+                return error_response
+            if content[0] == 'file':
+                questions = _iter_questions_from_file(content[1], num_questions, difficulty)
+            else:
+                questions = mcq_generator.iter_questions(
+                    _process_content(content),
+                    num_questions=num_questions,
+                    difficulty=difficulty
+                )
+            return Response(
+                stream_with_context(_stream_questions(questions)),
+                mimetype='application/x-ndjson',
+                headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+            )
+        processed_text, error_response = _processed_text_from_request()
+        if error_response:
+            return error_response
         # Generate MCQ questions
         try:
             mcq_questions = mcq_generator.generate_questions(
@@ -131,6 +368,169 @@ def generate_mcq():
     except Exception as e:
         return jsonify({'success': False, 'error': f'Internal server error: {str(e)}'}), 500
 
+def _batch_contents_from_request():
+    """
+    Pull every document out of a batch generation request
+    
+    Documents come from repeated 'files' uploads, 'texts' fields and
+    'session_ids' of earlier /upload calls. A document that can't be used is
+    reported in its own result instead of failing the whole batch.
+    
+    Returns:
+        Tuple of (documents, error_response); documents is a list of
+        {'name', 'content'} dicts, with 'error' instead of 'content' for
+        documents that can't be used
+    """
+    documents = []
+    for file in request.files.getlist('files'):
+        if file.filename == '':
+            continue
+        filename = secure_filename(file.filename)
+        filepath = os.path.join(app.config['UPLOAD_FOLDER'], f"{uuid.uuid4()}_{filename}")
+        file.save(filepath)
+        documents.append({'name': file.filename, 'content': ('file', filepath)})
+    for index, text_content in enumerate(request.form.getlist('texts'), 1):
+        name = f'text-{index}'
+        if len(text_content.strip()) < 50:
+            documents.append({'name': name, 'error': 'Please provide at least 50 characters of text'})
+        else:
+            documents.append({'name': name, 'content': ('text', text_content.strip())})
+    for session_id in request.form.getlist('session_ids'):
+        session_data = session_store.get(session_id)
+        if session_data is None:
+            documents.append({'name': session_id, 'error': 'Session expired or not found. Please upload the file again.'})
+        else:
+            documents.append({'name': session_data.get('filename') or session_id,
+                              'content': ('processed', session_data['text'])})
+    
+    if not documents:
+        return None, (jsonify({'error': 'No documents provided'}), 400)
+    max_documents = int(os.getenv('BATCH_MAX_DOCUMENTS', 50))
+    if len(documents) > max_documents:
+        for document in documents:
+            if 'content' in document and document['content'][0] == 'file':
+                file_handler.cleanup_file(document['content'][1])
+        return None, (jsonify({'error': f'A batch can contain at most {max_documents} documents'}), 400)
+    return documents, None
+
+def _run_batch_job(documents, num_questions, difficulty):
+    """Background job (or inline): extract every document in parallel, then generate all question sets together"""
+    def process(document):
+        """Processed text of one document, recording the reason if there is none"""
+        if 'content' not in document:
+            return None
+        try:
+            return _process_content(document['content'])
+        except Exception as e:
+            document['error'] = str(e)
+            return None
+    
+    with ThreadPoolExecutor(max_workers=int(os.getenv('BATCH_EXTRACT_WORKERS', 4))) as executor:
+        processed = list(executor.map(process, documents))
+    
+    texts = {index: text for index, text in enumerate(processed) if text}
+    generated = mcq_generator.generate_batch(texts, num_questions=num_questions, difficulty=difficulty) if texts else {}
+    
+    results = []
+    for index, document in enumerate(documents):
+        if index in generated:
+            results.append({
+                'name': document['name'],
+                'success': True,
+                'questions': generated[index],
+                'total_questions': len(generated[index])
+            })
+        else:
+            results.append({
+                'name': document['name'],
+                'success': False,
+                'error': document.get('error', 'No text to generate questions from')
+            })
+    return {'documents': results, 'total_documents': len(results)}
+
+@app.route('/generate-mcq/batch', methods=['POST'])
+def generate_mcq_batch():
+    """Generate separate question sets for many uploaded files, texts or sessions in one request"""
+    try:
+        num_questions = int(request.form.get('num_questions', 10))
+        difficulty = request.form.get('difficulty', 'medium')
+        documents, error_response = _batch_contents_from_request()
+        if error_response:
+            return error_response
+        if _wants_async():
+            job_id = job_queue.enqueue(_run_batch_job, documents, num_questions, difficulty)
+            return jsonify({
+                'success': True,
+                'job_id': job_id,
+                'status': JobQueue.QUEUED,
+                'status_url': url_for('get_job', job_id=job_id)
+            }), 202
+        try:
+            result = _run_batch_job(documents, num_questions, difficulty)
+        except Exception as e:
+            return jsonify({'success': False, 'error': f'MCQ generation failed: {str(e)}'}), 500
+        return jsonify({'success': True, **result})
+    except Exception as e:
+        return jsonify({'success': False, 'error': f'Internal server error: {str(e)}'}), 500
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Report the status of a queued generation job, with results once done"""
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Job not found'}), 404
+    
+    response = {
+        'success': job['status'] != JobQueue.FAILED,
+        'job_id': job_id,
+        'status': job['status']
+    }
+    if job['status'] == JobQueue.DONE:
+        response.update(job['result'])
+    elif job['status'] == JobQueue.FAILED:
+        response['error'] = f"MCQ generation failed: {job['error']}"
+    return jsonify(response)
+
+@app.route('/question-bank/quiz', methods=['GET'])
+def question_bank_quiz():
+    """Assemble a quiz from previously generated questions by topic, language and difficulty"""
+    try:
+        num_questions = int(request.args.get('num_questions', 10))
+        questions = question_bank.find_questions(
+            num_questions,
+            difficulty=request.args.get('difficulty'),
+            language=request.args.get('language'),
+            topic=request.args.get('topic')
+        )
+        if not questions:
+            return jsonify({'success': False, 'error': 'No banked questions match this quiz'}), 404
+        return jsonify({
+            'success': True,
+            'questions': questions,
+            'total_questions': len(questions)
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'error': f'Internal server error: {str(e)}'}), 500
+
+@app.route('/question-bank/stats', methods=['GET'])
+def question_bank_stats():
+    """Report how many questions the bank holds"""
+    return jsonify({'success': True, **question_bank.stats()})
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """How model responses were parsed, model call limiter/retry state, fallback strategy timings, start-up time and cache hit rates"""
+    gemini_generator = mcq_generator.gemini_generator
+    return jsonify({
+        'success': True,
+        'structured_output': gemini_generator.structured_output,
+        'parse_strategies': parse_strategies.snapshot(),
+        'model_backend': backend_stats(gemini_generator.backend) if gemini_generator.backend else None,
+        'fallback_strategies': strategies.stats(),
+        'startup': startup_report,
+        'question_cache': question_cache.stats()
+    })
+
 @app.route('/submit-answer', methods=['POST'])
 def submit_answer():
     """Handle answer submission and provide feedback"""
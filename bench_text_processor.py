@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Benchmark the precompiled text normaliser against the original multi-pass pipeline
+
+Usage: python bench_text_processor.py [size_in_mb]
+"""
+
+import re
+import sys
+import time
+import random
+from text_processor import TextProcessor
+
+# The cleaning passes process_text replaced, kept as the reference it must
+# match byte for byte (see test_text_processor.py)
+NOISE_PATTERNS = [
+    r'\b\d+\s*\.\s*',  # Remove numbered lists
+    r'^\s*[-*]\s*',    # Remove bullet points
+    r'\s+',            # Multiple spaces
+    # More conservative pattern that preserves Bangla and other Unicode characters
+    r'[^\w\s\.\,\;\:\!\?\-\(\)\u0980-\u09FF\u2000-\u206F]',  # Preserve Bangla Unicode range
+]
+
+def process_text_multipass(text):
+    """Original step-by-step cleaning pipeline, one re.sub call after another"""
+    if not text:
+        return ""
+    text = str(text)
+    
+    # Normalize whitespace, then strip each line
+    text = '\n'.join(line.strip() for line in re.sub(r'\s+', ' ', text).split('\n'))
+    
+    # Remove noise patterns (more carefully for Bangla)
+    for pattern in NOISE_PATTERNS:
+        text = re.sub(pattern, ' ', text)
+    
+    # Clean up punctuation and the spacing around it
+    text = re.sub(r'[\.\!\?]+', '.', text)
+    text = re.sub(r'[\,\;]+', ',', text)
+    text = re.sub(r'\s*([\.\!\?\,\;])\s*', r'\1 ', text)
+    
+    # Drop empty lines and join paragraphs with a space
+    text = ' '.join(p.strip() for p in text.split('\n') if p.strip())
+    
+    # Ensure proper sentence endings
+    return TextProcessor()._ensure_sentence_endings(text).strip()
+
+BANGLA_LINES = [
+    "১. বাংলাদেশ সিভিল সার্ভিস (বিসিএস) বাংলাদেশের সর্বোচ্চ সরকারি চাকরির পরীক্ষা।",
+    "এই পরীক্ষায় উত্তীর্ণ হয়ে সরকারি বিভিন্ন মন্ত্রণালয় ও বিভাগে চাকরি করা যায়!!",
+    "- বিসিএস পরীক্ষায় সাধারণত বাংলা, ইংরেজি, গণিত, বিজ্ঞান ইত্যাদি বিষয়ে প্রশ্ন আসে;",
+    "প্রতিবছর হাজার হাজার শিক্ষার্থী এই পরীক্ষায় অংশগ্রহণ করে © ২০২৩   ",
+]
+
+ENGLISH_LINES = [
+    "1. The Bangladesh Civil Service (BCS) is the civil service of Bangladesh.",
+    "The BCS examination consists of three stages: Preliminary, Written and Viva Voce...",
+    "* The preliminary examination has 200 MCQs;; candidates who pass sit the written exam?",
+    "Each cadre has specific responsibilities — and career progression paths ©   ",
+]
+
+def build_text(lines, size_mb):
+    """Repeat shuffled sample lines until the text reaches size_mb megabytes"""
+    rng = random.Random(42)
+    target = int(size_mb * 1024 * 1024)
+    parts, length = [], 0
+    while length < target:
+        line = rng.choice(lines) + rng.choice(["\n", "\n\n", " ", "\t"])
+        parts.append(line)
+        length += len(line.encode('utf-8'))
+    return ''.join(parts)
+
+def best_of(func, text, repeat=3):
+    """Best wall-clock time of repeat runs, plus the last result"""
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func(text)
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+def run_benchmark(size_mb=4.0):
+    processor = TextProcessor()
+    print(f"📊 Text normaliser benchmark ({size_mb:g} MB inputs)")
+    print("=" * 60)
+    
+    for name, lines in (("Bangla", BANGLA_LINES), ("English", ENGLISH_LINES)):
+        text = build_text(lines, size_mb)
+        multipass_time, multipass_result = best_of(process_text_multipass, text)
+        single_time, single_result = best_of(processor.process_text, text)
+        
+        identical = single_result == multipass_result
+        print(f"{name:8s} multi-pass {multipass_time * 1000:8.1f} ms | "
+              f"precompiled {single_time * 1000:8.1f} ms | "
+              f"speedup {multipass_time / single_time:4.2f}x | identical: {identical}")
+        if not identical:
+            raise SystemExit(f"❌ {name} output differs from the reference pipeline")
+        
+        # Plain str, so nothing is cached between runs
+        detect_time, language = best_of(processor.detect_language, str(single_result))
+        print(f"{'':8s} language detection {detect_time * 1000:6.2f} ms (sampled, detected {language})")
+
+if __name__ == "__main__":
+    run_benchmark(float(sys.argv[1]) if len(sys.argv) > 1 else 4.0)
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark /generate-mcq requests/second under each gunicorn worker class
+
+Starts gunicorn with gunicorn.conf.py once per mode (sync, gthread and, if
+installed, gevent) against the offline mock model with simulated latency,
+drives it with load_test.run_load over HTTP and prints one line per mode.
+
+Usage: python bench_workers.py [--modes sync,gthread,gevent] [--workers N] [--requests N] ...
+"""
+
+import os
+import sys
+import time
+import socket
+import argparse
+import subprocess
+import importlib.util
+import urllib.request
+from load_test import http_client, percentile, run_load
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--modes', default='sync,gthread,gevent', help='worker classes to compare')
+    parser.add_argument('--workers', type=int, default=2, help='worker processes per run')
+    parser.add_argument('--requests', type=int, default=200, help='requests per run')
+    parser.add_argument('--concurrency', type=int, default=32, help='requests in flight at once')
+    parser.add_argument('--questions', type=int, default=10, help='num_questions per request')
+    parser.add_argument('--latency-ms', type=float, default=800, help='simulated model latency')
+    parser.add_argument('--jitter-ms', type=float, default=400, help='random extra model latency')
+    return parser.parse_args()
+
+def free_port():
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        return probe.getsockname()[1]
+
+def wait_until_ready(base_url, server, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"gunicorn exited with status {server.returncode}")
+        try:
+            with urllib.request.urlopen(base_url + '/', timeout=2):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("gunicorn did not become ready in time")
+
+def bench_mode(mode, args):
+    port = free_port()
+    env = dict(
+        os.environ,
+        PORT=str(port),
+        GUNICORN_WORKER_CLASS=mode,
+        WEB_CONCURRENCY=str(args.workers),
+        LLM_BACKEND='mock',
+        LLM_LATENCY_MS=str(args.latency_ms),
+        LLM_LATENCY_JITTER_MS=str(args.jitter_ms),
+        QUESTION_CACHE_PATH=':memory:',
+        QUESTION_BANK_PATH=':memory:',
+        SESSION_STORE='memory',
+        GUNICORN_LOG_LEVEL='warning'
+    )
+    server = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'app:app'],
+                              env=env, cwd=os.path.dirname(os.path.abspath(__file__)),
+                              stdout=subprocess.DEVNULL)
+    try:
+        base_url = f"http://127.0.0.1:{port}"
+        wait_until_ready(base_url, server)
+        return run_load(http_client(base_url), args.requests, args.concurrency, args.questions)
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+def main():
+    args = parse_args()
+    modes = [mode.strip() for mode in args.modes.split(',') if mode.strip()]
+    if 'gevent' in modes and importlib.util.find_spec('gevent') is None:
+        print("⚠️ gevent is not installed, skipping it (pip install gevent)")
+        modes.remove('gevent')
+
+    print(f"🚀 {args.requests} requests per mode, concurrency {args.concurrency}, {args.workers} workers, "
+          f"model latency {args.latency_ms:.0f}±{args.jitter_ms:.0f} ms")
+    for mode in modes:
+        result = bench_mode(mode, args)
+        latencies = result['latencies']
+        failed = sum(count for status, count in result['statuses'].items() if status != 200)
+        print(f"{mode:>8}: {result['throughput']:7.1f} req/s, "
+              f"p50 {percentile(latencies, 0.50) * 1000:6.0f} ms, p95 {percentile(latencies, 0.95) * 1000:6.0f} ms, "
+              f"{failed} failed")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
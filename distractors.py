@@ -0,0 +1,158 @@
+import heapq
+import random
+import re
+from typing import Any, Dict, List, Optional, Tuple
+from document_index import DocumentIndex, digits_like, is_year
+
+# How far apart the document's own years may be to serve as distractors
+YEAR_WINDOW = 30
+# Offsets tried, in order, when the document doesn't have enough nearby years
+_YEAR_OFFSETS = (1, -1, 2, -2, 3, -3, 5, -5, 10, -10)
+# Multiples of a number's leading-digit step tried when the document doesn't
+# have enough numbers of the same magnitude
+_NUMBER_STEPS = (1, -1, 2, -2, 0.5, -0.5, 3, -3)
+# How many of the most frequent concepts are considered as term distractors
+TERM_POOL = 30
+# Longest statement shown in a fill-in-the-blank question
+MAX_STATEMENT_LENGTH = 220
+BLANK = '_____'
+# Bangla vowel signs, virama and nukta aren't \w but are part of a word
+_WORD_CHAR = r'[\w\u0980-\u09FF]'
+
+def year_distractors(year: str, index: DocumentIndex, count: int = 3) -> List[str]:
+    """Other years from the document closest to year, topped up with neighbouring years"""
+    value = int(year)
+    # In the answer's digit script, so no option stands out by its digits
+    nearby = dict.fromkeys(digits_like(int(other), year) for other in index.dates
+                           if int(other) != value and abs(int(other) - value) <= YEAR_WINDOW)
+    picks = heapq.nsmallest(count, nearby, key=lambda other: abs(int(other) - value))
+    for offset in _YEAR_OFFSETS:
+        if len(picks) >= count:
+            break
+        candidate = digits_like(value + offset, year)
+        if candidate not in picks:
+            picks.append(candidate)
+    return picks
+
+def number_distractors(number: str, index: DocumentIndex, count: int = 3) -> List[str]:
+    """
+    Numbers of the same magnitude as number, in the same digit script
+
+    The document's own numbers with as many digits come first, closest
+    value first; the rest are number moved by multiples of its leading-digit
+    step (200 -> 300, 100, 400, 250, ...).
+    """
+    if is_year(number):
+        return year_distractors(number, index, count)
+    value = int(number)
+    same_length = dict.fromkeys(digits_like(int(other), number)
+                                for other in index.numbers_by_length.get(len(number), ())
+                                if int(other) != value and not is_year(other))
+    picks = heapq.nsmallest(count, same_length, key=lambda other: abs(int(other) - value))
+    step = 10 ** (len(str(value)) - 1)
+    for multiple in _NUMBER_STEPS:
+        if len(picks) >= count:
+            break
+        candidate = value + int(multiple * step)
+        if candidate > 0 and candidate != value and digits_like(candidate, number) not in picks:
+            picks.append(digits_like(candidate, number))
+    return picks
+
+def term_distractors(term: str, index: DocumentIndex, count: int = 3) -> List[str]:
+    """
+    Frequent terms from the document that share sentences with term
+
+    Terms appearing alongside the answer belong to the same topic, which is
+    what makes them plausible; terms capitalized like the answer (names) rank
+    first. Variants of the term itself ("cadre" for "cadres") and terms in
+    the sentence the question is built from are skipped. May return fewer
+    than count terms.
+    """
+    token = term.lower()
+    own_sentences = index.token_sentences.get(token)
+    if not own_sentences:
+        return []
+    shown, own_sentences = own_sentences[0], set(own_sentences)
+    capitalized = index.surface_forms.get(token, term)[:1].isupper()
+
+    ranked = []
+    for concept in index.concepts(TERM_POOL):
+        if concept.startswith(token) or token.startswith(concept):
+            continue
+        shared = own_sentences.intersection(index.token_sentences[concept])
+        if shown in shared:
+            continue
+        same_case = index.surface_forms[concept][:1].isupper() == capitalized
+        ranked.append((same_case, len(shared), concept))
+    # Stable sort: equally ranked terms stay in frequency order
+    ranked.sort(key=lambda entry: (-entry[0], -entry[1]))
+    return [index.surface_forms[concept] for _, _, concept in ranked[:count]]
+
+def shuffled_options(answer: str, distractors: List[str], rng: random.Random = random) -> Tuple[List[str], str]:
+    """
+    Lettered options with the answer at a random position
+
+    Returns:
+        Tuple of (["A) ...", "B) ...", "C) ...", "D) ..."], correct letter)
+    """
+    choices = [answer] + list(distractors[:3])
+    rng.shuffle(choices)
+    letters = 'ABCD'
+    options = [f"{letter}) {choice}" for letter, choice in zip(letters, choices)]
+    return options, letters[choices.index(answer)]
+
+def blank_out(sentence: str, answer: str) -> Optional[str]:
+    """The sentence with whole-word occurrences of answer blanked, or None if there are none"""
+    statement, blanked = re.subn(rf'(?<!{_WORD_CHAR}){re.escape(answer)}(?!{_WORD_CHAR})', BLANK, sentence,
+                                 flags=re.IGNORECASE)
+    if not blanked:
+        return None
+    if len(statement) > MAX_STATEMENT_LENGTH:
+        # Keep a window around the first blank
+        start = statement.index(BLANK)
+        left = max(0, start - MAX_STATEMENT_LENGTH // 2)
+        right = min(len(statement), left + MAX_STATEMENT_LENGTH)
+        prefix = '...' if left > 0 else ''
+        suffix = '...' if right < len(statement) else ''
+        statement = f"{prefix}{statement[left:right]}{suffix}"
+    return statement
+
+def cloze_question(sentence: Optional[str], answer: str, distractors: List[str], prompt: str,
+                   rng: random.Random = random) -> Optional[Dict[str, Any]]:
+    """
+    A fill-in-the-blank question on a sentence from the text
+
+    Args:
+        sentence: Sentence containing answer
+        answer: Word or number to blank out
+        distractors: At least three wrong answers
+        prompt: Question wording placed before the blanked statement
+
+    Returns:
+        Question dict with shuffled options, or None if the sentence doesn't
+        contain the answer or there are too few distractors
+    """
+    if not sentence or len(distractors) < 3:
+        return None
+    statement = blank_out(sentence, answer)
+    if statement is None:
+        return None
+    options, correct_answer = shuffled_options(answer, distractors, rng)
+    return {
+        "question": f'{prompt} "{statement}"',
+        "options": options,
+        "correct_answer": correct_answer,
+        "explanation": f"The text states: {sentence}."
+    }
+
+def date_question(date: str, index: DocumentIndex, rng: random.Random = random) -> Optional[Dict[str, Any]]:
+    return cloze_question(index.first_sentence_with(date), date, year_distractors(date, index),
+                          "Which year completes this statement from the text?", rng)
+
+def number_question(number: str, index: DocumentIndex, rng: random.Random = random) -> Optional[Dict[str, Any]]:
+    return cloze_question(index.first_sentence_with(number), number, number_distractors(number, index),
+                          "Which number completes this statement from the text?", rng)
+
+def term_question(term: str, index: DocumentIndex, rng: random.Random = random) -> Optional[Dict[str, Any]]:
+    return cloze_question(index.first_sentence_with(term), index.surface_forms.get(term.lower(), term),
+                          term_distractors(term, index), "Which term completes this statement from the text?", rng)
@@ -0,0 +1,143 @@
+import heapq
+import re
+from typing import Dict, List, Optional
+from text_processor import ProcessedText
+
+# Words too common to make a question about
+STOP_WORDS = {
+    'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'is', 'are', 'was', 'were',
+    'be', 'been', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could', 'should', 'may', 'might',
+    'can', 'this', 'that', 'these', 'those', 'a', 'an', 'as', 'from', 'not', 'no', 'yes', 'so', 'if', 'then',
+    'else', 'when', 'where', 'why', 'how', 'what', 'which', 'who', 'whom', 'whose'
+}
+
+# Substrings marking a sentence as a factual statement or a definition
+FACT_KEYWORDS = ('is', 'are', 'was', 'were', 'consists', 'includes', 'contains', 'established', 'created', 'formed')
+DEFINITION_PATTERNS = ('is the', 'refers to', 'means', 'defined as', 'known as')
+
+_SENTENCE = re.compile(r'[^.]+')
+_NUMBER = re.compile(r'\b\d+\b')
+# Anything but letters, digits and Bangla signs: vowel signs, virama and
+# nukta aren't \w, and stripping them would cut words short
+_NOT_WORD = r'(?:[^\w\u0980-\u09FF]|_)+'
+_NOT_ALNUM = re.compile(_NOT_WORD)
+_EDGE_PUNCTUATION = re.compile(f'^{_NOT_WORD}|{_NOT_WORD}$')
+
+_BANGLA_DIGITS = '০১২৩৪৫৬৭৮৯'
+_TO_ASCII_DIGITS = str.maketrans(_BANGLA_DIGITS, '0123456789')
+_TO_BANGLA_DIGITS = str.maketrans('0123456789', _BANGLA_DIGITS)
+
+def ascii_digits(number: str) -> str:
+    return number.translate(_TO_ASCII_DIGITS)
+
+def digits_like(value: int, like: str) -> str:
+    """value written in the digit script (Bangla or ASCII) of the number like"""
+    text = str(value)
+    return text.translate(_TO_BANGLA_DIGITS) if ascii_digits(like) != like else text
+
+def is_year(number: str) -> bool:
+    return len(number) == 4 and ascii_digits(number)[:2] in ('19', '20')
+
+class DocumentIndex:
+    """
+    Everything the template fallback generators look up, built in one pass
+
+    The text is split on '.' once; each sentence is lowercased, tokenized and
+    scanned for numbers and fact/definition markers as it goes by. After that,
+    picking material for another question is a dictionary or list lookup
+    instead of another scan of the document.
+
+    Attributes:
+        sentences: (start, end) offsets of each stripped, non-empty sentence
+        token_sentences: Cleaned lowercase token -> ids of sentences containing it
+        token_counts: Occurrences of each candidate concept token
+        surface_forms: Candidate concept token -> its first spelling in the text
+        dates: Distinct years (19xx/20xx) in order of first appearance
+        numbers: Distinct numbers greater than 10 in order of first appearance
+        numbers_by_length: The same numbers grouped by digit count
+        facts / definitions / long_sentences: Ids of candidate sentences
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self.sentences: List[tuple] = []
+        self.token_sentences: Dict[str, List[int]] = {}
+        self.token_counts: Dict[str, int] = {}
+        self.surface_forms: Dict[str, str] = {}
+        self.facts: List[int] = []
+        self.definitions: List[int] = []
+        self.long_sentences: List[int] = []
+        self._ranked_concepts: List[str] = []
+        dates: Dict[str, None] = {}
+        numbers: Dict[str, None] = {}
+
+        for match in _SENTENCE.finditer(text):
+            raw = match.group()
+            sentence = raw.strip()
+            if not sentence:
+                continue
+            sentence_id = len(self.sentences)
+            start = match.start() + (len(raw) - len(raw.lstrip()))
+            self.sentences.append((start, start + len(sentence)))
+
+            lowered = sentence.lower()
+            for word in sentence.split():
+                token = _NOT_ALNUM.sub('', word).lower()
+                if not token:
+                    continue
+                ids = self.token_sentences.setdefault(token, [])
+                if not ids or ids[-1] != sentence_id:
+                    ids.append(sentence_id)
+                if len(token) > 4 and token not in STOP_WORDS:
+                    if token not in self.token_counts:
+                        self.token_counts[token] = 0
+                        self.surface_forms[token] = _EDGE_PUNCTUATION.sub('', word)
+                    self.token_counts[token] += 1
+
+            for number in _NUMBER.findall(sentence):
+                if is_year(number):
+                    dates[number] = None
+                if int(number) > 10:
+                    numbers[number] = None
+
+            if len(sentence) > 20 and any(keyword in lowered for keyword in FACT_KEYWORDS):
+                self.facts.append(sentence_id)
+            if len(sentence) > 30:
+                self.long_sentences.append(sentence_id)
+                if any(pattern in lowered for pattern in DEFINITION_PATTERNS):
+                    self.definitions.append(sentence_id)
+
+        self.dates = list(dates)
+        self.numbers = list(numbers)
+        self.numbers_by_length: Dict[int, List[str]] = {}
+        for number in self.numbers:
+            self.numbers_by_length.setdefault(len(number), []).append(number)
+
+    def sentence(self, sentence_id: int) -> str:
+        start, end = self.sentences[sentence_id]
+        return self.text[start:end]
+
+    def sentence_texts(self, sentence_ids: List[int], limit: Optional[int] = None) -> List[str]:
+        return [self.sentence(sentence_id) for sentence_id in sentence_ids[:limit]]
+
+    def concepts(self, limit: int) -> List[str]:
+        """The most frequent candidate concepts, ties in order of first appearance"""
+        if len(self._ranked_concepts) < min(limit, len(self.token_counts)):
+            self._ranked_concepts = heapq.nlargest(limit, self.token_counts, key=self.token_counts.__getitem__)
+        return self._ranked_concepts[:limit]
+
+    def mentions(self, word: str) -> bool:
+        return word.lower() in self.token_sentences
+
+    def first_sentence_with(self, word: str) -> Optional[str]:
+        ids = self.token_sentences.get(word.lower())
+        return self.sentence(ids[0]) if ids else None
+
+def index_document(text: str) -> DocumentIndex:
+    """The DocumentIndex of a text, cached on ProcessedText so it's built once per document"""
+    if isinstance(text, ProcessedText) and text.document_index is not None:
+        return text.document_index
+    index = DocumentIndex(text)
+    if isinstance(text, ProcessedText):
+        text.document_index = index
+    return index
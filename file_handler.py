@@ -1,20 +1,127 @@
-import PyPDF2
-import docx
+import codecs
+import html
+import importlib
+import multiprocessing
 import os
-from typing import Optional
-import pdfplumber
-import fitz  # PyMuPDF
+import re
+import time
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional, List, Dict, Any, Tuple, Iterator
+
+# Document engines (fitz is PyMuPDF) are imported where they're first used:
+# together they add noticeably to worker start-up, and most requests need
+# one or none of them. FileHandler.warm_up() loads them ahead of time.
+DOCUMENT_ENGINES = ('fitz', 'pdfplumber', 'PyPDF2', 'docx')
+
+# Markers of a bad text layer: replacement characters and private-use glyphs
+# left behind by legacy Bangla fonts
+_GARBAGE_CHARS = re.compile(r'[\uFFFD\uE000-\uF8FF]')
+_BANGLA_CHARS = re.compile(r'[\u0980-\u09FF]')
+# Dependent vowel signs, hasanta and other combining marks can't start a word in
+# correctly ordered Bangla; seeing them there means conjuncts were broken apart
+_BROKEN_BANGLA = re.compile(r'(?:^|(?<=\s))[\u0981-\u0983\u09BC\u09BE-\u09CD\u09D7]')
+# Text runs of a DOCX body, read straight from the archive to size a document
+# without building python-docx's object model
+_DOCX_TEXT_RUN = re.compile(r'<w:t(?:\s[^>]*)?>([^<]*)</w:t>')
+
+def _text_defect_ratio(text: str) -> float:
+    """
+    Estimate how badly a page's text layer was extracted
+    
+    Returns:
+        Share of non-space characters that look broken (1.0 for an empty page)
+    """
+    visible = len(''.join(text.split())) if text else 0
+    if visible == 0:
+        return 1.0
+    defects = len(_GARBAGE_CHARS.findall(text))
+    if _BANGLA_CHARS.search(text):
+        defects += len(_BROKEN_BANGLA.findall(text))
+    return defects / visible
+
+def _needs_escalation(text: str, threshold: float) -> bool:
+    """Whether a PyMuPDF page result is poor enough to retry with pdfplumber"""
+    return _text_defect_ratio(text) > threshold
+
+def _iter_page_range(filepath: str, start: int, end: int, mode: str, threshold: float) -> Iterator[Tuple[int, str, float, str]]:
+    """
+    Extract pages [start, end) one at a time
+    
+    In "auto" mode each page is read with PyMuPDF and only retried with
+    pdfplumber when its text looks broken; "pdfplumber" mode skips PyMuPDF.
+    
+    Yields:
+        (page_number, page_text, seconds, engine) tuples
+    """
+    if mode == 'auto':
+        import fitz
+        fitz_doc = fitz.open(filepath)
+    else:
+        fitz_doc = None
+    plumber_pdf = None
+    try:
+        for page_number in range(start, end):
+            started = time.perf_counter()
+            page_text, engine = "", "pymupdf"
+            if fitz_doc is not None:
+                page_text = fitz_doc[page_number].get_text() or ""
+            
+            if fitz_doc is None or _needs_escalation(page_text, threshold):
+                try:
+                    if plumber_pdf is None:
+                        import pdfplumber
+                        plumber_pdf = pdfplumber.open(filepath)
+                    plumber_text = plumber_pdf.pages[page_number].extract_text() or ""
+                    if fitz_doc is None or _text_defect_ratio(plumber_text) < _text_defect_ratio(page_text):
+                        page_text, engine = plumber_text, "pdfplumber"
+                except Exception as e:
+                    if fitz_doc is None:
+                        raise
+                    print(f"pdfplumber failed on page {page_number + 1}: {str(e)}")
+            
+            yield page_number, page_text, time.perf_counter() - started, engine
+    finally:
+        if fitz_doc is not None:
+            fitz_doc.close()
+        if plumber_pdf is not None:
+            plumber_pdf.close()
+
+def _extract_page_range(filepath: str, start: int, end: int, mode: str, threshold: float) -> List[Tuple[int, str, float, str]]:
+    """Extract pages [start, end) in a worker process; see _iter_page_range"""
+    return list(_iter_page_range(filepath, start, end, mode, threshold))
 
 class FileHandler:
     """Handles file upload and text extraction from various formats"""
     
-    def __init__(self):
+    def __init__(self, pdf_workers: Optional[int] = None):
         self.supported_formats = {
             '.pdf': self._extract_from_pdf,
             '.docx': self._extract_from_docx,
             '.doc': self._extract_from_docx,
             '.txt': self._extract_from_txt
         }
+        
+        # Page-parallel PDF extraction settings
+        self.pdf_workers = pdf_workers or int(os.getenv('PDF_EXTRACT_WORKERS', os.cpu_count() or 1))
+        self.parallel_min_pages = int(os.getenv('PDF_PARALLEL_MIN_PAGES', 8))
+        
+        # Engine selection: pages sampled with PyMuPDF decide whether the fast
+        # path is usable; pages above the defect threshold fall back to pdfplumber
+        self.pdf_probe_pages = int(os.getenv('PDF_PROBE_PAGES', 5))
+        self.pdf_defect_threshold = float(os.getenv('PDF_DEFECT_THRESHOLD', 0.02))
+        self._pdf_pool = None
+        self._pdf_pool_lock = threading.Lock()
+    
+    def warm_up(self) -> None:
+        """Import the document engines now rather than during the first upload"""
+        for name in DOCUMENT_ENGINES:
+            try:
+                importlib.import_module(name)
+            except ImportError as e:
+                print(f"⚠️ Could not preload {name}: {str(e)}")
     
     def extract_text(self, filepath: str) -> Optional[str]:
         """
@@ -40,42 +147,23 @@ class FileHandler:
     
     def _extract_from_pdf(self, filepath: str) -> str:
         """Extract text from PDF file with enhanced Bangla support"""
-        text = ""
-        
-        # Try pdfplumber first (best for complex scripts like Bangla)
-        try:
-            print("Attempting PDF extraction with pdfplumber...")
-            with pdfplumber.open(filepath) as pdf:
-                for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n"
-            
-            if text.strip():
-                print("Successfully extracted text using pdfplumber")
-                return text.strip()
-        except Exception as e:
-            print(f"pdfplumber failed: {str(e)}")
-        
-        # Try PyMuPDF (fitz) as second option
+        # PyMuPDF fast path with per-page pdfplumber escalation for broken Bangla
         try:
-            print("Attempting PDF extraction with PyMuPDF...")
-            doc = fitz.open(filepath)
-            for page in doc:
-                page_text = page.get_text()
-                if page_text:
-                    text += page_text + "\n"
-            doc.close()
+            text = ""
+            for page in self.extract_pdf_pages(filepath):
+                if page['text']:
+                    text += page['text'] + "\n"
             
             if text.strip():
-                print("Successfully extracted text using PyMuPDF")
                 return text.strip()
         except Exception as e:
-            print(f"PyMuPDF failed: {str(e)}")
+            print(f"PyMuPDF/pdfplumber extraction failed: {str(e)}")
         
         # Fallback to PyPDF2 (original method)
         try:
             print("Attempting PDF extraction with PyPDF2 (fallback)...")
+            import PyPDF2
+            text = ""
             with open(filepath, 'rb') as file:
                 pdf_reader = PyPDF2.PdfReader(file)
                 for page in pdf_reader.pages:
@@ -92,9 +180,233 @@ class FileHandler:
         # If all methods fail
         raise Exception("All PDF extraction methods failed. The PDF might be corrupted, password-protected, or contain unsupported content.")
     
+    def extract_pdf_pages(self, filepath: str) -> List[Dict[str, Any]]:
+        """
+        Extract PDF text page by page, in parallel for large documents
+        
+        A sample of pages is probed with PyMuPDF first. If most of them come out
+        clean, every page is read with PyMuPDF and only pages whose text looks
+        broken are retried with pdfplumber; otherwise pdfplumber reads them all.
+        
+        Args:
+            filepath: Path to the PDF file
+            
+        Returns:
+            List of {'page', 'text', 'seconds', 'engine'} dicts in page order
+        """
+        return list(self._iter_pdf_pages(filepath))
+    
+    def _iter_pdf_pages(self, filepath: str) -> Iterator[Dict[str, Any]]:
+        """Yield page dicts in page order as soon as each page (or page range) is done"""
+        started = time.perf_counter()
+        try:
+            import fitz
+            with fitz.open(filepath) as doc:
+                page_count = doc.page_count
+                mode = self._choose_pdf_mode(doc)
+        except Exception as e:
+            print(f"PyMuPDF could not open PDF, using pdfplumber: {str(e)}")
+            import pdfplumber
+            with pdfplumber.open(filepath) as pdf:
+                page_count = len(pdf.pages)
+            mode = 'pdfplumber'
+        
+        workers = min(self.pdf_workers, page_count)
+        if workers > 1 and page_count >= self.parallel_min_pages:
+            # Several ranges per worker so one slow range doesn't leave other cores idle
+            range_size = max(1, -(-page_count // (workers * 2)))
+            ranges = [(start, min(start + range_size, page_count)) for start in range(0, page_count, range_size)]
+            results = self._iter_pool_pages(filepath, ranges, mode)
+        else:
+            workers = 1
+            results = _iter_page_range(filepath, 0, page_count, mode, self.pdf_defect_threshold)
+        
+        pages = []
+        for number, text, seconds, engine in results:
+            page = {'page': number, 'text': text, 'seconds': seconds, 'engine': engine}
+            pages.append({'page': number, 'seconds': seconds, 'engine': engine})
+            yield page
+        self._report_page_timings(pages, workers, time.perf_counter() - started)
+    
+    def iter_text(self, filepath: str) -> Iterator[str]:
+        """
+        Stream text out of an uploaded file piece by piece
+        
+        Pieces are yielded as soon as they are extracted (PDF pages in page
+        order, DOCX paragraphs, blocks of a text file); joining them gives the
+        same text as extract_text before its final strip.
+        
+        Args:
+            filepath: Path to the uploaded file
+            
+        Yields:
+            Consecutive pieces of the document text
+        """
+        file_extension = os.path.splitext(filepath)[1].lower()
+        if file_extension == '.pdf':
+            yield from self._iter_pdf_text(filepath)
+        elif file_extension in ('.docx', '.doc'):
+            import docx
+            for paragraph in docx.Document(filepath).paragraphs:
+                yield paragraph.text + "\n"
+        elif file_extension == '.txt':
+            yield from self._iter_txt(filepath)
+        else:
+            raise ValueError(f"Unsupported file format: {file_extension}")
+    
+    def _iter_pdf_text(self, filepath: str) -> Iterator[str]:
+        """Stream PDF page texts, falling back to PyPDF2 if the fast path fails up front"""
+        produced = False
+        try:
+            for page in self._iter_pdf_pages(filepath):
+                if page['text']:
+                    produced = True
+                    yield page['text'] + "\n"
+        except Exception as e:
+            if produced:
+                raise
+            print(f"PyMuPDF/pdfplumber extraction failed: {str(e)}")
+        
+        if not produced:
+            print("Attempting PDF extraction with PyPDF2 (fallback)...")
+            import PyPDF2
+            with open(filepath, 'rb') as file:
+                for page in PyPDF2.PdfReader(file).pages:
+                    page_text = page.extract_text()
+                    if page_text:
+                        yield page_text + "\n"
+    
+    def _iter_txt(self, filepath: str, block_size: int = 64 * 1024) -> Iterator[str]:
+        """Stream a text file in blocks, as latin-1 if it isn't UTF-8 throughout"""
+        with open(filepath, 'r', encoding=self._txt_encoding(filepath, block_size)) as file:
+            yield from iter(lambda: file.read(block_size), '')
+    
+    @staticmethod
+    def _txt_encoding(filepath: str, block_size: int) -> str:
+        """
+        Encoding _extract_from_txt would end up using for the file
+        
+        Checked on the raw bytes before anything is streamed, so a file that
+        stops being UTF-8 past the first block doesn't fail mid-stream.
+        """
+        decoder = codecs.getincrementaldecoder('utf-8')()
+        try:
+            with open(filepath, 'rb') as file:
+                for block in iter(lambda: file.read(block_size), b''):
+                    decoder.decode(block)
+            decoder.decode(b'', final=True)
+        except UnicodeDecodeError:
+            return 'latin-1'
+        return 'utf-8'
+    
+    def estimate_text_length(self, filepath: str) -> Optional[int]:
+        """
+        Cheap estimate of how many characters extraction will produce
+        
+        Used to plan streaming generation before the whole text is available.
+        """
+        file_extension = os.path.splitext(filepath)[1].lower()
+        try:
+            if file_extension == '.pdf':
+                import fitz
+                with fitz.open(filepath) as doc:
+                    # A typical BCS guide page holds roughly 2,500 characters
+                    return doc.page_count * 2500
+            if file_extension in ('.docx', '.doc'):
+                return self._estimate_docx_length(filepath)
+            if file_extension == '.txt':
+                return self._estimate_txt_length(filepath)
+        except Exception as e:
+            print(f"Could not estimate text length of {filepath}: {str(e)}")
+        return None
+    
+    @staticmethod
+    def _estimate_txt_length(filepath: str, sample_size: int = 64 * 1024) -> int:
+        """File size scaled by the characters per byte of its first block (Bangla is 3 bytes a letter)"""
+        size = os.path.getsize(filepath)
+        with open(filepath, 'rb') as file:
+            sample = file.read(sample_size)
+        if not sample:
+            return 0
+        characters = len(codecs.getincrementaldecoder('utf-8')(errors='replace').decode(sample))
+        return size * characters // len(sample)
+    
+    @staticmethod
+    def _estimate_docx_length(filepath: str) -> int:
+        """Length of the w:t text runs in word/document.xml, one newline per paragraph"""
+        with zipfile.ZipFile(filepath) as archive:
+            body = archive.read('word/document.xml').decode('utf-8')
+        text = html.unescape(''.join(_DOCX_TEXT_RUN.findall(body)))
+        return len(text) + body.count('</w:p>')
+    
+    def _choose_pdf_mode(self, doc) -> str:
+        """Probe evenly spaced pages with PyMuPDF and pick "auto" or "pdfplumber" mode"""
+        page_count = doc.page_count
+        if page_count == 0:
+            return 'auto'
+        sample_size = min(self.pdf_probe_pages, page_count)
+        sample = sorted({int(i * page_count / sample_size) for i in range(sample_size)})
+        poor = sum(1 for i in sample if _needs_escalation(doc[i].get_text() or "", self.pdf_defect_threshold))
+        mode = 'pdfplumber' if poor * 2 > len(sample) else 'auto'
+        print(f"PDF engine probe: {poor}/{len(sample)} sampled pages need pdfplumber, using {mode} mode")
+        return mode
+    
+    def _get_pdf_pool(self) -> ProcessPoolExecutor:
+        """
+        Create the extraction process pool on first use (after any worker fork)
+        
+        Pool processes are started by a fork server (spawned where there is
+        none) rather than forked from this process, which may be running
+        request threads.
+        """
+        with self._pdf_pool_lock:
+            if self._pdf_pool is None:
+                method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+                self._pdf_pool = ProcessPoolExecutor(max_workers=self.pdf_workers,
+                                                     mp_context=multiprocessing.get_context(method))
+            return self._pdf_pool
+    
+    def _discard_pdf_pool(self, pool: ProcessPoolExecutor) -> None:
+        """Shut down a broken pool so the next call to _get_pdf_pool builds a new one"""
+        with self._pdf_pool_lock:
+            if self._pdf_pool is pool:
+                self._pdf_pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+    
+    def _iter_pool_pages(self, filepath: str, ranges: List[Tuple[int, int]],
+                         mode: str) -> Iterator[Tuple[int, str, float, str]]:
+        """Extract page ranges on the pool in order, reading serially from where a broken pool stopped"""
+        pool = self._get_pdf_pool()
+        next_page = 0
+        try:
+            futures = [
+                pool.submit(_extract_page_range, filepath, start, end, mode, self.pdf_defect_threshold)
+                for start, end in ranges
+            ]
+            for future in futures:
+                for page in future.result():
+                    yield page
+                    next_page = page[0] + 1
+        except BrokenProcessPool as e:
+            print(f"PDF extraction pool broke ({str(e)}), reading pages {next_page}+ in this process")
+            self._discard_pdf_pool(pool)
+            yield from _iter_page_range(filepath, next_page, ranges[-1][1], mode, self.pdf_defect_threshold)
+    
+    def _report_page_timings(self, pages: List[Dict[str, Any]], workers: int, elapsed: float) -> None:
+        """Print a summary of per-page extraction times"""
+        if not pages:
+            return
+        page_seconds = sum(page['seconds'] for page in pages)
+        slowest = sorted(pages, key=lambda page: page['seconds'], reverse=True)[:3]
+        slowest_report = ", ".join(f"p{page['page'] + 1}={page['seconds']:.2f}s" for page in slowest)
+        escalated = sum(1 for page in pages if page['engine'] == 'pdfplumber')
+        print(f"Extracted {len(pages)} pages in {elapsed:.2f}s with {workers} worker(s), "
+              f"{escalated} via pdfplumber (page time {page_seconds:.2f}s, slowest: {slowest_report})")
+    
     def _extract_from_docx(self, filepath: str) -> str:
         """Extract text from DOCX file"""
         try:
+            import docx
             doc = docx.Document(filepath)
             text = ""
             
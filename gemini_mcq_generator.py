@@ -1,27 +1,53 @@
 import os
 import json
-import random
+import queue
 import re
-from typing import List, Dict, Any
-import google.generativeai as genai
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Dict, Any, Tuple, Iterator, Iterable, Optional
 from dotenv import load_dotenv
+from text_processor import TextProcessor
+from llm_backend import LLMBackend, create_backend
+from json_stream import JSONObjectStream
+from question_schema import QUESTION_LIST_SCHEMA, batch_schema, validate_question
+from metrics import parse_strategies
+from question_strategies import strategies
+from question_dedup import NearDuplicateIndex, comparison_text
 
 # Load environment variables
 load_dotenv()
 
+# "Answer: B", "Correct answer - (C)", "উত্তর: খ" lines in plain-text responses
+_ANSWER_LINE = re.compile(r'^(?:correct\s+)?(?:answer|উত্তর)\s*[:ঃ.\-]?\s*\(?([A-Dক-ঘ])\)?', re.IGNORECASE)
+_BANGLA_LETTERS = {'ক': 'A', 'খ': 'B', 'গ': 'C', 'ঘ': 'D'}
+
 class GeminiMCQGenerator:
     """Simple BCS MCQ Generator using Google Gemini AI"""
     
-    def __init__(self):
-        # Initialize Gemini API
-        api_key = os.getenv('GEMINI_API_KEY')
-        if not api_key:
-            print("⚠️ Warning: GEMINI_API_KEY not found. Using fallback MCQ generation.")
-            self.use_gemini = False
-        else:
-            genai.configure(api_key=api_key)
-            self.use_gemini = True
-            print("✅ Gemini MCQ Generator initialized!")
+    def __init__(self, backend: Optional[LLMBackend] = None):
+        # One long-lived model client shared by all requests and threads
+        # (None when no API key is configured: fallback generation only)
+        self.backend = backend if backend is not None else create_backend()
+        self.use_gemini = self.backend is not None
+        if self.use_gemini:
+            print(f"✅ Gemini MCQ Generator initialized! ({self.backend.name} backend)")
+        
+        # Chunked generation settings: documents are split into chunks that are
+        # sent to Gemini concurrently, each asked for a share of the questions
+        self.text_processor = TextProcessor()
+        self.chunk_size = int(os.getenv('GEMINI_CHUNK_SIZE', 3000))
+        self.max_chunk_calls = int(os.getenv('GEMINI_MAX_CHUNK_CALLS', 8))
+        self.max_concurrency = int(os.getenv('GEMINI_MAX_CONCURRENCY', 4))
+        
+        # Batch generation settings: documents that fit in one chunk share a model
+        # request, up to this much text and this many questions per request
+        self.batch_group_chars = int(os.getenv('GEMINI_BATCH_GROUP_CHARS', 12000))
+        self.batch_max_questions = int(os.getenv('GEMINI_BATCH_MAX_QUESTIONS', 30))
+        
+        # Structured output: ask for JSON following the question schema (enforced by
+        # the API where the SDK supports it) and accept only schema-valid questions
+        self.structured_output = os.getenv('GEMINI_STRUCTURED_OUTPUT', '1').lower() in ('1', 'true', 'yes')
         
         # Fallback questions for when AI is not available
         self.fallback_questions = [
@@ -43,9 +69,19 @@ class GeminiMCQGenerator:
         """
         Generate MCQ questions from text content
         """
+        questions, _ = self.generate_questions_with_source(text, num_questions, difficulty)
+        return questions
+    
+    def generate_questions_with_source(self, text: str, num_questions: int = 10, difficulty: str = "medium") -> Tuple[List[Dict[str, Any]], str]:
+        """
+        Generate MCQ questions and report where they came from
+        
+        Returns:
+            Tuple of (questions, source) where source is "gemini" or "fallback"
+        """
         if not text:
             print("No text provided, using fallback questions")
-            return self.fallback_questions[:num_questions]
+            return self.fallback_questions[:num_questions], "fallback"
         
         print(f"Generating {num_questions} questions from text of length {len(text)}")
         
@@ -54,52 +90,428 @@ class GeminiMCQGenerator:
                 questions = self._generate_with_gemini(text, num_questions, difficulty)
                 if questions and len(questions) > 0:
                     print(f"Successfully generated {len(questions)} questions with Gemini")
-                    return questions[:num_questions]
+                    return questions[:num_questions], "gemini"
                 else:
                     print("Gemini failed to generate questions, using fallback")
-                    return self._generate_fallback_questions(text, num_questions)
+                    return self._generate_fallback_questions(text, num_questions), "fallback"
             except Exception as e:
                 print(f"Gemini error: {str(e)}")
-                return self._generate_fallback_questions(text, num_questions)
+                return self._generate_fallback_questions(text, num_questions), "fallback"
         else:
             print("Gemini not available, using fallback generation")
-            return self._generate_fallback_questions(text, num_questions)
+            return self._generate_fallback_questions(text, num_questions), "fallback"
     
-    def _generate_with_gemini(self, text: str, num_questions: int, difficulty: str) -> List[Dict[str, Any]]:
-        """Generate questions using Gemini AI"""
-        # Improved language detection
-        def is_bangla(text):
-            bangla_chars = sum(1 for c in text if '\u0980' <= c <= '\u09FF')
-            total_chars = len([c for c in text if c.isalpha() or '\u0980' <= c <= '\u09FF'])
+    def iter_questions_with_source(self, text: str, num_questions: int = 10, difficulty: str = "medium") -> Iterator[Tuple[Dict[str, Any], str]]:
+        """
+        Yield MCQ questions as soon as each chunk's response has been parsed
+        
+        Yields:
+            Tuples of (question, source) where source is "gemini" or "fallback"
+        """
+        if not text:
+            print("No text provided, using fallback questions")
+            for question in self.fallback_questions[:num_questions]:
+                yield question, "fallback"
+            return
+        
+        print(f"Streaming {num_questions} questions from text of length {len(text)}")
+        
+        emitted = 0
+        if self.use_gemini:
+            seen = NearDuplicateIndex()
+            try:
+                for question in self._iter_gemini_questions(text, num_questions, difficulty):
+                    if not seen.add(comparison_text(question)):
+                        continue
+                    yield question, "gemini"
+                    emitted += 1
+                    if emitted >= num_questions:
+                        return
+            except Exception as e:
+                print(f"Gemini error: {str(e)}")
+        else:
+            print("Gemini not available, using fallback generation")
+        
+        if emitted == 0:
+            for question in self._generate_fallback_questions(text, num_questions):
+                yield question, "fallback"
+    
+    def _iter_gemini_questions(self, text: str, num_questions: int, difficulty: str) -> Iterator[Dict[str, Any]]:
+        """Yield questions from concurrent chunk calls as soon as each one has been parsed"""
+        plan = self._plan_chunks(text, num_questions)
+        languages = self._chunk_language_instructions(text, plan)
+        results = queue.Queue()
+        stopped = threading.Event()
+        
+        def run(chunk, share, language_instruction):
+            try:
+                for question in self._iter_chunk_questions(chunk, share, language_instruction):
+                    if stopped.is_set():
+                        return
+                    results.put(question)
+            except Exception as e:
+                print(f"Error generating with Gemini: {str(e)}")
+            finally:
+                results.put(None)
+        
+        executor = ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(plan)))
+        try:
+            for (chunk, share), language_instruction in zip(plan, languages):
+                executor.submit(run, chunk, share, language_instruction)
+            running = len(plan)
+            while running:
+                question = results.get()
+                if question is None:
+                    running -= 1
+                else:
+                    yield question
+        finally:
+            # Don't start chunks nobody will read once the consumer has enough
+            stopped.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    def iter_questions_from_chunks(self, chunks: Iterable[str], num_questions: int = 10, difficulty: str = "medium",
+                                   expected_chunks: Optional[int] = None) -> Iterator[Tuple[Dict[str, Any], str]]:
+        """
+        Generate questions while the document is still being extracted
+        
+        Chunks are consumed lazily; every stride-th chunk is sent to Gemini as
+        soon as it arrives, so the first questions can come back before the
+        last page has been parsed. expected_chunks (an estimate) sets the stride
+        so the calls are spread over the whole document; if the estimate was
+        high, the shares of calls that never ran go to the chunks that did.
+        
+        Yields:
+            Tuples of (question, source) where source is "gemini" or "fallback"
+        """
+        max_calls = max(1, min(self.max_chunk_calls, num_questions))
+        expected = max(1, expected_chunks or max_calls)
+        stride = max(1, -(-expected // max_calls))
+        planned_calls = max(1, min(max_calls, -(-expected // stride)))
+        shares = [num_questions // planned_calls + (1 if i < num_questions % planned_calls else 0)
+                  for i in range(planned_calls)]
+        
+        submitted_chunks = []
+        skipped = deque(maxlen=planned_calls)
+        emitted = 0
+        seen = NearDuplicateIndex()
+        
+        def take(questions):
+            nonlocal emitted
+            for question in questions:
+                if emitted >= num_questions or not seen.add(comparison_text(question)):
+                    continue
+                emitted += 1
+                yield question, "gemini"
+        
+        executor = ThreadPoolExecutor(max_workers=min(self.max_concurrency, planned_calls))
+        pending = []
+        
+        def submit(chunk, share):
+            pending.append(executor.submit(
+                self._generate_chunk, chunk, share, self._language_instruction(chunk)
+            ))
+            submitted_chunks.append(chunk)
+        
+        try:
+            for index, chunk in enumerate(chunks):
+                if self.use_gemini and index % stride == 0 and len(submitted_chunks) < planned_calls:
+                    submit(chunk, shares[len(submitted_chunks)])
+                else:
+                    skipped.append(chunk)
+                
+                # Hand back whatever has finished while extraction continues
+                for future in [f for f in pending if f.done()]:
+                    pending.remove(future)
+                    yield from take(future.result())
             
-            if total_chars == 0:
-                return False
+            # The estimate was high: spend the unused shares on the last skipped chunks
+            while self.use_gemini and len(submitted_chunks) < planned_calls and skipped:
+                share = shares[len(submitted_chunks)]
+                if len(skipped) == 1:
+                    share = sum(shares[len(submitted_chunks):])
+                submit(skipped.pop(), share)
+            
+            # Every chunk already has a call and shares are left over: ask the
+            # chunks that ran for them too. A chunk asked again mostly repeats
+            # its first answers, so the extra call asks for its share on top
+            unused = sum(shares[len(submitted_chunks):]) if self.use_gemini else 0
+            ran = submitted_chunks[:]
+            for i, chunk in enumerate(ran if unused else []):
+                extra = unused // len(ran) + (1 if i < unused % len(ran) else 0)
+                if extra:
+                    pending.append(executor.submit(
+                        self._generate_chunk, chunk, shares[i] + extra, self._language_instruction(chunk)
+                    ))
+            
+            for future in as_completed(pending):
+                yield from take(future.result())
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+        if not submitted_chunks and not skipped:
+            raise ValueError("No text to generate questions from")
+        
+        if emitted == 0 or (unused and emitted < num_questions):
+            # Fall back on the chunks we kept (bounded by the number of calls),
+            # or top up what the leftover shares did not bring in
+            text = " ".join(submitted_chunks or list(skipped))
+            for question in self._generate_fallback_questions(text, num_questions):
+                if emitted >= num_questions:
+                    break
+                if seen.add(comparison_text(question)):
+                    emitted += 1
+                    yield question, "fallback"
+    
+    def generate_batch_with_source(self, texts: Dict[Any, str], num_questions: int = 10,
+                                   difficulty: str = "medium") -> Dict[Any, Tuple[List[Dict[str, Any]], str]]:
+        """
+        Generate questions for many documents, letting small ones share model requests
+        
+        Documents that fit in a single chunk are grouped by language and sent
+        together; larger documents go through the usual chunked generation.
+        Shared requests and large documents run concurrently. A document the
+        shared response leaves out is retried on its own.
+        
+        Args:
+            texts: Processed text of each document, keyed by any hashable ID
+            num_questions: Number of questions per document
+            difficulty: Difficulty level (easy, medium, hard)
+            
+        Returns:
+            (questions, source) for each document ID, as from generate_questions_with_source
+        """
+        if not self.use_gemini:
+            return {key: self.generate_questions_with_source(text, num_questions, difficulty)
+                    for key, text in texts.items()}
+        
+        groups, singles = self._plan_batch(texts, num_questions)
+        print(f"Batch of {len(texts)} documents: {len(groups)} shared request(s), "
+              f"{len(singles)} document(s) generated on their own")
+        
+        results = {}
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            def submit_single(key):
+                return executor.submit(self.generate_questions_with_source, texts[key], num_questions, difficulty)
             
-            bangla_ratio = bangla_chars / total_chars
+            single_futures = {key: submit_single(key) for key in singles}
+            group_futures = [(group, executor.submit(self._generate_group, group, num_questions)) for group in groups]
             
-            # More sensitive detection: if more than 15% of alphabetic characters are Bangla
-            return bangla_ratio > 0.15 or bangla_chars > 5
+            for group, future in group_futures:
+                answered = future.result()
+                for key, _ in group:
+                    if answered.get(key):
+                        results[key] = (answered[key], "gemini")
+                    else:
+                        single_futures[key] = submit_single(key)
+            
+            for key, future in single_futures.items():
+                results[key] = future.result()
+        
+        return {key: results[key] for key in texts}
+    
+    def _plan_batch(self, texts: Dict[Any, str], num_questions: int) -> Tuple[List[List[Tuple[Any, str]]], List[Any]]:
+        """
+        Pack small documents into shared requests
+        
+        Returns:
+            Tuple of (groups of (id, text) pairs sharing a request, ids generated on their own)
+        """
+        per_request = self.batch_max_questions // max(1, num_questions)
+        groups, singles = [], []
+        open_groups: Dict[str, List[Tuple[Any, str]]] = {}
+        
+        for key, text in texts.items():
+            if per_request < 2 or len(text) > self.chunk_size:
+                singles.append(key)
+                continue
+            language = self.text_processor.detect_language(text)
+            group = open_groups.get(language)
+            if group is not None and (len(group) >= per_request or
+                                      sum(len(t) for _, t in group) + len(text) > self.batch_group_chars):
+                groups.append(group)
+                group = None
+            if group is None:
+                group = open_groups[language] = []
+            group.append((key, text))
+        groups.extend(open_groups.values())
+        
+        # A group of one gains nothing from the shared prompt
+        singles.extend(group[0][0] for group in groups if len(group) == 1)
+        return [group for group in groups if len(group) > 1], singles
+    
+    def _generate_group(self, group: List[Tuple[Any, str]], num_questions: int) -> Dict[Any, List[Dict[str, Any]]]:
+        """Ask Gemini for questions about several small documents in one request"""
+        language_instruction = self._language_instruction(group[0][1])
+        documents = "\n\n".join(f"Document {number}:\n{text}" for number, (_, text) in enumerate(group, 1))
+        prompt = f"""
+        Generate exactly {num_questions} multiple choice questions for EACH of the {len(group)} documents below.
+        {language_instruction}
+        
+        {documents}
         
-        is_bangla_text = is_bangla(text)
-        bangla_char_count = sum(1 for c in text if '\u0980' <= c <= '\u09FF')
-        print(f"Language detection: {'Bangla' if is_bangla_text else 'English'} (Bangla chars: {bangla_char_count})")
+        Instructions:
+        1. Create questions that test understanding of the content
+        2. Each question must have exactly 4 options (A, B, C, D)
+        3. Only one option should be correct
+        4. Make options realistic and plausible
+        5. Provide clear explanations for correct answers
+        6. Maintain the same language as the input text
+        7. Base each document's questions only on that document
         
-        if is_bangla_text:
-            language_instruction = """
+        Format each question exactly as:
+        {{
+            "question": "Question text here?",
+            "options": ["A) First option", "B) Second option", "C) Third option", "D) Fourth option"],
+            "correct_answer": "A",
+            "explanation": "Brief explanation of why this answer is correct."
+        }}
+        
+        Return ONLY a valid JSON object mapping each document number to its array of questions,
+        like {{"1": [...], "2": [...]}}. Do not include any other text.
+        """
+        
+        try:
+            schema = batch_schema(len(group)) if self.structured_output else None
+            response_text = self.backend.generate(prompt, schema=schema)
+            print(f"Gemini batch response length: {len(response_text)} for {len(group)} documents")
+            return self._parse_group_response(response_text, group, num_questions)
+        except Exception as e:
+            print(f"Error generating batch with Gemini: {str(e)}")
+            return {}
+    
+    def _parse_group_response(self, response_text: str, group: List[Tuple[Any, str]],
+                              num_questions: int) -> Dict[Any, List[Dict[str, Any]]]:
+        """Split a shared response back into per-document question sets"""
+        start = response_text.find('{')
+        end = response_text.rfind('}') + 1
+        try:
+            data = json.loads(response_text[start:end]) if start != -1 else None
+        except json.JSONDecodeError:
+            data = None
+        if not isinstance(data, dict):
+            print("Failed to parse Gemini batch response")
+            parse_strategies.increment('failed')
+            return {}
+        parse_strategies.increment('structured' if self.structured_output else 'json')
+        
+        answered = {}
+        for number, (key, _) in enumerate(group, 1):
+            questions = data.get(str(number), data.get(f"Document {number}"))
+            if not isinstance(questions, list):
+                continue
+            valid = [q for q in questions if self._accept_question(q)]
+            answered[key] = self._merge_question_sets([valid], num_questions)
+        return answered
+    
+    def _generate_with_gemini(self, text: str, num_questions: int, difficulty: str) -> List[Dict[str, Any]]:
+        """Generate questions using Gemini AI, fanning chunks of the document out concurrently"""
+        plan = self._plan_chunks(text, num_questions)
+        languages = self._chunk_language_instructions(text, plan)
+        print(f"Generating from {len(plan)} chunk(s) with up to {self.max_concurrency} concurrent calls")
+        
+        if len(plan) == 1:
+            chunk, share = plan[0]
+            return self._generate_chunk(chunk, share, languages[0])
+        
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(plan))) as executor:
+            question_sets = list(executor.map(
+                lambda item: self._generate_chunk(item[0][0], item[0][1], item[1]),
+                zip(plan, languages)
+            ))
+        
+        questions = self._merge_question_sets(question_sets, num_questions)
+        print(f"Merged {sum(len(qs) for qs in question_sets)} chunk questions into {len(questions)} unique questions")
+        return questions
+    
+    def _language_instruction(self, text: str) -> str:
+        """Build the prompt language instruction for the given text"""
+        return self._instruction_for_language(self.text_processor.detect_language(text))
+    
+    @staticmethod
+    def _instruction_for_language(language: str) -> str:
+        """Prompt language instruction for a detected language ("bn" or "en")"""
+        if language == "bn":
+            return """
             IMPORTANT: Generate all questions, options, and explanations in Bangla (বাংলা ভাষা).
             Use proper Bangla grammar and vocabulary.
             Questions should be in Bangla format like: "বিসিএস পরীক্ষায় কোন বিষয় অন্তর্ভুক্ত?"
             Options should be in Bangla like: "ক) বাংলা ভাষা খ) ইংরেজি ভাষা গ) গণিত ঘ) বিজ্ঞান"
             """
+        return "Generate questions in English."
+    
+    def _chunk_language_instructions(self, text: str, plan: List[Tuple[str, int]]) -> List[str]:
+        """
+        Prompt language instruction for each planned chunk
+        
+        A single chunk uses the whole document's (cached) language; otherwise each
+        chunk is detected on its own so mixed Bangla/English documents get
+        questions in the language of the part they come from.
+        """
+        sources = [text] if len(plan) == 1 else [chunk for chunk, _ in plan]
+        languages = [self.text_processor.detect_language(source) for source in sources]
+        bangla = languages.count("bn")
+        print(f"Language detection: {bangla} Bangla / {len(languages) - bangla} English chunk(s)")
+        return [self._instruction_for_language(language) for language in languages]
+    
+    def _plan_chunks(self, text: str, num_questions: int) -> List[Tuple[str, int]]:
+        """
+        Split text into chunks and give each a proportional share of the questions
+        
+        Returns:
+            List of (chunk_text, question_count) pairs in document order
+        """
+        chunks = self.text_processor.split_into_chunks(text, self.chunk_size) or [text]
+        
+        # Cap the number of model calls; spread the chosen chunks evenly over the document
+        max_calls = max(1, min(self.max_chunk_calls, num_questions, len(chunks)))
+        if len(chunks) > max_calls:
+            step = len(chunks) / max_calls
+            chunks = [chunks[int(i * step)] for i in range(max_calls)]
+        
+        # Every chunk gets one question, the rest is split by length (largest remainder)
+        shares = [1] * len(chunks)
+        remaining = num_questions - len(chunks)
+        if remaining > 0:
+            total_length = sum(len(chunk) for chunk in chunks) or 1
+            exact = [remaining * len(chunk) / total_length for chunk in chunks]
+            extra = [int(value) for value in exact]
+            leftover = remaining - sum(extra)
+            by_remainder = sorted(range(len(chunks)), key=lambda i: exact[i] - extra[i], reverse=True)
+            for i in by_remainder[:leftover]:
+                extra[i] += 1
+            shares = [share + add for share, add in zip(shares, extra)]
+        
+        return list(zip(chunks, shares))
+    
+    def _generate_chunk(self, chunk: str, num_questions: int, language_instruction: str) -> List[Dict[str, Any]]:
+        """Ask Gemini for questions about a single chunk of text"""
+        questions = []
+        try:
+            for question in self._iter_chunk_questions(chunk, num_questions, language_instruction):
+                questions.append(question)
+        except Exception as e:
+            print(f"Error generating with Gemini: {str(e)}")
+        
+        if questions:
+            print(f"Successfully parsed {len(questions)} questions from Gemini")
         else:
-            language_instruction = "Generate questions in English."
+            print("Failed to parse Gemini response, using fallback")
+        return questions
+    
+    def _iter_chunk_questions(self, chunk: str, num_questions: int, language_instruction: str) -> Iterator[Dict[str, Any]]:
+        """
+        Stream Gemini's answer for a chunk, yielding each question as soon as its JSON object closes
         
+        Raises:
+            Exception: Whatever the backend raises; questions yielded before a failure stand
+        """
         # Improved prompt with better instructions
         prompt = f"""
         Generate exactly {num_questions} multiple choice questions based on the following text. 
         {language_instruction}
         
-        Text: {text[:3000]}{"..." if len(text) > 3000 else ""}
+        Text: {chunk}
         
         Instructions:
         1. Create questions that test understanding of the content
@@ -120,65 +532,55 @@ class GeminiMCQGenerator:
         Return ONLY a valid JSON array of questions. Do not include any other text.
         """
         
-        try:
-            model = genai.GenerativeModel('gemini-1.5-flash')
-            response = model.generate_content(prompt)
-            
-            print(f"Gemini response length: {len(response.text)}")
-            print(f"Response preview: {response.text[:200]}...")
-            
-            # Parse response with multiple strategies
-            questions = self._parse_gemini_response(response.text)
-            
-            if questions:
-                print(f"Successfully parsed {len(questions)} questions from Gemini")
-                return questions
-            else:
-                print("Failed to parse Gemini response, using fallback")
-                return []
-                
-        except Exception as e:
-            print(f"Error generating with Gemini: {str(e)}")
-            return []
+        parser = JSONObjectStream()
+        pieces = []
+        emitted = 0
+        schema = QUESTION_LIST_SCHEMA if self.structured_output else None
+        for piece in self.backend.stream(prompt, schema=schema):
+            pieces.append(piece)
+            for question in parser.feed(piece):
+                if self._accept_question(question):
+                    emitted += 1
+                    yield question
+        
+        response_text = ''.join(pieces)
+        print(f"Gemini response length: {len(response_text)}")
+        print(f"Response preview: {response_text[:200]}...")
+        
+        if emitted:
+            parse_strategies.increment('structured' if self.structured_output else 'json')
+            return
+        # No JSON question objects at all: try the plain "Q... A) ..." format
+        questions = self._manual_parse_questions(response_text)
+        parse_strategies.increment('manual' if questions else 'failed')
+        yield from questions
     
-    def _parse_gemini_response(self, response_text: str) -> List[Dict[str, Any]]:
-        """Parse Gemini response with multiple fallback strategies"""
-        # Strategy 1: Look for JSON array
-        if '[' in response_text and ']' in response_text:
-            start = response_text.find('[')
-            end = response_text.rfind(']') + 1
-            json_str = response_text[start:end]
-            
-            try:
-                questions = json.loads(json_str)
-                if isinstance(questions, list) and len(questions) > 0:
-                    valid_questions = []
-                    for q in questions:
-                        if self._validate_question_format(q):
-                            valid_questions.append(q)
-                    if valid_questions:
-                        return valid_questions
-            except json.JSONDecodeError:
-                print("JSON parsing failed, trying alternative parsing")
-        
-        # Strategy 2: Look for individual question blocks
-        questions = []
-        question_pattern = r'\{[^{}]*"question"[^{}]*\}'
-        matches = re.findall(question_pattern, response_text, re.DOTALL)
-        
-        for match in matches:
-            try:
-                question = json.loads(match)
-                if self._validate_question_format(question):
-                    questions.append(question)
-            except json.JSONDecodeError:
-                continue
-        
-        if questions:
-            return questions
-        
-        # Strategy 3: Manual parsing for simple cases
-        return self._manual_parse_questions(response_text)
+    def _accept_question(self, question: Any) -> bool:
+        """Whether a parsed question is usable: schema-valid in structured mode, else the relaxed check"""
+        if not self.structured_output:
+            return self._validate_question_format(question)
+        problems = validate_question(question)
+        if problems:
+            parse_strategies.increment('schema_rejected')
+            print(f"Dropping question that doesn't match the schema: {problems[0]}")
+            return False
+        return True
+    
+    def _merge_question_sets(self, question_sets: List[List[Dict[str, Any]]], num_questions: int) -> List[Dict[str, Any]]:
+        """Interleave per-chunk results round-robin and drop near-duplicate questions"""
+        merged = []
+        seen = NearDuplicateIndex()
+        longest = max((len(qs) for qs in question_sets), default=0)
+        
+        for position in range(longest):
+            for question_set in question_sets:
+                if position >= len(question_set):
+                    continue
+                question = question_set[position]
+                if seen.add(comparison_text(question)):
+                    merged.append(question)
+        
+        return merged[:num_questions]
     
     def _manual_parse_questions(self, response_text: str) -> List[Dict[str, Any]]:
         """Manual parsing for simple question formats"""
@@ -187,22 +589,30 @@ class GeminiMCQGenerator:
         
         current_question = None
         current_options = []
+        current_answer = None
         
         for line in lines:
             line = line.strip()
             if not line:
                 continue
-                
+            
+            # Look for the answer line
+            answer = _ANSWER_LINE.match(line)
+            if answer:
+                letter = answer.group(1).upper()
+                current_answer = _BANGLA_LETTERS.get(letter, letter)
+            
             # Look for question patterns
-            if line.startswith('Q') or line.startswith('Question') or '?' in line:
+            elif line.startswith('Q') or line.startswith('Question') or '?' in line:
                 if current_question and current_options:
                     # Save previous question
-                    question = self._create_question_from_parts(current_question, current_options)
+                    question = self._create_question_from_parts(current_question, current_options, current_answer)
                     if question:
                         questions.append(question)
                 
                 current_question = line
                 current_options = []
+                current_answer = None
             
             # Look for option patterns
             elif line.startswith('A)') or line.startswith('B)') or line.startswith('C)') or line.startswith('D)'):
@@ -210,15 +620,16 @@ class GeminiMCQGenerator:
         
         # Add last question
         if current_question and current_options:
-            question = self._create_question_from_parts(current_question, current_options)
+            question = self._create_question_from_parts(current_question, current_options, current_answer)
             if question:
                 questions.append(question)
         
         return questions
     
-    def _create_question_from_parts(self, question_text: str, options: List[str]) -> Dict[str, Any]:
-        """Create a question from manually parsed parts"""
-        if len(options) != 4:
+    def _create_question_from_parts(self, question_text: str, options: List[str],
+                                    correct_answer: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Create a question from manually parsed parts; without a stated answer the question is unusable"""
+        if len(options) != 4 or not correct_answer:
             return None
         
         # Clean question text
@@ -238,7 +649,7 @@ class GeminiMCQGenerator:
         return {
             "question": question_text,
             "options": cleaned_options,
-            "correct_answer": "A",  # Default to A
+            "correct_answer": correct_answer,
             "explanation": "This answer is correct based on the provided text."
         }
     
@@ -275,192 +686,6 @@ class GeminiMCQGenerator:
         return True
     
     def _generate_fallback_questions(self, text: str, num_questions: int) -> List[Dict[str, Any]]:
-        """Generate fallback questions from text content"""
+        """Generate fallback questions from text content (see question_strategies)"""
         print(f"Generating {num_questions} fallback questions")
-        questions = []
-        
-        # Extract information from text
-        facts = self._extract_facts_from_text(text)
-        concepts = self._extract_important_concepts(text)
-        dates = self._extract_dates(text)
-        numbers = self._extract_numbers(text)
-        
-        print(f"Extracted: {len(facts)} facts, {len(concepts)} concepts, {len(dates)} dates, {len(numbers)} numbers")
-        
-        # Generate different types of questions
-        for i in range(num_questions):
-            question = None
-            
-            if facts and i % 4 == 0:
-                question = self._create_fact_based_question(facts, text)
-            elif concepts and i % 4 == 1:
-                concept = concepts[i % len(concepts)] if i < len(concepts) else random.choice(concepts)
-                question = self._create_concept_question(concept, text)
-            elif dates and i % 4 == 2:
-                question = self._create_date_question(dates, text)
-            elif numbers and i % 4 == 3:
-                question = self._create_number_question(numbers, text)
-            else:
-                question = self._create_generic_question(text)
-            
-            if question and question not in questions:
-                questions.append(question)
-                print(f"Added question {len(questions)}: {question['question'][:50]}...")
-        
-        # If still not enough, add generic questions
-        while len(questions) < num_questions:
-            question = self._create_generic_question(text)
-            if question and question not in questions:
-                questions.append(question)
-                print(f"Added generic question {len(questions)}")
-        
-        print(f"Generated {len(questions)} fallback questions")
-        return questions[:num_questions]
-    
-    def _extract_important_concepts(self, text: str) -> List[str]:
-        """Extract important concepts from text"""
-        # Remove common words and get meaningful terms
-        common_words = {'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'is', 'are', 'was', 'were', 'be', 'been', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could', 'should', 'may', 'might', 'can', 'this', 'that', 'these', 'those', 'a', 'an', 'as', 'from', 'not', 'no', 'yes', 'so', 'if', 'then', 'else', 'when', 'where', 'why', 'how', 'what', 'which', 'who', 'whom', 'whose'}
-        
-        words = text.lower().split()
-        word_freq = {}
-        
-        for word in words:
-            # Clean word (remove punctuation)
-            clean_word = ''.join(c for c in word if c.isalnum())
-            if len(clean_word) > 4 and clean_word not in common_words:
-                word_freq[clean_word] = word_freq.get(clean_word, 0) + 1
-        
-        # Get most frequent words
-        sorted_words = sorted(word_freq.items(), key=lambda x: x[1], reverse=True)
-        return [word for word, freq in sorted_words[:15]]
-    
-    def _extract_facts_from_text(self, text: str) -> List[str]:
-        """Extract factual statements from text"""
-        sentences = text.split('.')
-        facts = []
-        
-        for sentence in sentences:
-            sentence = sentence.strip()
-            if len(sentence) > 20:
-                # Look for factual statements
-                if any(keyword in sentence.lower() for keyword in ['is', 'are', 'was', 'were', 'consists', 'includes', 'contains', 'established', 'created', 'formed']):
-                    facts.append(sentence)
-        
-        return facts[:10]  # Limit to 10 facts
-    
-    def _extract_dates(self, text: str) -> List[str]:
-        """Extract dates from text"""
-        date_pattern = r'\b(19|20)\d{2}\b'
-        dates = re.findall(date_pattern, text)
-        return list(set(dates))
-    
-    def _extract_numbers(self, text: str) -> List[str]:
-        """Extract important numbers from text"""
-        number_pattern = r'\b\d+\b'
-        numbers = re.findall(number_pattern, text)
-        # Filter out common non-important numbers
-        important_numbers = [num for num in numbers if int(num) > 10]
-        return list(set(important_numbers))
-    
-    def _create_fact_based_question(self, facts: List[str], text: str) -> Dict[str, Any]:
-        """Create question based on factual statements"""
-        if not facts:
-            return None
-        
-        fact = random.choice(facts)
-        question_text = "Which of the following statements is correct according to the text?"
-        
-        options = [
-            f"A) {fact[:80]}...",
-            "B) The opposite of what is stated in the text",
-            "C) Information not mentioned in the text",
-            "D) A different interpretation of the text"
-        ]
-        
-        return {
-            "question": question_text,
-            "options": options,
-            "correct_answer": "A",
-            "explanation": f"This fact is directly stated in the text: {fact}"
-        }
-    
-    def _create_concept_question(self, concept: str, text: str) -> Dict[str, Any]:
-        """Create a question based on a concept"""
-        question_text = f"Which statement best describes the role of {concept} according to the provided text?"
-        
-        options = [
-            f"A) {concept} plays an important role as mentioned in the text",
-            f"B) {concept} is not discussed in the text",
-            f"C) {concept} is only briefly mentioned",
-            f"D) {concept} has no significance in the context"
-        ]
-        
-        return {
-            "question": question_text,
-            "options": options,
-            "correct_answer": "A",
-            "explanation": f"The text discusses {concept} in detail, indicating its importance in the context."
-        }
-    
-    def _create_date_question(self, dates: List[str], text: str) -> Dict[str, Any]:
-        """Create question about dates"""
-        if not dates:
-            return None
-        
-        date = random.choice(dates)
-        question_text = f"What significant event occurred in {date}?"
-        
-        options = [
-            f"A) An important development in {date}",
-            f"B) No significant event in {date}",
-            f"C) A different year was more important",
-            f"D) The text doesn't mention {date}"
-        ]
-        
-        return {
-            "question": question_text,
-            "options": options,
-            "correct_answer": "A",
-            "explanation": f"The text mentions {date} as an important year."
-        }
-    
-    def _create_number_question(self, numbers: List[str], text: str) -> Dict[str, Any]:
-        """Create question about numbers"""
-        if not numbers:
-            return None
-        
-        number = random.choice(numbers)
-        question_text = f"What does the number {number} represent in the text?"
-        
-        options = [
-            f"A) An important quantity mentioned in the text",
-            f"B) A random number",
-            f"C) A different number is more important",
-            f"D) The text doesn't mention {number}"
-        ]
-        
-        return {
-            "question": question_text,
-            "options": options,
-            "correct_answer": "A",
-            "explanation": f"The number {number} is mentioned as an important figure in the text."
-        }
-    
-    def _create_generic_question(self, text: str) -> Dict[str, Any]:
-        """Create a generic but relevant question"""
-        question_text = "What is the main topic discussed in the provided text?"
-        
-        options = [
-            "A) The primary subject matter of the text",
-            "B) A secondary topic mentioned briefly",
-            "C) An unrelated topic not discussed",
-            "D) A topic that contradicts the main content"
-        ]
-        
-        return {
-            "question": question_text,
-            "options": options,
-            "correct_answer": "A",
-            "explanation": "This information is directly stated in the text."
-        } 
\ No newline at end of file
+        return strategies.generate(text, num_questions)
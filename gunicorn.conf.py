@@ -0,0 +1,97 @@
+"""
+Gunicorn settings: gunicorn -c gunicorn.conf.py app:app
+
+The app is preloaded in the master and workers are forked from it, so the
+imported modules, the warmed-up document engines and model SDK, and the
+compiled regexes are shared copy-on-write instead of loaded once per
+worker. Each worker then opens its own SQLite connections and starts its
+session sweeper (app.after_fork).
+
+Environment:
+    GUNICORN_WORKER_CLASS: gthread (default), gevent or sync
+    WEB_CONCURRENCY: worker processes (default derived from available cores;
+        always 1 with JOB_STORE=memory, whose async jobs only one process can see)
+    GUNICORN_MAX_WORKERS: cap on the derived worker count (default 8)
+    GUNICORN_THREADS: threads per gthread worker (default 8)
+    GUNICORN_WORKER_CONNECTIONS: greenlets per gevent worker (default 200)
+    GUNICORN_PRELOAD: load the app in the master before forking (default 1)
+    GUNICORN_TIMEOUT / GUNICORN_GRACEFUL_TIMEOUT: hard and graceful worker timeouts
+    GUNICORN_MAX_REQUESTS / GUNICORN_MAX_REQUESTS_JITTER: recycle workers after this many requests
+"""
+
+import gc
+import os
+import sys
+
+def _available_cores() -> int:
+    # The cores this container may use, which can be fewer than the host has
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread').lower()
+if worker_class not in ('gthread', 'gevent', 'sync'):
+    raise ValueError(f"Unsupported GUNICORN_WORKER_CLASS: {worker_class}")
+
+if worker_class == 'gevent':
+    # Patch before the app (and its locks and sockets) is imported by preload;
+    # the SDK's gRPC transport doesn't cooperate with gevent, REST does
+    from gevent import monkey
+    monkey.patch_all()
+    os.environ.setdefault('GEMINI_TRANSPORT', 'rest')
+
+cores = _available_cores()
+# Model calls are I/O-bound waits, so threads/greenlets carry the concurrency
+# and one process per core (plus one) keeps the CPU-bound parsing busy; sync
+# workers handle one request each and follow gunicorn's 2 * cores + 1
+default_workers = 2 * cores + 1 if worker_class == 'sync' else cores + 1
+workers = int(os.getenv('WEB_CONCURRENCY', min(default_workers, int(os.getenv('GUNICORN_MAX_WORKERS', 8)))))
+if os.getenv('JOB_STORE', 'sqlite').lower() == 'memory' and workers > 1:
+    # In-memory job status is per process: a /jobs/<id> poll reaching another
+    # worker would 404, so async jobs need the shared store to scale out
+    print(f"⚠️ JOB_STORE=memory keeps async jobs in one process, running 1 worker instead of {workers}")
+    workers = 1
+threads = int(os.getenv('GUNICORN_THREADS', 8)) if worker_class == 'gthread' else 1
+worker_connections = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', 200))
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+preload_app = os.getenv('GUNICORN_PRELOAD', '1').lower() in ('1', 'true', 'yes')
+
+# Generation waits on model calls with their own deadlines (LLM_CALL_TIMEOUT)
+# and retries, so the hard timeout only catches a truly stuck worker
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 180))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 60))
+keepalive = 5
+
+# Recycle workers gradually to bound memory growth; jitter keeps them from
+# all restarting at once
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 100))
+
+# Worker heartbeat files on tmpfs, so a slow disk can't make workers look hung
+if os.path.isdir('/dev/shm'):
+    worker_tmp_dir = '/dev/shm'
+
+errorlog = '-'
+loglevel = os.getenv('GUNICORN_LOG_LEVEL', 'info')
+
+# Read by app.py: defer per-worker threads to after_fork(), and warm up in
+# the master so workers inherit the loaded engines (the model client's
+# connections are only opened by the first call, inside a worker)
+os.environ['PREFORK_SERVER'] = '1'
+if preload_app:
+    os.environ.setdefault('WARM_UP', 'blocking')
+
+def when_ready(server):
+    if preload_app:
+        # Move everything loaded so far out of the collector's reach so
+        # collections in workers don't write to (and un-share) those pages
+        gc.freeze()
+    server.log.info(f"{workers} {worker_class} workers x {threads if worker_class == 'gthread' else worker_connections} "
+                    f"on {cores} cores, preload {'on' if preload_app else 'off'}, "
+                    f"recycling after {max_requests}±{max_requests_jitter} requests")
+
+def post_worker_init(worker):
+    app_module = sys.modules.get('app')
+    if app_module is not None and hasattr(app_module, 'after_fork'):
+        app_module.after_fork()
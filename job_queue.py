@@ -0,0 +1,270 @@
+import os
+import json
+import time
+import uuid
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+# Statuses of jobs that still have a worker process behind them
+ACTIVE_STATUSES = ('queued', 'running')
+
+class JobBackend:
+    """Runs submitted job callables; subclass to plug in a different executor"""
+
+    def submit(self, task: Callable[[], None]) -> None:
+        raise NotImplementedError
+
+    def shutdown(self) -> None:
+        pass
+
+class ThreadPoolJobBackend(JobBackend):
+    """In-process worker pool backend"""
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers or int(os.getenv('JOB_WORKERS', 4))
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='mcq-job')
+
+    def submit(self, task: Callable[[], None]) -> None:
+        self._executor.submit(task)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False)
+
+class InlineJobBackend(JobBackend):
+    """Local stand-in that runs each job immediately in the calling thread"""
+
+    def submit(self, task: Callable[[], None]) -> None:
+        task()
+
+class JobStore:
+    """Holds job records (status, result, timings) for polling"""
+
+    def put(self, job: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    def update(self, job_id: str, **fields) -> None:
+        raise NotImplementedError
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def prune(self, finished_before: float) -> None:
+        """Forget jobs that finished before the given time"""
+        raise NotImplementedError
+
+    def counts(self) -> Dict[str, int]:
+        """Number of jobs per status"""
+        raise NotImplementedError
+
+    def after_fork(self) -> None:
+        """Reset per-process resources in a forked worker (nothing to do by default)"""
+
+class MemoryJobStore(JobStore):
+    """Per-process job store; only usable when a single process serves the app"""
+
+    def __init__(self):
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def put(self, job: Dict[str, Any]) -> None:
+        with self._lock:
+            self._jobs[job['job_id']] = dict(job)
+
+    def update(self, job_id: str, **fields) -> None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job.update(fields)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def prune(self, finished_before: float) -> None:
+        with self._lock:
+            expired = [
+                job_id for job_id, job in self._jobs.items()
+                if job['finished_at'] is not None and job['finished_at'] < finished_before
+            ]
+            for job_id in expired:
+                del self._jobs[job_id]
+
+    def counts(self) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        with self._lock:
+            for job in self._jobs.values():
+                counts[job['status']] = counts.get(job['status'], 0) + 1
+        return counts
+
+class SQLiteJobStore(JobStore):
+    """Job store shared by all workers on a host through a SQLite file"""
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or os.getenv('JOB_DB_PATH', 'cache/jobs.db')
+
+        directory = os.path.dirname(self.db_path)
+        if directory and self.db_path != ':memory:':
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=10)
+        self._pid = os.getpid()
+        if self.db_path != ':memory:':
+            self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                data TEXT NOT NULL,
+                status TEXT NOT NULL,
+                finished_at REAL
+            )
+        """)
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_finished ON jobs (finished_at)')
+        self._conn.commit()
+
+    def after_fork(self) -> None:
+        if self.db_path == ':memory:' or self._pid == os.getpid():
+            return
+        # Same as QuestionCache.after_fork: a connection of our own, the inherited one left untouched
+        with self._lock:
+            self._inherited_conn = self._conn
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=10)
+            self._pid = os.getpid()
+
+    def _write(self, job: Dict[str, Any]) -> None:
+        self._conn.execute(
+            'INSERT OR REPLACE INTO jobs (job_id, data, status, finished_at) VALUES (?, ?, ?, ?)',
+            (job['job_id'], json.dumps(job, ensure_ascii=False), job['status'], job['finished_at'])
+        )
+        self._conn.commit()
+
+    def put(self, job: Dict[str, Any]) -> None:
+        with self._lock:
+            self._write(job)
+
+    def update(self, job_id: str, **fields) -> None:
+        with self._lock:
+            row = self._conn.execute('SELECT data FROM jobs WHERE job_id = ?', (job_id,)).fetchone()
+            if row is not None:
+                self._write({**json.loads(row[0]), **fields})
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute('SELECT data FROM jobs WHERE job_id = ?', (job_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def prune(self, finished_before: float) -> None:
+        with self._lock:
+            self._conn.execute('DELETE FROM jobs WHERE finished_at < ?', (finished_before,))
+            self._conn.commit()
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute('SELECT status, COUNT(*) FROM jobs GROUP BY status').fetchall()
+        return dict(rows)
+
+def create_job_store() -> JobStore:
+    """
+    Build the job store selected by the JOB_STORE environment variable
+
+    JOB_STORE is "sqlite" (default) or "memory". The memory store keeps jobs
+    inside one process, so it only works with a single server process: under
+    several gunicorn workers a poll can reach a worker that never saw the job.
+    """
+    backend = os.getenv('JOB_STORE', 'sqlite').lower()
+    if backend == 'memory':
+        return MemoryJobStore()
+    if backend == 'sqlite':
+        return SQLiteJobStore()
+    raise ValueError(f"Unsupported job store: {backend}")
+
+class JobQueue:
+    """Tracks background generation jobs by ID so clients can poll for results"""
+
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+
+    def __init__(self, backend: Optional[JobBackend] = None, result_ttl: Optional[int] = None,
+                 store: Optional[JobStore] = None):
+        """
+        Create a job queue
+
+        Args:
+            backend: Executor for job callables (defaults to an in-process thread pool)
+            result_ttl: Seconds finished jobs are kept for polling
+            store: Where job records live (defaults to create_job_store())
+        """
+        self.backend = backend or ThreadPoolJobBackend()
+        self.result_ttl = result_ttl if result_ttl is not None else int(os.getenv('JOB_RESULT_TTL', 3600))
+        self.store = store or create_job_store()
+
+    def enqueue(self, func: Callable[..., Any], *args, **kwargs) -> str:
+        """
+        Queue func(*args, **kwargs) for background execution
+
+        Returns:
+            Job ID to poll with get()
+        """
+        self._prune()
+        job_id = str(uuid.uuid4())
+        self.store.put({
+            'job_id': job_id,
+            'status': self.QUEUED,
+            'result': None,
+            'error': None,
+            'created_at': time.time(),
+            'started_at': None,
+            'finished_at': None,
+            # The process running the job, so a poll served by another worker
+            # can tell when it died (recycled or killed) before finishing
+            'owner_pid': os.getpid()
+        })
+        self.backend.submit(lambda: self._run(job_id, func, args, kwargs))
+        return job_id
+
+    def _run(self, job_id: str, func: Callable[..., Any], args: tuple, kwargs: dict) -> None:
+        """Execute a job and record its outcome"""
+        self.store.update(job_id, status=self.RUNNING, started_at=time.time())
+        try:
+            result = func(*args, **kwargs)
+            self.store.update(job_id, status=self.DONE, result=result, finished_at=time.time())
+        except Exception as e:
+            print(f"Job {job_id} failed: {str(e)}")
+            self.store.update(job_id, status=self.FAILED, error=str(e), finished_at=time.time())
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return a snapshot of the job, or None if it is unknown or expired"""
+        job = self.store.get(job_id)
+        if job is not None and job['status'] in ACTIVE_STATUSES and not _process_alive(job.get('owner_pid')):
+            job.update(status=self.FAILED, error='The worker running this job stopped; please resubmit',
+                       finished_at=time.time())
+            self.store.update(job_id, **{key: job[key] for key in ('status', 'error', 'finished_at')})
+        return job
+
+    def _prune(self) -> None:
+        """Forget finished jobs older than result_ttl"""
+        self.store.prune(time.time() - self.result_ttl)
+
+    def after_fork(self) -> None:
+        self.store.after_fork()
+
+    def stats(self) -> Dict[str, int]:
+        """Count jobs by status"""
+        return {self.QUEUED: 0, self.RUNNING: 0, self.DONE: 0, self.FAILED: 0, **self.store.counts()}
+
+def _process_alive(pid: Optional[int]) -> bool:
+    """Whether pid is a running process on this host (unknown pids count as alive)"""
+    if not pid or pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
@@ -0,0 +1,128 @@
+import re
+import json
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+# Characters that change the parser state outside and inside JSON strings
+_STRUCTURAL = re.compile(r'[{}\[\]"]')
+_STRING_SPECIAL = re.compile(r'["\\]')
+# Before the JSON starts only an opening bracket matters (prose may hold stray quotes)
+_OPENING = re.compile(r'[{\[]')
+# Trailing commas are the most common way model JSON is invalid
+_TRAILING_COMMA = re.compile(r',\s*([}\]])')
+
+def is_question(value: Any) -> bool:
+    """Default filter: an object with a "question" field"""
+    return isinstance(value, dict) and 'question' in value
+
+class JSONObjectStream:
+    """
+    Incremental extractor of JSON objects from streamed model output
+
+    Text is fed in pieces as it arrives. The parser tracks string and
+    bracket state in a single pass and, whenever an object that contains no
+    nested object closes (a question: its options are a list of strings),
+    decodes just that object and returns it if it passes the filter.
+    Enclosing arrays or wrapper objects never need to be complete or valid,
+    so markdown fences, prose and trailing garbage around the JSON, or a
+    response cut off mid-question, cost nothing but the broken part.
+    Only the innermost unfinished object is kept in memory.
+    """
+
+    def __init__(self, accept: Callable[[Any], bool] = is_question):
+        """
+        Args:
+            accept: Filter deciding which decoded objects are returned
+        """
+        self.accept = accept
+        self._buffer = ''
+        self._pos = 0
+        self._in_string = False
+        # Open containers: ['[', start, False] or ['{', start, has_nested_object]
+        self._stack: List[list] = []
+
+    def feed(self, text: str) -> List[Dict[str, Any]]:
+        """
+        Consume the next piece of text
+
+        Returns:
+            Objects completed by this piece, in order
+        """
+        buffer = self._buffer + text
+        pos = self._pos
+        stack = self._stack
+        found = []
+
+        while pos < len(buffer):
+            if self._in_string:
+                match = _STRING_SPECIAL.search(buffer, pos)
+                if not match:
+                    pos = len(buffer)
+                    break
+                if match.group() == '\\':
+                    if match.end() >= len(buffer):
+                        # The escaped character hasn't arrived yet
+                        pos = match.start()
+                        break
+                    pos = match.end() + 1
+                else:
+                    self._in_string = False
+                    pos = match.end()
+                continue
+
+            match = (_STRUCTURAL if stack else _OPENING).search(buffer, pos)
+            if not match:
+                pos = len(buffer)
+                break
+            char, start, pos = match.group(), match.start(), match.end()
+
+            if char == '"':
+                self._in_string = True
+            elif char == '[':
+                stack.append(['[', start, False])
+            elif char == '{':
+                for container in reversed(stack):
+                    if container[0] == '{':
+                        container[2] = True
+                        break
+                stack.append(['{', start, False])
+            else:
+                container = stack.pop()
+                if container[0] == '{' and not container[2]:
+                    value = self._decode(buffer[container[1]:pos])
+                    if value is not None and self.accept(value):
+                        found.append(value)
+
+        # Keep only what the innermost unfinished object still needs (outer
+        # objects hold a nested one, so they are never decoded)
+        keep = pos
+        for container in reversed(stack):
+            if container[0] == '{':
+                if not container[2]:
+                    keep = container[1]
+                break
+        for container in stack:
+            container[1] -= keep
+        self._buffer = buffer[keep:]
+        self._pos = pos - keep
+        return found
+
+    @staticmethod
+    def _decode(text: str) -> Optional[Any]:
+        try:
+            return json.loads(text)
+        except ValueError:
+            pass
+        try:
+            return json.loads(_TRAILING_COMMA.sub(r'\1', text))
+        except ValueError:
+            return None
+
+def iter_json_objects(pieces: Iterable[str], accept: Callable[[Any], bool] = is_question) -> Iterator[Dict[str, Any]]:
+    """Yield each accepted object from streamed text as soon as it is complete"""
+    stream = JSONObjectStream(accept)
+    for piece in pieces:
+        yield from stream.feed(piece)
+
+def parse_json_objects(text: str, accept: Callable[[Any], bool] = is_question) -> List[Dict[str, Any]]:
+    """All accepted objects in a complete response"""
+    return JSONObjectStream(accept).feed(text)
@@ -0,0 +1,382 @@
+import os
+import re
+import json
+import time
+import random
+import hashlib
+import threading
+from typing import List, Dict, Any, Iterator, Optional
+
+class LLMBackend:
+    """Text-in, text-out model client shared by every generation request"""
+
+    name = 'base'
+
+    def generate(self, prompt: str, schema: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Send a prompt and return the model's text response
+
+        Args:
+            prompt: Prompt text
+            schema: JSON schema the response should follow, for backends that can constrain output
+        """
+        raise NotImplementedError
+
+    def stream(self, prompt: str, schema: Optional[Dict[str, Any]] = None) -> Iterator[str]:
+        """Yield the response in pieces as the model produces it (a single piece unless the backend streams)"""
+        yield self.generate(prompt, schema=schema)
+
+class BackendError(RuntimeError):
+    """A model call failed (raised by the fault-injecting and replay backends)"""
+
+class GeminiBackend(LLMBackend):
+    """
+    Google Gemini client holding one long-lived GenerativeModel
+
+    The SDK keeps a single process-wide API client behind GenerativeModel, so
+    connections are already pooled and kept alive by its transport (gRPC
+    channels by default, a pooled HTTP session with GEMINI_TRANSPORT=rest);
+    the SDK doesn't expose keep-alive tuning beyond choosing the transport.
+    What this class saves is building a model object (and resolving the
+    client) on every call. generate() is safe to call from many threads.
+    """
+
+    name = 'gemini'
+
+    def __init__(self, api_key: str, model_name: Optional[str] = None, transport: Optional[str] = None):
+        """
+        Args:
+            api_key: Gemini API key
+            model_name: Model to call (GEMINI_MODEL, default gemini-1.5-flash)
+            transport: "grpc" or "rest" (GEMINI_TRANSPORT, default: the SDK's choice)
+        """
+        self.model_name = model_name or os.getenv('GEMINI_MODEL', 'gemini-1.5-flash')
+        self.transport = transport or os.getenv('GEMINI_TRANSPORT') or None
+        self._api_key = api_key
+
+        # The SDK takes a noticeable share of worker start-up to import, so it
+        # is loaded by the first call (or warm_up())
+        self._genai = None
+        self._structured_output = None
+        self._model = None
+        self._lock = threading.Lock()
+
+    def _sdk(self):
+        """google.generativeai, imported and configured on first use"""
+        if self._genai is None:
+            with self._lock:
+                if self._genai is None:
+                    import google.generativeai as genai
+
+                    options = {'api_key': self._api_key}
+                    if self.transport:
+                        options['transport'] = self.transport
+                    genai.configure(**options)
+
+                    # JSON mode and response schemas arrived in later SDK releases than the
+                    # pinned one; without them the schema is only enforced after parsing
+                    config_fields = set(getattr(getattr(genai, 'GenerationConfig', None), '__dataclass_fields__', ()))
+                    if 'response_schema' in config_fields:
+                        self._structured_output = 'schema'
+                    elif 'response_mime_type' in config_fields:
+                        self._structured_output = 'json'
+                    self._genai = genai
+        return self._genai
+
+    @property
+    def structured_output(self) -> Optional[str]:
+        """'schema', 'json' or None, depending on what the installed SDK supports"""
+        self._sdk()
+        return self._structured_output
+
+    @property
+    def model(self):
+        """The shared GenerativeModel, created on first use"""
+        if self._model is None:
+            genai = self._sdk()
+            with self._lock:
+                if self._model is None:
+                    self._model = genai.GenerativeModel(self.model_name)
+        return self._model
+
+    def warm_up(self) -> None:
+        """Import the SDK and build the model now rather than in the first request"""
+        self.model
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'model': self.model_name,
+            'transport': self.transport or 'default',
+            'structured_output': (self._structured_output or 'validated after parsing') if self._genai
+                                 else 'SDK not loaded yet'
+        }
+
+    def _generation_config(self, schema: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Ask for JSON matching schema, as far as the installed SDK allows"""
+        if schema is None or not self.structured_output:
+            return None
+        if self.structured_output == 'schema':
+            from question_schema import api_schema
+            return {'response_mime_type': 'application/json', 'response_schema': api_schema(schema)}
+        return {'response_mime_type': 'application/json'}
+
+    def generate(self, prompt: str, schema: Optional[Dict[str, Any]] = None) -> str:
+        return self.model.generate_content(prompt, generation_config=self._generation_config(schema)).text
+
+    def stream(self, prompt: str, schema: Optional[Dict[str, Any]] = None) -> Iterator[str]:
+        for chunk in self.model.generate_content(prompt, generation_config=self._generation_config(schema),
+                                                 stream=True):
+            # The closing chunk carries the finish reason and may have no text
+            for part in chunk.parts:
+                if part.text:
+                    yield part.text
+
+_REQUESTED_COUNT = re.compile(r'Generate exactly (\d+)')
+_GROUP_DOCUMENT = re.compile(r'^\s*Document (\d+):\n(.*)$', re.MULTILINE)
+_SINGLE_TEXT = re.compile(r'^\s*Text: (.*)$', re.MULTILINE)
+_MOCK_SENTENCE = re.compile(r'[^.!?।॥]+')
+_MOCK_WORD = re.compile(r'[\w\u0980-\u09FF]{4,}')
+
+class MockBackend(LLMBackend):
+    """
+    Offline backend for development and tests
+
+    Answers the generator's prompts in the same JSON shape as Gemini with
+    fill-in-the-blank questions built from the prompt's own text, so the whole
+    generation path (prompting, parsing, merging, caching) runs without a key
+    or network access. Responses are deterministic.
+    """
+
+    name = 'mock'
+
+    def generate(self, prompt: str, schema: Optional[Dict[str, Any]] = None) -> str:
+        match = _REQUESTED_COUNT.search(prompt)
+        count = int(match.group(1)) if match else 5
+
+        documents = _GROUP_DOCUMENT.findall(prompt)
+        if documents:
+            return json.dumps({number: self._cloze_questions(text, count) for number, text in documents},
+                              ensure_ascii=False)
+
+        match = _SINGLE_TEXT.search(prompt)
+        return json.dumps(self._cloze_questions(match.group(1) if match else prompt, count), ensure_ascii=False)
+
+    def stream(self, prompt: str, schema: Optional[Dict[str, Any]] = None) -> Iterator[str]:
+        # Small pieces, like a streamed model response, so incremental parsing gets exercised
+        response = self.generate(prompt)
+        for start in range(0, len(response), 40):
+            yield response[start:start + 40]
+
+    @staticmethod
+    def _cloze_questions(text: str, count: int) -> List[Dict[str, Any]]:
+        """Blank out the longest word of successive sentences; other words of the text are the distractors"""
+        vocabulary = sorted(set(_MOCK_WORD.findall(text)), key=lambda w: hashlib.md5(w.encode('utf-8')).hexdigest())
+        questions = []
+        for sentence in (s.strip() for s in _MOCK_SENTENCE.findall(text)):
+            if len(questions) >= count:
+                break
+            words = _MOCK_WORD.findall(sentence)
+            if not words:
+                continue
+            answer = max(words, key=len)
+            distractors = [word for word in vocabulary if word != answer][:3]
+            if len(distractors) < 3:
+                continue
+
+            position = len(questions) % 4
+            choices = distractors[:position] + [answer] + distractors[position:]
+            letters = 'ABCD'
+            questions.append({
+                "question": f"Which word completes the statement: \"{sentence.replace(answer, '_____', 1)}\"?",
+                "options": [f"{letters[i]}) {choice}" for i, choice in enumerate(choices)],
+                "correct_answer": letters[position],
+                "explanation": f"The text states: \"{sentence}\"."
+            })
+        return questions
+
+def prompt_hash(prompt: str) -> str:
+    """Key identifying a prompt in a recording"""
+    return hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+
+class RecordingBackend(LLMBackend):
+    """
+    Pass calls through to another backend and append each exchange to a JSONL file
+
+    Recordings made against Gemini can be played back by ReplayBackend to
+    load-test the app with realistic responses but no quota or network.
+    """
+
+    def __init__(self, backend: LLMBackend, path: str):
+        self.backend = backend
+        self.path = path
+        self.name = backend.name
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def generate(self, prompt: str, schema: Optional[Dict[str, Any]] = None) -> str:
+        response = self.backend.generate(prompt, schema=schema)
+        self._record(prompt, response)
+        return response
+
+    def stream(self, prompt: str, schema: Optional[Dict[str, Any]] = None) -> Iterator[str]:
+        pieces = []
+        for piece in self.backend.stream(prompt, schema=schema):
+            pieces.append(piece)
+            yield piece
+        self._record(prompt, ''.join(pieces))
+
+    def _record(self, prompt: str, response: str) -> None:
+        line = json.dumps({'prompt_hash': prompt_hash(prompt), 'response': response}, ensure_ascii=False)
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line + '\n')
+
+class ReplayBackend(LLMBackend):
+    """
+    Answer prompts with responses recorded by RecordingBackend
+
+    A prompt that was recorded gets its own response back. Other prompts get
+    the recorded responses in rotation, unless strict is set, so any document
+    can be pushed through the app; the questions just won't match it.
+    """
+
+    name = 'replay'
+
+    def __init__(self, path: str, strict: bool = False):
+        """
+        Args:
+            path: JSONL recording to play back
+            strict: Raise BackendError for prompts that weren't recorded
+        """
+        self.path = path
+        self.strict = strict
+        self._responses: Dict[str, str] = {}
+        self._rotation: List[str] = []
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    self._responses[record['prompt_hash']] = record['response']
+                    self._rotation.append(record['response'])
+        if not self._rotation:
+            raise ValueError(f"No recorded responses in {path}")
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def generate(self, prompt: str, schema: Optional[Dict[str, Any]] = None) -> str:
+        response = self._responses.get(prompt_hash(prompt))
+        if response is not None:
+            return response
+        if self.strict:
+            raise BackendError("Prompt not found in recording")
+        with self._lock:
+            response = self._rotation[self._next % len(self._rotation)]
+            self._next += 1
+        return response
+
+class FaultInjectingBackend(LLMBackend):
+    """
+    Wrap a backend with simulated latency and failures
+
+    Each call sleeps latency_ms plus a random share of jitter_ms, and fails
+    with BackendError at error_rate, so local backends behave enough like a
+    remote model to measure throughput and tail latency under load.
+    """
+
+    def __init__(self, backend: LLMBackend, latency_ms: float = 0, jitter_ms: float = 0,
+                 error_rate: float = 0.0, seed: Optional[int] = None):
+        """
+        Args:
+            backend: Backend that produces the responses
+            latency_ms: Fixed delay added to every call
+            jitter_ms: Upper bound of a uniformly random extra delay
+            error_rate: Fraction of calls (0-1) that fail instead of answering
+            seed: Seed for reproducible delays and failures
+        """
+        self.backend = backend
+        self.name = backend.name
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def generate(self, prompt: str, schema: Optional[Dict[str, Any]] = None) -> str:
+        self._inject()
+        return self.backend.generate(prompt, schema=schema)
+
+    def stream(self, prompt: str, schema: Optional[Dict[str, Any]] = None) -> Iterator[str]:
+        self._inject()
+        yield from self.backend.stream(prompt, schema=schema)
+
+    def _inject(self) -> None:
+        with self._lock:
+            delay = self.latency_ms + self._random.random() * self.jitter_ms
+            fail = self._random.random() < self.error_rate
+        if delay:
+            time.sleep(delay / 1000)
+        if fail:
+            raise BackendError("Injected model failure")
+
+def backend_stats(backend: LLMBackend) -> Dict[str, Any]:
+    """Stats of a backend and every wrapper around it, keyed by class name"""
+    stats = {}
+    while backend is not None:
+        if hasattr(backend, 'stats'):
+            stats[type(backend).__name__] = backend.stats()
+        backend = getattr(backend, 'backend', None)
+    return stats
+
+def warm_up_backend(backend: Optional[LLMBackend]) -> None:
+    """Load everything a backend (or anything it wraps) defers to its first call"""
+    while backend is not None:
+        if hasattr(backend, 'warm_up'):
+            backend.warm_up()
+        backend = getattr(backend, 'backend', None)
+
+def create_backend() -> Optional[LLMBackend]:
+    """
+    Build the model backend selected by the environment
+
+    LLM_BACKEND is "gemini" (default; needs GEMINI_API_KEY), "mock", or
+    "replay" (plays back LLM_REPLAY_PATH). LLM_RECORD_PATH records every
+    exchange for later replay, and LLM_LATENCY_MS, LLM_LATENCY_JITTER_MS
+    and LLM_ERROR_RATE inject latency and failures. Calls are queued behind
+    the process-wide limits described in rate_limiter.rate_limited and get
+    the deadlines, retries and hedging of resilient_calls.resilient.
+
+    Returns:
+        The backend, or None if Gemini is selected but no API key is set
+    """
+    name = os.getenv('LLM_BACKEND', 'gemini').lower()
+    if name == 'mock':
+        print("⚠️ Using the offline mock model backend (LLM_BACKEND=mock)")
+        backend = MockBackend()
+    elif name == 'replay':
+        path = os.getenv('LLM_REPLAY_PATH', 'cache/llm_recording.jsonl')
+        print(f"⚠️ Replaying recorded model responses from {path} (LLM_BACKEND=replay)")
+        backend = ReplayBackend(path)
+    elif name == 'gemini':
+        api_key = os.getenv('GEMINI_API_KEY')
+        if not api_key:
+            print("⚠️ Warning: GEMINI_API_KEY not found. Using fallback MCQ generation.")
+            return None
+        backend = GeminiBackend(api_key)
+    else:
+        raise ValueError(f"Unsupported model backend: {name}")
+
+    record_path = os.getenv('LLM_RECORD_PATH')
+    if record_path:
+        backend = RecordingBackend(backend, record_path)
+
+    latency_ms = float(os.getenv('LLM_LATENCY_MS', 0))
+    jitter_ms = float(os.getenv('LLM_LATENCY_JITTER_MS', 0))
+    error_rate = float(os.getenv('LLM_ERROR_RATE', 0))
+    if latency_ms or jitter_ms or error_rate:
+        backend = FaultInjectingBackend(backend, latency_ms, jitter_ms, error_rate)
+
+    from rate_limiter import rate_limited
+    from resilient_calls import resilient
+    return resilient(rate_limited(backend))
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Load-test the /generate-mcq path without calling Gemini
+
+Requests go through the Flask app in-process (or to a running server with
+--url) while the model is a local backend: the mock by default, or a replay
+of recorded Gemini responses (LLM_BACKEND=replay, LLM_REPLAY_PATH). Latency
+and failures are injected with --latency-ms, --jitter-ms and --error-rate.
+
+Usage: python load_test.py [--requests N] [--concurrency N] [--latency-ms MS] ...
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+SAMPLE_TEXT = (
+    "The Bangladesh Civil Service was established in 1972. The preliminary examination "
+    "contains two hundred multiple choice questions. Successful candidates sit the written "
+    "examination. The Public Service Commission conducts the recruitment process. "
+    "Officers are assigned to different cadres after the viva voce. Dhaka is the capital "
+    "and largest city of Bangladesh. The Padma is one of the major rivers flowing through "
+    "the country. Bangladesh became independent in 1971 after the Liberation War. "
+)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=200, help='total requests to send')
+    parser.add_argument('--concurrency', type=int, default=8, help='requests in flight at once')
+    parser.add_argument('--questions', type=int, default=10, help='num_questions per request')
+    parser.add_argument('--latency-ms', type=float, default=800, help='simulated model latency')
+    parser.add_argument('--jitter-ms', type=float, default=400, help='random extra model latency')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of model calls that fail')
+    parser.add_argument('--repeat-text', action='store_true',
+                        help='send the same text every time (measures the cache path)')
+    parser.add_argument('--url', help='base URL of a running server instead of the in-process app')
+    return parser.parse_args()
+
+def request_text(index, repeat):
+    """Study material for one request; varied unless repeat so the question cache misses"""
+    if repeat:
+        return SAMPLE_TEXT
+    return f"Practice set {index} covers the following material. " + SAMPLE_TEXT * 3
+
+def in_process_client():
+    """Send requests through the Flask test client"""
+    from app import app
+    client = app.test_client()
+
+    def send(data):
+        response = client.post('/generate-mcq', data=data)
+        return response.status_code, response.get_json()
+    return send
+
+def http_client(base_url):
+    """Send requests to a running server"""
+    url = base_url.rstrip('/') + '/generate-mcq'
+
+    def send(data):
+        body = urllib.parse.urlencode(data).encode('utf-8')
+        try:
+            with urllib.request.urlopen(url, data=body, timeout=300) as response:
+                return response.status, json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            return e.code, None
+    return send
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+def run_load(send, requests, concurrency, questions, repeat_text=False):
+    """
+    Send requests through send with concurrency in flight
+
+    Returns:
+        Dict with wall time, throughput (req/s), sorted latencies (s), status
+        code counts and counts of questions per response
+    """
+    latencies, statuses, question_counts = [], {}, {}
+    lock = threading.Lock()
+
+    def run(index):
+        data = {
+            'text_content': request_text(index, repeat_text),
+            'num_questions': questions,
+            'difficulty': 'medium'
+        }
+        start = time.perf_counter()
+        status, body = send(data)
+        elapsed = time.perf_counter() - start
+        count = len(body.get('questions', [])) if body else 0
+        with lock:
+            latencies.append(elapsed)
+            statuses[status] = statuses.get(status, 0) + 1
+            question_counts[count] = question_counts.get(count, 0) + 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(run, range(requests)))
+    wall = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        'wall': wall,
+        'throughput': requests / wall,
+        'latencies': latencies,
+        'statuses': statuses,
+        'question_counts': question_counts
+    }
+
+def main():
+    args = parse_args()
+
+    if not args.url:
+        # Configure the in-process app before it is imported; explicit env settings win
+        os.environ.setdefault('LLM_BACKEND', 'mock')
+        os.environ.setdefault('QUESTION_CACHE_PATH', ':memory:')
+        os.environ.setdefault('QUESTION_BANK_PATH', ':memory:')
+        os.environ.setdefault('LLM_LATENCY_MS', str(args.latency_ms))
+        os.environ.setdefault('LLM_LATENCY_JITTER_MS', str(args.jitter_ms))
+        os.environ.setdefault('LLM_ERROR_RATE', str(args.error_rate))
+        send = in_process_client()
+    else:
+        send = http_client(args.url)
+
+    print(f"🚀 {args.requests} requests, concurrency {args.concurrency}, "
+          f"model latency {args.latency_ms:.0f}±{args.jitter_ms:.0f} ms, error rate {args.error_rate:.0%}")
+    result = run_load(send, args.requests, args.concurrency, args.questions, args.repeat_text)
+    latencies = result['latencies']
+    print(f"⏱️  Wall time: {result['wall']:.2f}s, throughput: {result['throughput']:.1f} req/s")
+    print(f"📊 Latency p50 {percentile(latencies, 0.50) * 1000:.0f} ms, "
+          f"p95 {percentile(latencies, 0.95) * 1000:.0f} ms, "
+          f"p99 {percentile(latencies, 0.99) * 1000:.0f} ms, "
+          f"max {latencies[-1] * 1000:.0f} ms")
+    print(f"📨 Status codes: {dict(sorted(result['statuses'].items()))}")
+    print(f"❓ Questions per response: {dict(sorted(result['question_counts'].items()))}")
+    return 0 if set(result['statuses']) == {200} else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,28 @@
+import threading
+from typing import Dict
+
+class Counters:
+    """Named counters that many request threads can bump"""
+
+    def __init__(self):
+        self._counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def increment(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counts[name] = self._counts.get(name, 0) + amount
+
+    def snapshot(self) -> Dict[str, int]:
+        """Current counts"""
+        with self._lock:
+            return dict(self._counts)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counts.clear()
+
+# How model responses were turned into questions: "structured" (schema-valid
+# JSON), "json" (JSON objects outside structured mode), "manual" (plain-text
+# line parser), "failed" (nothing usable), plus "schema_rejected" for
+# individual questions dropped by the schema validator
+parse_strategies = Counters()
@@ -0,0 +1,269 @@
+import os
+import re
+import json
+import time
+import random
+import hashlib
+import sqlite3
+import threading
+import unicodedata
+from typing import List, Dict, Any, Optional, Set
+from text_processor import TextProcessor
+from question_dedup import DEFAULT_LSH, DEFAULT_THRESHOLD, comparison_text, jaccard, normalize_text, shingle_set
+
+# Bangla vowel signs, hasanta etc. are combining marks, which FTS5's unicode61
+# tokenizer would otherwise treat as word separators
+_BANGLA_MARKS = ''.join(chr(c) for c in range(0x0980, 0x0A00) if unicodedata.category(chr(c)).startswith('M'))
+_SEARCH_TERM = re.compile(r'[\w\u0980-\u09FF]+')
+
+class QuestionBank:
+    """Persistent store of generated questions, searchable by document, topic, language and difficulty"""
+
+    def __init__(self, db_path: Optional[str] = None, text_processor: Optional[TextProcessor] = None,
+                 dedup_threshold: Optional[float] = None):
+        """
+        Open (or create) the question bank database
+
+        Args:
+            db_path: SQLite file to store questions in
+            text_processor: Used for concept extraction and language detection
+            dedup_threshold: Similarity at or above which a new question counts as a near-duplicate
+        """
+        self.db_path = db_path or os.getenv('QUESTION_BANK_PATH', 'cache/question_bank.db')
+        self.text_processor = text_processor or TextProcessor()
+        self.dedup_threshold = (dedup_threshold if dedup_threshold is not None
+                                else float(os.getenv('QUESTION_DEDUP_THRESHOLD', DEFAULT_THRESHOLD)))
+
+        directory = os.path.dirname(self.db_path)
+        if directory and self.db_path != ':memory:':
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=10)
+        self._pid = os.getpid()
+        if self.db_path != ':memory:':
+            self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS questions (
+                id INTEGER PRIMARY KEY,
+                question_key TEXT NOT NULL UNIQUE,
+                doc_hash TEXT NOT NULL,
+                language TEXT NOT NULL,
+                difficulty TEXT NOT NULL,
+                data TEXT NOT NULL,
+                concepts TEXT NOT NULL,
+                times_served INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_questions_doc ON questions (doc_hash, difficulty)')
+        self._conn.execute(
+            'CREATE INDEX IF NOT EXISTS idx_questions_language ON questions (language, difficulty, times_served)'
+        )
+        # MinHash LSH buckets, so near-duplicates are found without scanning the bank
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS question_bands (
+                band_key TEXT NOT NULL,
+                question_id INTEGER NOT NULL
+            )
+        """)
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_question_bands_key ON question_bands (band_key)')
+
+        # Full-text index over question text and concepts; rowid matches questions.id
+        try:
+            self._conn.execute(f"""
+                CREATE VIRTUAL TABLE IF NOT EXISTS questions_fts USING fts5(
+                    question, concepts, tokenize="unicode61 tokenchars '{_BANGLA_MARKS}'"
+                )
+            """)
+            self.fts_enabled = True
+        except sqlite3.OperationalError:
+            print("⚠️ Warning: SQLite FTS5 not available, topic search falls back to concept matching")
+            self.fts_enabled = False
+        self._conn.commit()
+
+    @staticmethod
+    def document_hash(text: str) -> str:
+        """Hex digest identifying a processed document"""
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _question_key(question: Dict[str, Any]) -> str:
+        """Normalised question text used to keep one copy of each question"""
+        return normalize_text(question.get('question', ''))
+
+    @staticmethod
+    def _is_storable(question: Dict[str, Any]) -> bool:
+        return (isinstance(question, dict) and bool(question.get('question'))
+                and isinstance(question.get('options'), list) and bool(question.get('correct_answer')))
+
+    def add_questions(self, text: str, questions: List[Dict[str, Any]], difficulty: str) -> int:
+        """
+        Store questions generated from a processed document
+
+        Each question is tagged with the document hash, its detected language,
+        the difficulty and the document concepts it mentions. Questions that
+        are already in the bank, or near-duplicates of one, are skipped.
+
+        Args:
+            text: Processed text the questions were generated from
+            questions: Validated questions
+            difficulty: Difficulty level they were generated at
+
+        Returns:
+            Number of questions added
+        """
+        doc_hash = self.document_hash(text)
+        language = self.text_processor.detect_language(text)
+        doc_concepts = self.text_processor.extract_key_concepts(text)
+        now = time.time()
+
+        rows = []
+        for question in questions:
+            if not self._is_storable(question):
+                continue
+            key = self._question_key(question)
+            if not key:
+                continue
+            content = ' '.join([str(question['question'])] + [str(option) for option in question['options']]).lower()
+            concepts = [concept for concept in doc_concepts if concept in content] or doc_concepts[:5]
+            shingles = shingle_set(comparison_text(question))
+            band_keys = DEFAULT_LSH.band_keys(DEFAULT_LSH.signature(shingles))
+            rows.append((str(question['question']), shingles, band_keys, (key, doc_hash, language, difficulty,
+                         json.dumps(question, ensure_ascii=False), ' '.join(concepts), now)))
+
+        added = 0
+        with self._lock:
+            for question_text, shingles, band_keys, row in rows:
+                if self._has_near_duplicate(shingles, band_keys):
+                    continue
+                cursor = self._conn.execute("""
+                    INSERT OR IGNORE INTO questions
+                        (question_key, doc_hash, language, difficulty, data, concepts, created_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                """, row)
+                if cursor.rowcount and self.fts_enabled:
+                    self._conn.execute(
+                        'INSERT INTO questions_fts (rowid, question, concepts) VALUES (?, ?, ?)',
+                        (cursor.lastrowid, question_text, row[5])
+                    )
+                if cursor.rowcount:
+                    self._conn.executemany('INSERT INTO question_bands (band_key, question_id) VALUES (?, ?)',
+                                           [(band_key, cursor.lastrowid) for band_key in band_keys])
+                added += cursor.rowcount
+            self._conn.commit()
+        return added
+
+    def _has_near_duplicate(self, shingles: Set[int], band_keys: List[str]) -> bool:
+        """Whether a banked question sharing an LSH bucket is similar enough to count as the same"""
+        placeholders = ', '.join('?' for _ in band_keys)
+        rows = self._conn.execute(f"""
+            SELECT data FROM questions WHERE id IN (
+                SELECT question_id FROM question_bands WHERE band_key IN ({placeholders})
+            )
+        """, band_keys).fetchall()
+        return any(jaccard(shingles, shingle_set(comparison_text(json.loads(row[0])))) >= self.dedup_threshold
+                   for row in rows)
+
+    def questions_for_document(self, text: str, num_questions: int, difficulty: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Assemble a quiz from questions already generated for this document
+
+        Returns:
+            num_questions banked questions, or None if the bank doesn't hold enough
+        """
+        doc_hash = self.document_hash(text)
+        if self.count(doc_hash=doc_hash, difficulty=difficulty) < num_questions:
+            return None
+        return self.find_questions(num_questions, difficulty=difficulty, doc_hash=doc_hash)
+
+    def find_questions(self, num_questions: int, difficulty: Optional[str] = None, language: Optional[str] = None,
+                       topic: Optional[str] = None, doc_hash: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Query the bank for a quiz
+
+        Without a topic the least served questions come first (ties broken at
+        random), so repeated quizzes on the same material rotate through the
+        bank. With a topic, matches are ranked by full-text relevance.
+
+        Args:
+            num_questions: Maximum number of questions to return
+            difficulty: Only questions generated at this difficulty
+            language: Only questions from documents in this language ("bn" or "en")
+            topic: Free-text topic matched against question text and concepts
+            doc_hash: Only questions generated from this document
+
+        Returns:
+            Up to num_questions questions
+        """
+        conditions, params = [], []
+        for column, value in (('q.difficulty', difficulty), ('q.language', language), ('q.doc_hash', doc_hash)):
+            if value:
+                conditions.append(f'{column} = ?')
+                params.append(value)
+
+        join, order = '', 'q.times_served ASC, random()'
+        if topic:
+            terms = _SEARCH_TERM.findall(topic.lower())
+            if not terms:
+                return []
+            if self.fts_enabled:
+                join = 'JOIN questions_fts ON questions_fts.rowid = q.id'
+                conditions.append('questions_fts MATCH ?')
+                params.append(' OR '.join(f'"{term}"' for term in terms))
+                order = 'bm25(questions_fts), q.times_served ASC'
+            else:
+                conditions.append('(' + ' OR '.join('q.concepts LIKE ?' for _ in terms) + ')')
+                params.extend(f'%{term}%' for term in terms)
+
+        where = ('WHERE ' + ' AND '.join(conditions)) if conditions else ''
+        sql = f'SELECT q.id, q.data FROM questions q {join} {where} ORDER BY {order} LIMIT ?'
+
+        with self._lock:
+            rows = self._conn.execute(sql, params + [int(num_questions)]).fetchall()
+            if rows:
+                self._conn.executemany('UPDATE questions SET times_served = times_served + 1 WHERE id = ?',
+                                       [(row[0],) for row in rows])
+                self._conn.commit()
+
+        questions = [json.loads(row[1]) for row in rows]
+        if not topic:
+            random.shuffle(questions)
+        return questions
+
+    def count(self, doc_hash: Optional[str] = None, difficulty: Optional[str] = None) -> int:
+        """Number of banked questions, optionally for one document and difficulty"""
+        conditions, params = [], []
+        if doc_hash:
+            conditions.append('doc_hash = ?')
+            params.append(doc_hash)
+        if difficulty:
+            conditions.append('difficulty = ?')
+            params.append(difficulty)
+        where = ('WHERE ' + ' AND '.join(conditions)) if conditions else ''
+        with self._lock:
+            return self._conn.execute(f'SELECT COUNT(*) FROM questions {where}', params).fetchone()[0]
+
+    def after_fork(self) -> None:
+        """Open a connection for this process if it was forked after the bank was opened (see QuestionCache.after_fork)"""
+        if self.db_path == ':memory:' or self._pid == os.getpid():
+            return
+        with self._lock:
+            self._inherited_conn = self._conn
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=10)
+            self._pid = os.getpid()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return question counts by language and difficulty"""
+        with self._lock:
+            total = self._conn.execute('SELECT COUNT(*) FROM questions').fetchone()[0]
+            documents = self._conn.execute('SELECT COUNT(DISTINCT doc_hash) FROM questions').fetchone()[0]
+            by_language = dict(self._conn.execute('SELECT language, COUNT(*) FROM questions GROUP BY language'))
+            by_difficulty = dict(self._conn.execute('SELECT difficulty, COUNT(*) FROM questions GROUP BY difficulty'))
+        return {
+            'questions': total,
+            'documents': documents,
+            'by_language': by_language,
+            'by_difficulty': by_difficulty,
+            'full_text_search': self.fts_enabled
+        }
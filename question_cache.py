@@ -0,0 +1,144 @@
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+from typing import List, Dict, Any, Optional
+
+class QuestionCache:
+    """Persistent cache of generated question sets keyed by content hash"""
+
+    def __init__(self, db_path: Optional[str] = None, max_entries: Optional[int] = None,
+                 ttl_seconds: Optional[int] = None):
+        """
+        Open (or create) the cache database
+
+        Args:
+            db_path: SQLite file to store cached question sets in
+            max_entries: Maximum number of question sets kept before LRU eviction
+            ttl_seconds: Seconds a cached question set stays valid
+        """
+        self.db_path = db_path or os.getenv('QUESTION_CACHE_PATH', 'cache/question_cache.db')
+        self.max_entries = max_entries if max_entries is not None else int(os.getenv('QUESTION_CACHE_MAX_ENTRIES', 1000))
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else int(os.getenv('QUESTION_CACHE_TTL', 7 * 24 * 3600))
+
+        directory = os.path.dirname(self.db_path)
+        if directory and self.db_path != ':memory:':
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=10)
+        self._pid = os.getpid()
+        self._conn.execute('PRAGMA journal_mode=WAL' if self.db_path != ':memory:' else 'PRAGMA journal_mode=MEMORY')
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS question_sets (
+                cache_key TEXT PRIMARY KEY,
+                questions TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_question_sets_access ON question_sets (last_access)')
+        self._conn.commit()
+
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(text: str, num_questions: int, difficulty: str) -> str:
+        """
+        Build a cache key from processed text and quiz settings
+
+        Args:
+            text: Output of TextProcessor.process_text
+            num_questions: Number of questions requested
+            difficulty: Difficulty level (easy, medium, hard)
+
+        Returns:
+            Hex digest identifying this question set
+        """
+        text_hash = hashlib.sha256(text.encode('utf-8')).hexdigest()
+        return f"{text_hash}:{int(num_questions)}:{difficulty}"
+
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        """Return the cached question set for key, or None if missing or expired"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT questions, created_at FROM question_sets WHERE cache_key = ?', (key,)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            questions, created_at = row
+            if now - created_at > self.ttl_seconds:
+                self._conn.execute('DELETE FROM question_sets WHERE cache_key = ?', (key,))
+                self._conn.commit()
+                self.misses += 1
+                return None
+
+            self._conn.execute('UPDATE question_sets SET last_access = ? WHERE cache_key = ?', (now, key))
+            self._conn.commit()
+            self.hits += 1
+
+        return json.loads(questions)
+
+    def set(self, key: str, questions: List[Dict[str, Any]]) -> None:
+        """Store a question set and evict least recently used entries over the limit"""
+        now = time.time()
+        payload = json.dumps(questions, ensure_ascii=False)
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO question_sets (cache_key, questions, created_at, last_access) VALUES (?, ?, ?, ?)',
+                (key, payload, now, now)
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float) -> None:
+        """Drop expired entries, then the least recently used ones beyond max_entries"""
+        self._conn.execute('DELETE FROM question_sets WHERE created_at < ?', (now - self.ttl_seconds,))
+        count = self._conn.execute('SELECT COUNT(*) FROM question_sets').fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self._conn.execute("""
+                DELETE FROM question_sets WHERE cache_key IN (
+                    SELECT cache_key FROM question_sets ORDER BY last_access ASC LIMIT ?
+                )
+            """, (overflow,))
+
+    def after_fork(self) -> None:
+        """
+        Give a forked worker its own connection
+
+        A SQLite connection must not be used on both sides of a fork. The
+        inherited one is kept (unused) rather than closed, since closing it
+        here could disturb the parent's WAL state.
+        """
+        if self.db_path == ':memory:' or self._pid == os.getpid():
+            return
+        with self._lock:
+            self._inherited_conn = self._conn
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=10)
+            self._pid = os.getpid()
+
+    def clear(self) -> None:
+        """Remove every cached question set"""
+        with self._lock:
+            self._conn.execute('DELETE FROM question_sets')
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and current size"""
+        with self._lock:
+            size = self._conn.execute('SELECT COUNT(*) FROM question_sets').fetchone()[0]
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'entries': size,
+            'max_entries': self.max_entries,
+            'ttl_seconds': self.ttl_seconds
+        }
@@ -0,0 +1,158 @@
+import os
+import re
+import zlib
+import random
+import hashlib
+import unicodedata
+from typing import List, Dict, Any, Optional, Set, Tuple
+
+# Words are runs of letters/digits plus Bangla combining marks (vowel signs,
+# hasanta), which \w alone would treat as separators
+_TOKEN = re.compile(r'[\w\u0980-\u09FF]+')
+# Zero-width joiners only change how a Bangla conjunct is drawn
+_ZERO_WIDTH = str.maketrans('', '', '\u200c\u200d')
+# "A) ", "খ. " and similar option labels
+_OPTION_LABEL = re.compile(r'^\s*[A-Za-z\u0995-\u0998]\s*[\)\.]\s*')
+_MERSENNE_PRIME = (1 << 61) - 1
+
+def normalize_text(text: str) -> str:
+    """Case-fold and reduce text to its words so punctuation and spacing don't matter"""
+    text = unicodedata.normalize('NFC', str(text)).translate(_ZERO_WIDTH).casefold()
+    return ' '.join(_TOKEN.findall(text))
+
+def shingle_set(text: str, size: int = 4) -> Set[int]:
+    """Hashed character shingles of the normalised text"""
+    normalized = normalize_text(text)
+    if len(normalized) <= size:
+        return {zlib.crc32(normalized.encode('utf-8'))} if normalized else set()
+    return {zlib.crc32(normalized[i:i + size].encode('utf-8')) for i in range(len(normalized) - size + 1)}
+
+def jaccard(a: Set[int], b: Set[int]) -> float:
+    """Jaccard similarity of two shingle sets"""
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+class MinHashLSH:
+    """
+    MinHash signatures with banded locality-sensitive hashing
+
+    Sets whose Jaccard similarity is above roughly (1 / bands) ** (1 / rows)
+    share at least one band key with high probability, so near-duplicates are
+    found by bucket lookup instead of comparing every pair. Signatures use
+    one-permutation hashing: each shingle is hashed once and lands in one of
+    num_perm bins (empty bins borrow from a seeded choice of other bins), so
+    the cost is one hash per shingle rather than one per shingle and
+    permutation. Hashing is seeded, so band keys are stable across processes
+    and can be stored.
+    """
+
+    def __init__(self, num_perm: int = 60, bands: int = 20, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        rng = random.Random(seed)
+        self._a = rng.randrange(1, _MERSENNE_PRIME)
+        self._b = rng.randrange(0, _MERSENNE_PRIME)
+        self._probes = [[rng.randrange(num_perm) for _ in range(num_perm)] for _ in range(num_perm)]
+
+    def signature(self, shingles: Set[int]) -> Tuple[int, ...]:
+        """MinHash signature of a shingle set"""
+        num_perm = self.num_perm
+        bins: List[Optional[int]] = [None] * num_perm
+        for shingle in shingles:
+            value, index = divmod((self._a * shingle + self._b) % _MERSENNE_PRIME, num_perm)
+            current = bins[index]
+            if current is None or value < current:
+                bins[index] = value
+
+        filled = [value for value in bins if value is not None]
+        if not filled:
+            return tuple([_MERSENNE_PRIME] * num_perm)
+
+        # Densify: an empty bin borrows from the first non-empty bin along its own
+        # seeded probe sequence, so neighbouring bins don't all copy one value
+        signature = []
+        for index, value in enumerate(bins):
+            if value is None:
+                value = next((bins[probe] for probe in self._probes[index] if bins[probe] is not None), filled[0])
+            signature.append(value)
+        return tuple(signature)
+
+    def band_keys(self, signature: Tuple[int, ...]) -> List[str]:
+        """One bucket key per band of the signature"""
+        keys = []
+        for band in range(self.bands):
+            rows = signature[band * self.rows:(band + 1) * self.rows]
+            digest = hashlib.blake2b(repr(rows).encode('ascii'), digest_size=8).hexdigest()
+            keys.append(f"{band}:{digest}")
+        return keys
+
+DEFAULT_LSH = MinHashLSH()
+DEFAULT_THRESHOLD = 0.6
+
+# Template-built fallback questions differ only in the filled-in slot, so they
+# are compared at a stricter threshold that only drops repeats of the same fact
+TEMPLATE_DEDUP_THRESHOLD = 0.9
+
+class NearDuplicateIndex:
+    """In-memory index that accepts a text only if nothing similar was added before"""
+
+    def __init__(self, threshold: Optional[float] = None, lsh: Optional[MinHashLSH] = None):
+        """
+        Args:
+            threshold: Shingle Jaccard similarity at or above which texts count as duplicates
+            lsh: Signature/banding scheme (defaults to 60 bins in 20 bands of 3)
+        """
+        self.threshold = threshold if threshold is not None else float(os.getenv('QUESTION_DEDUP_THRESHOLD', DEFAULT_THRESHOLD))
+        self.lsh = lsh or DEFAULT_LSH
+        self._buckets: Dict[str, List[int]] = {}
+        self._shingles: List[Set[int]] = []
+
+    def add(self, text: str) -> bool:
+        """
+        Add text unless it near-duplicates an earlier one
+
+        Returns:
+            True if the text was added, False if it is a near-duplicate
+        """
+        shingles = shingle_set(text)
+        keys = self.lsh.band_keys(self.lsh.signature(shingles))
+
+        candidates = set()
+        for key in keys:
+            candidates.update(self._buckets.get(key, ()))
+        if any(jaccard(shingles, self._shingles[i]) >= self.threshold for i in candidates):
+            return False
+
+        index = len(self._shingles)
+        self._shingles.append(shingles)
+        for key in keys:
+            self._buckets.setdefault(key, []).append(index)
+        return True
+
+    def __len__(self) -> int:
+        return len(self._shingles)
+
+def comparison_text(question: Dict[str, Any]) -> str:
+    """
+    Text of a question used for duplicate detection
+
+    The correct option is included so questions that share a stem but ask
+    about different facts ("What is the capital/currency of ...?") stay apart.
+    """
+    text = str(question.get('question', ''))
+    options = question.get('options')
+    correct = str(question.get('correct_answer', '')).strip().upper()
+    if isinstance(options, list) and len(correct) == 1 and 'A' <= correct <= 'Z':
+        index = ord(correct) - ord('A')
+        if index < len(options):
+            text += ' ' + _OPTION_LABEL.sub('', str(options[index]))
+    return text
+
+def deduplicate_questions(questions: List[Dict[str, Any]], threshold: Optional[float] = None) -> List[Dict[str, Any]]:
+    """Keep the first of each group of near-identical questions, preserving order"""
+    index = NearDuplicateIndex(threshold)
+    return [question for question in questions if index.add(comparison_text(question))]
@@ -0,0 +1,123 @@
+from typing import Any, Callable, Dict, List
+
+# JSON schema of one generated question
+QUESTION_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'question': {'type': 'string', 'minLength': 1},
+        'options': {'type': 'array', 'items': {'type': 'string', 'minLength': 1}, 'minItems': 4, 'maxItems': 4},
+        'correct_answer': {'type': 'string', 'enum': ['A', 'B', 'C', 'D']},
+        'explanation': {'type': 'string'}
+    },
+    'required': ['question', 'options', 'correct_answer', 'explanation']
+}
+
+# Response to a single-chunk prompt
+QUESTION_LIST_SCHEMA = {'type': 'array', 'items': QUESTION_SCHEMA}
+
+def batch_schema(documents: int) -> Dict[str, Any]:
+    """Response to a batch prompt: question arrays keyed by document number"""
+    keys = [str(number) for number in range(1, documents + 1)]
+    return {
+        'type': 'object',
+        'properties': {key: QUESTION_LIST_SCHEMA for key in keys},
+        'required': keys
+    }
+
+_TYPES = {
+    'object': dict,
+    'array': list,
+    'string': str,
+    'integer': int,
+    'number': (int, float),
+    'boolean': bool
+}
+
+# Keywords the Gemini API's response_schema understands (an OpenAPI subset)
+_API_KEYWORDS = {'type', 'properties', 'required', 'items', 'enum', 'description', 'nullable', 'format'}
+
+def compile_schema(schema: Dict[str, Any]) -> Callable[[Any], List[str]]:
+    """
+    Compile a JSON schema into a validator function
+
+    Supports the keywords the question schemas use: type, properties,
+    required, items, enum, minItems, maxItems and minLength. The schema is
+    walked once here; the returned function only runs the resulting checks.
+
+    Returns:
+        Function returning a list of problems with a value (empty if valid)
+    """
+    checks = []
+
+    expected = schema.get('type')
+    if expected:
+        python_type = _TYPES[expected]
+        def check_type(value, path):
+            # bool is an int subclass but not a JSON number
+            if not isinstance(value, python_type) or (isinstance(value, bool) and expected != 'boolean'):
+                return [f"{path or 'value'}: expected {expected}"]
+            return []
+        checks.append(check_type)
+
+    if 'enum' in schema:
+        allowed = set(schema['enum'])
+        checks.append(lambda value, path: [] if value in allowed else [f"{path or 'value'}: not one of {sorted(allowed)}"])
+
+    if 'minLength' in schema:
+        min_length = schema['minLength']
+        checks.append(lambda value, path: [] if len(value) >= min_length else [f"{path or 'value'}: too short"])
+
+    if 'minItems' in schema or 'maxItems' in schema:
+        low, high = schema.get('minItems', 0), schema.get('maxItems', float('inf'))
+        checks.append(lambda value, path: [] if low <= len(value) <= high
+                      else [f"{path or 'value'}: expected {low}-{high} items"])
+
+    if 'items' in schema:
+        validate_item = compile_schema(schema['items'])
+        def check_items(value, path):
+            problems = []
+            for index, item in enumerate(value):
+                problems.extend(validate_item(item, f"{path}[{index}]"))
+            return problems
+        checks.append(check_items)
+
+    if 'required' in schema:
+        required = list(schema['required'])
+        checks.append(lambda value, path: [f"{path}.{key}: missing" for key in required if key not in value])
+
+    if 'properties' in schema:
+        properties = [(key, compile_schema(sub)) for key, sub in schema['properties'].items()]
+        def check_properties(value, path):
+            problems = []
+            for key, validate_property in properties:
+                if key in value:
+                    problems.extend(validate_property(value[key], f"{path}.{key}"))
+            return problems
+        checks.append(check_properties)
+
+    def validate(value: Any, path: str = '') -> List[str]:
+        for check in checks:
+            problems = check(value, path)
+            if problems:
+                # Later checks assume the earlier ones (the type above all) passed
+                return problems
+        return []
+
+    return validate
+
+validate_question = compile_schema(QUESTION_SCHEMA)
+
+def api_schema(schema: Dict[str, Any]) -> Dict[str, Any]:
+    """The schema in the form Gemini's response_schema accepts"""
+    converted = {}
+    for key, value in schema.items():
+        if key not in _API_KEYWORDS:
+            continue
+        if key == 'type':
+            value = value.upper()
+        elif key == 'items':
+            value = api_schema(value)
+        elif key == 'properties':
+            value = {name: api_schema(sub) for name, sub in value.items()}
+        converted[key] = value
+    return converted
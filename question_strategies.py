@@ -0,0 +1,251 @@
+import os
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+from dotenv import load_dotenv
+from document_index import DocumentIndex, index_document
+from distractors import date_question, number_question, shuffled_options, term_question
+from question_dedup import NearDuplicateIndex, TEMPLATE_DEDUP_THRESHOLD, comparison_text
+
+# Load environment variables
+load_dotenv()
+
+# A strategy turns a document index into one question, or None if the
+# document has nothing for it (or the pick it made didn't work out)
+StrategyFunction = Callable[[DocumentIndex, random.Random], Optional[Dict[str, Any]]]
+
+# Consecutive misses (no question, or a near-duplicate) after which a
+# strategy sits out the rest of a document
+MAX_MISSES = 3
+
+class QuestionStrategy:
+    """A registered template generator with its weight and timing counters"""
+
+    def __init__(self, name: str, create: StrategyFunction, weight: float = 1.0):
+        self.name = name
+        self.create = create
+        self.weight = weight
+        self.calls = 0
+        self.questions = 0
+        self.seconds = 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'weight': self.weight,
+            'calls': self.calls,
+            'questions': self.questions,
+            'avg_ms': round(self.seconds / self.calls * 1000, 3) if self.calls else None
+        }
+
+class StrategyRegistry:
+    """
+    Template question generators used when the model is unavailable
+
+    Strategies are picked by smooth weighted round-robin, so each gets a
+    share of the questions proportional to its weight while consecutive
+    questions still rotate between strategies. A weight of 0 disables a
+    strategy. Every call is timed; stats() reports the counters.
+    """
+
+    def __init__(self):
+        self._strategies: Dict[str, QuestionStrategy] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, weight: float = 1.0) -> Callable[[StrategyFunction], StrategyFunction]:
+        """Decorator adding a strategy function under name (replacing any previous one)"""
+        def decorator(create: StrategyFunction) -> StrategyFunction:
+            self._strategies[name] = QuestionStrategy(name, create, weight)
+            return create
+        return decorator
+
+    def set_weight(self, name: str, weight: float) -> None:
+        self._strategies[name].weight = weight
+
+    def configure(self, spec: str) -> None:
+        """Apply weights from a "name=weight,name=weight" string, e.g. FALLBACK_STRATEGY_WEIGHTS"""
+        for entry in spec.split(','):
+            if not entry.strip():
+                continue
+            name, _, weight = entry.partition('=')
+            if name.strip() not in self._strategies:
+                print(f"⚠️ Unknown fallback strategy '{name.strip()}' in weights, ignoring")
+                continue
+            self.set_weight(name.strip(), float(weight))
+
+    @property
+    def names(self) -> List[str]:
+        return list(self._strategies)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {name: strategy.stats() for name, strategy in self._strategies.items()}
+
+    def generate(self, text: str, num_questions: int, rng: random.Random = random) -> List[Dict[str, Any]]:
+        """
+        Generate up to num_questions distinct template questions from text
+
+        Args:
+            text: Processed text content
+            num_questions: Number of questions wanted
+            rng: Random source for the strategies' picks
+
+        Returns:
+            List of questions (fewer if the document runs out of material)
+        """
+        index = index_document(text)
+        seen = NearDuplicateIndex(TEMPLATE_DEDUP_THRESHOLD)
+        questions = []
+        active = [strategy for strategy in self._strategies.values() if strategy.weight > 0]
+        current = {strategy.name: 0.0 for strategy in active}
+        misses = dict.fromkeys(current, 0)
+
+        while active and len(questions) < num_questions:
+            total = sum(strategy.weight for strategy in active)
+            for strategy in active:
+                current[strategy.name] += strategy.weight
+            strategy = max(active, key=lambda candidate: current[candidate.name])
+            current[strategy.name] -= total
+
+            started = time.perf_counter()
+            question = strategy.create(index, rng)
+            elapsed = time.perf_counter() - started
+
+            accepted = question is not None and seen.add(comparison_text(question))
+            with self._lock:
+                strategy.calls += 1
+                strategy.seconds += elapsed
+                strategy.questions += accepted
+            if accepted:
+                questions.append(question)
+                misses[strategy.name] = 0
+            else:
+                misses[strategy.name] += 1
+                if misses[strategy.name] >= MAX_MISSES:
+                    active.remove(strategy)
+
+        print(f"Generated {len(questions)} fallback questions")
+        return questions
+
+# Strategies used by both MCQ generators
+strategies = StrategyRegistry()
+
+def _lettered(answer: str, distractors: List[str], rng: random.Random, question: str, explanation: str) -> Dict[str, Any]:
+    options, correct_answer = shuffled_options(answer, distractors, rng)
+    return {
+        "question": question,
+        "options": options,
+        "correct_answer": correct_answer,
+        "explanation": explanation
+    }
+
+def _preview(sentence: str, length: int) -> str:
+    return sentence[:length] + "..." if len(sentence) > length else sentence
+
+@strategies.register('fact')
+def fact_question(index: DocumentIndex, rng: random.Random) -> Optional[Dict[str, Any]]:
+    """A factual statement from the text against generic wrong answers"""
+    facts = index.facts[:10]
+    if not facts:
+        return None
+    fact = index.sentence(rng.choice(facts))
+    lowered = fact.lower()
+    if 'bcs' in lowered:
+        question_text = "Which of the following statements about BCS is correct according to the text?"
+    elif 'examination' in lowered:
+        question_text = "What is stated about the examination process in the text?"
+    elif 'cadre' in lowered:
+        question_text = "What is mentioned about BCS cadres in the text?"
+    else:
+        question_text = "Which statement is supported by the text?"
+    return _lettered(
+        _preview(fact, 80),
+        ["The opposite of what is stated in the text", "Information not mentioned in the text",
+         "A different interpretation of the text"],
+        rng, question_text, f"This fact is directly stated in the text: {fact}"
+    )
+
+@strategies.register('concept')
+def concept_question(index: DocumentIndex, rng: random.Random) -> Optional[Dict[str, Any]]:
+    """A frequent term blanked out of its sentence, with related terms as distractors"""
+    concepts = index.concepts(20)
+    if not concepts:
+        return None
+    concept = rng.choice(concepts)
+    question = term_question(concept, index, rng)
+    if question:
+        return question
+    # Too few related terms: ask about the concept's role instead
+    concept = index.surface_forms.get(concept, concept)
+    return _lettered(
+        f"{concept} plays an important role as mentioned in the text",
+        [f"{concept} is not discussed in the text", f"{concept} is only briefly mentioned",
+         f"{concept} has no significance in the context"],
+        rng, f"Which statement best describes the role of {concept} according to the provided text?",
+        f"The text discusses {concept} in detail, indicating its importance in the context."
+    )
+
+@strategies.register('date')
+def year_question(index: DocumentIndex, rng: random.Random) -> Optional[Dict[str, Any]]:
+    if not index.dates:
+        return None
+    return date_question(rng.choice(index.dates), index, rng)
+
+@strategies.register('number')
+def quantity_question(index: DocumentIndex, rng: random.Random) -> Optional[Dict[str, Any]]:
+    if not index.numbers:
+        return None
+    return number_question(rng.choice(index.numbers), index, rng)
+
+@strategies.register('definition')
+def definition_question(index: DocumentIndex, rng: random.Random) -> Optional[Dict[str, Any]]:
+    definitions = index.definitions[:5]
+    if not definitions:
+        return None
+    definition = index.sentence(rng.choice(definitions))
+    return _lettered(
+        _preview(definition, 100),
+        ["A different definition", "An incomplete definition", "A definition from another source"],
+        rng, "Which of the following best defines the concept mentioned in the text?",
+        f"This definition is provided in the text: {definition}"
+    )
+
+@strategies.register('comparison')
+def comparison_question(index: DocumentIndex, rng: random.Random) -> Optional[Dict[str, Any]]:
+    """Order of the examination stages, for texts describing them"""
+    if not (index.mentions('preliminary') and index.mentions('written')):
+        return None
+    return _lettered(
+        "Preliminary examination comes before written examination",
+        ["Written examination comes before preliminary examination",
+         "Both examinations are held simultaneously", "There is no sequence mentioned"],
+        rng, "Which of the following comparisons is supported by the text?",
+        "The text describes the examination process in stages: Preliminary Examination, then Written "
+        "Examination, then Viva Voce."
+    )
+
+@strategies.register('process')
+def process_question(index: DocumentIndex, rng: random.Random) -> Optional[Dict[str, Any]]:
+    """Full sequence of the examination stages, for texts describing them"""
+    if not (index.mentions('preliminary') and index.mentions('written') and index.mentions('viva')):
+        return None
+    return _lettered(
+        "Preliminary → Written → Viva Voce",
+        ["Written → Preliminary → Viva Voce", "Viva Voce → Written → Preliminary", "All stages are simultaneous"],
+        rng, "What is the correct sequence of the process described in the text?",
+        "The text clearly states the sequence: Preliminary Examination, Written Examination, and Viva Voce."
+    )
+
+@strategies.register('generic', weight=0.5)
+def main_point_question(index: DocumentIndex, rng: random.Random) -> Optional[Dict[str, Any]]:
+    if not index.long_sentences:
+        return None
+    sentence = index.sentence(rng.choice(index.long_sentences))
+    return _lettered(
+        _preview(sentence, 80),
+        ["Information not mentioned in the text", "A different interpretation", "An unrelated topic"],
+        rng, "What is the main point conveyed in the provided text?",
+        "This information is directly stated in the text."
+    )
+
+strategies.configure(os.getenv('FALLBACK_STRATEGY_WEIGHTS', ''))
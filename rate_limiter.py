@@ -0,0 +1,241 @@
+import os
+import time
+import threading
+from typing import Any, Dict, Iterator, Optional
+from llm_backend import BackendError, LLMBackend
+
+class RateLimitExceeded(BackendError):
+    """A model call waited longer than the configured maximum for capacity"""
+
+class TokenBucket:
+    """
+    Token-bucket rate limiter shared by all threads
+
+    Tokens refill continuously at rate per second up to capacity; each call
+    takes one. Callers wait in acquire() for the next token, up to a timeout.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        Args:
+            rate: Tokens added per second
+            capacity: Largest burst allowed (defaults to one second's worth, at least 1)
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._condition = threading.Condition()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """
+        Take one token, waiting for it if necessary
+
+        Args:
+            timeout: Maximum seconds to wait (None waits indefinitely)
+
+        Returns:
+            True if a token was taken, False if the timeout ran out first
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+                if deadline is not None:
+                    if now + wait > deadline:
+                        return False
+                self._condition.wait(wait)
+
+    @property
+    def tokens(self) -> float:
+        with self._condition:
+            self._refill(time.monotonic())
+            return self._tokens
+
+class ConcurrencyGovernor:
+    """
+    Adaptive limit on the number of model calls in flight (AIMD)
+
+    Every successful call that comes back under the latency target raises
+    the limit by 1/limit, i.e. by about one per round of calls (additive
+    increase). A failed or slow call cuts it by decrease_factor
+    (multiplicative decrease). A burst of failures from calls that were all
+    started before the last cut only counts once, so one overload doesn't
+    collapse the limit to the minimum.
+    """
+
+    def __init__(self, max_limit: int = 16, min_limit: int = 1, initial_limit: Optional[int] = None,
+                 latency_target: Optional[float] = None, decrease_factor: float = 0.5):
+        """
+        Args:
+            max_limit: Highest concurrency the governor will allow
+            min_limit: Concurrency it never drops below
+            initial_limit: Starting concurrency (defaults to half of max_limit)
+            latency_target: Seconds above which a successful call counts as congestion (None: ignore latency)
+            decrease_factor: Multiplier applied to the limit on congestion
+        """
+        self.max_limit = max_limit
+        self.min_limit = max(1, min_limit)
+        self.latency_target = latency_target
+        self.decrease_factor = decrease_factor
+        self._limit = float(initial_limit if initial_limit is not None else max(self.min_limit, max_limit // 2))
+        self._in_flight = 0
+        self._waiting = 0
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for a free slot under the current limit
+
+        Returns:
+            True if a slot was taken (pair with release), False on timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            self._waiting += 1
+            try:
+                while self._in_flight >= int(self._limit):
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        return False
+                    self._condition.wait(remaining)
+                self._in_flight += 1
+                return True
+            finally:
+                self._waiting -= 1
+
+    def release(self, started: float, succeeded: bool, adjust: bool = True) -> None:
+        """
+        Give back a slot and adjust the limit from the call's outcome
+
+        Args:
+            started: time.monotonic() when the call was sent
+            succeeded: Whether the call returned a response
+            adjust: False for a slot given back without making the call, which
+                says nothing about the model and leaves the limit alone
+        """
+        now = time.monotonic()
+        congested = not succeeded or (self.latency_target is not None and now - started > self.latency_target)
+        with self._condition:
+            self._in_flight -= 1
+            if not adjust:
+                pass
+            elif congested:
+                if started >= self._last_decrease:
+                    self._limit = max(float(self.min_limit), self._limit * self.decrease_factor)
+                    self._last_decrease = now
+            else:
+                self._limit = min(float(self.max_limit), self._limit + 1 / self._limit)
+            self._condition.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._condition:
+            return {'limit': int(self._limit), 'in_flight': self._in_flight, 'waiting': self._waiting}
+
+class RateLimitedBackend(LLMBackend):
+    """
+    Backend wrapper that queues calls behind a token bucket and a concurrency governor
+
+    One instance is shared by every request thread in the process. A call
+    waits for a concurrency slot and a token for at most max_wait seconds
+    in total, then fails with RateLimitExceeded rather than queueing forever.
+    """
+
+    def __init__(self, backend: LLMBackend, bucket: Optional[TokenBucket] = None,
+                 governor: Optional[ConcurrencyGovernor] = None, max_wait: float = 30.0):
+        """
+        Args:
+            backend: Backend that makes the calls
+            bucket: Request-rate limit (None: no rate limit)
+            governor: Adaptive concurrency limit (None: no concurrency limit)
+            max_wait: Seconds a call may queue before giving up
+        """
+        self.backend = backend
+        self.name = backend.name
+        self.bucket = bucket
+        self.governor = governor
+        self.max_wait = max_wait
+
+    def _acquire(self) -> float:
+        """Wait for a slot and a token; returns the time the call may start"""
+        deadline = time.monotonic() + self.max_wait
+        if self.governor and not self.governor.acquire(self.max_wait):
+            raise RateLimitExceeded(f"No model call slot free within {self.max_wait:.0f}s")
+        if self.bucket and not self.bucket.acquire(max(0.0, deadline - time.monotonic())):
+            if self.governor:
+                # No call was made: free the slot without growing (or cutting) the limit
+                self.governor.release(time.monotonic(), succeeded=True, adjust=False)
+            raise RateLimitExceeded(f"Model request rate limit not cleared within {self.max_wait:.0f}s")
+        return time.monotonic()
+
+    def generate(self, prompt: str, schema: Optional[Dict[str, Any]] = None) -> str:
+        started = self._acquire()
+        succeeded = False
+        try:
+            response = self.backend.generate(prompt, schema=schema)
+            succeeded = True
+            return response
+        finally:
+            if self.governor:
+                self.governor.release(started, succeeded)
+
+    def stream(self, prompt: str, schema: Optional[Dict[str, Any]] = None) -> Iterator[str]:
+        started = self._acquire()
+        succeeded = False
+        try:
+            yield from self.backend.stream(prompt, schema=schema)
+            succeeded = True
+        except GeneratorExit:
+            # The reader stopped early; the model itself was fine
+            succeeded = True
+            raise
+        finally:
+            if self.governor:
+                self.governor.release(started, succeeded)
+
+    def stats(self) -> Dict[str, Any]:
+        """Current limiter state"""
+        stats = self.governor.stats() if self.governor else {}
+        if self.bucket:
+            stats['tokens'] = round(self.bucket.tokens, 2)
+            stats['rate_per_minute'] = self.bucket.rate * 60
+        return stats
+
+def rate_limited(backend: LLMBackend) -> LLMBackend:
+    """
+    Wrap a backend with the limits configured in the environment
+
+    LLM_RATE_PER_MINUTE caps the request rate (0 or unset: no cap) with bursts
+    of up to LLM_RATE_BURST calls. LLM_MAX_CONCURRENCY and LLM_MIN_CONCURRENCY
+    bound the adaptive concurrency limit, LLM_LATENCY_TARGET_MS marks slow
+    calls as congestion, and LLM_MAX_WAIT is the longest a call queues.
+    """
+    rate_per_minute = float(os.getenv('LLM_RATE_PER_MINUTE', 0))
+    burst = os.getenv('LLM_RATE_BURST')
+    bucket = None
+    if rate_per_minute > 0:
+        bucket = TokenBucket(rate_per_minute / 60, float(burst) if burst else None)
+
+    latency_target_ms = float(os.getenv('LLM_LATENCY_TARGET_MS', 0))
+    governor = ConcurrencyGovernor(
+        max_limit=int(os.getenv('LLM_MAX_CONCURRENCY', 16)),
+        min_limit=int(os.getenv('LLM_MIN_CONCURRENCY', 1)),
+        latency_target=latency_target_ms / 1000 if latency_target_ms > 0 else None
+    )
+    return RateLimitedBackend(backend, bucket, governor, float(os.getenv('LLM_MAX_WAIT', 30)))
@@ -0,0 +1,293 @@
+import os
+import re
+import time
+import queue
+import random
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterator, Optional
+from llm_backend import BackendError, LLMBackend
+from rate_limiter import RateLimitExceeded
+
+class DeadlineExceeded(BackendError):
+    """A model call didn't answer within its deadline"""
+
+# google.api_core exception classes and HTTP failures worth another attempt
+_TRANSIENT_NAMES = {'DeadlineExceeded', 'ServiceUnavailable', 'ResourceExhausted', 'InternalServerError',
+                    'TooManyRequests', 'GatewayTimeout', 'Aborted', 'RetryError'}
+_TRANSIENT_MESSAGE = re.compile(r'\b(?:429|500|502|503|504)\b|timed? ?out|unavailable|exhausted|try again',
+                                re.IGNORECASE)
+
+def is_transient(error: Exception) -> bool:
+    """Whether a failed model call may succeed if repeated"""
+    if isinstance(error, RateLimitExceeded):
+        # Already waited the full max_wait for capacity; retrying only queues again
+        return False
+    if isinstance(error, (BackendError, TimeoutError, ConnectionError)):
+        return True
+    if type(error).__name__ in _TRANSIENT_NAMES:
+        return True
+    return bool(_TRANSIENT_MESSAGE.search(str(error)))
+
+def looks_like_json(response: str) -> bool:
+    """Cheap check that a response could hold the JSON the prompts ask for"""
+    return bool(response) and ('[' in response or '{' in response)
+
+class ResilientBackend(LLMBackend):
+    """
+    Backend wrapper with per-call deadlines, retries and optional hedging
+
+    Each attempt runs on a worker thread and is abandoned once timeout
+    seconds pass (the thread finishes in the background; its answer is
+    dropped). Transient failures are retried up to retries times with
+    exponentially growing, jittered pauses. With hedging on, an attempt
+    still unanswered after hedge_after seconds (by default the p95 of recent
+    call latencies) fires a duplicate request and takes whichever valid
+    answer arrives first, trading a little quota for a shorter tail.
+
+    Streamed calls get the same deadline and retries, but a stream is only
+    retried if it failed before its first piece, and only hedged while
+    waiting for that piece: once pieces are being handed out, switching to
+    another stream would repeat or lose them.
+    """
+
+    def __init__(self, backend: LLMBackend, timeout: float = 60.0, retries: int = 2,
+                 backoff: float = 1.0, backoff_max: float = 10.0, hedge: bool = False,
+                 hedge_after: Optional[float] = None, validator: Callable[[str], bool] = looks_like_json,
+                 max_workers: int = 32):
+        """
+        Args:
+            backend: Backend that makes the calls
+            timeout: Seconds each attempt may take
+            retries: Extra attempts after a transient failure
+            backoff: Pause before the first retry, doubled for each later one
+            backoff_max: Longest pause between retries
+            hedge: Fire a duplicate request when an attempt is slow
+            hedge_after: Seconds before hedging (None: p95 of recent latencies)
+            validator: Accepts a response as a usable answer
+            max_workers: Threads available for in-flight and abandoned calls
+        """
+        self.backend = backend
+        self.name = backend.name
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.hedge = hedge
+        self.hedge_after = hedge_after
+        self.validator = validator
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='llm-call')
+        self._latencies = deque(maxlen=200)
+        self._lock = threading.Lock()
+        self._counters = {'calls': 0, 'retries': 0, 'timeouts': 0, 'hedges': 0, 'hedge_wins': 0}
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    def _timed_call(self, prompt: str, schema: Optional[Dict[str, Any]]) -> str:
+        start = time.monotonic()
+        response = self.backend.generate(prompt, schema=schema)
+        with self._lock:
+            self._latencies.append(time.monotonic() - start)
+        return response
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds to wait before hedging, or None if hedging is off or there's no latency history yet"""
+        if not self.hedge:
+            return None
+        if self.hedge_after is not None:
+            return self.hedge_after
+        with self._lock:
+            if len(self._latencies) < 20:
+                return None
+            latencies = sorted(self._latencies)
+        return latencies[int(0.95 * (len(latencies) - 1))]
+
+    def generate(self, prompt: str, schema: Optional[Dict[str, Any]] = None) -> str:
+        self._count('calls')
+        attempt = 0
+        while True:
+            try:
+                return self._attempt(prompt, schema)
+            except Exception as e:
+                if attempt >= self.retries or not is_transient(e):
+                    raise
+                self._back_off(attempt, e)
+                attempt += 1
+
+    def stream(self, prompt: str, schema: Optional[Dict[str, Any]] = None) -> Iterator[str]:
+        self._count('calls')
+        attempt = 0
+        while True:
+            started = False
+            try:
+                for piece in self._stream_attempt(prompt, schema):
+                    started = True
+                    yield piece
+                return
+            except Exception as e:
+                # Pieces already handed out can't be taken back
+                if started or attempt >= self.retries or not is_transient(e):
+                    raise
+                self._back_off(attempt, e)
+                attempt += 1
+
+    def _back_off(self, attempt: int, error: Exception) -> None:
+        """Sleep before retry number attempt + 1 (exponential, jittered)"""
+        delay = min(self.backoff_max, self.backoff * 2 ** attempt)
+        delay = random.uniform(delay / 2, delay)
+        print(f"⚠️ Model call failed ({str(error)}), retrying in {delay:.1f}s")
+        self._count('retries')
+        time.sleep(delay)
+
+    def _attempt(self, prompt: str, schema: Optional[Dict[str, Any]]) -> str:
+        """One deadline-bound attempt, possibly hedged"""
+        start = time.monotonic()
+        deadline = start + self.timeout
+        hedge_at = self.hedge_delay()
+        primary = self._executor.submit(self._timed_call, prompt, schema)
+        pending = {primary}
+        error: Optional[Exception] = None
+
+        while pending:
+            now = time.monotonic()
+            if now >= deadline:
+                self._count('timeouts')
+                raise DeadlineExceeded(f"Model call exceeded its {self.timeout:.0f}s deadline")
+            timeout = deadline - now
+            if hedge_at is not None:
+                timeout = min(timeout, max(0.0, start + hedge_at - now))
+
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    response = future.result()
+                except Exception as e:
+                    error = e
+                    continue
+                if self.validator(response):
+                    if future is not primary:
+                        self._count('hedge_wins')
+                    return response
+                error = BackendError("Model returned an unusable response")
+
+            if hedge_at is not None and time.monotonic() >= start + hedge_at:
+                # The primary is slow: race a duplicate against it
+                self._count('hedges')
+                pending.add(self._executor.submit(self._timed_call, prompt, schema))
+                hedge_at = None
+
+        raise error
+
+    def _stream_attempt(self, prompt: str, schema: Optional[Dict[str, Any]]) -> Iterator[str]:
+        """
+        One deadline-bound streamed attempt; pieces are pulled on worker threads
+
+        With hedging on, a duplicate stream is started if no piece has arrived
+        by the hedge delay. The first stream to produce a piece is followed
+        and the other one abandoned.
+        """
+        pieces = queue.Queue()
+        producers = []
+
+        def produce(stopped):
+            # The attempt may have timed out while this sat in the executor's
+            # queue; don't spend quota on a call nobody is waiting for
+            if stopped.is_set():
+                return
+            start = time.monotonic()
+            stream = self.backend.stream(prompt, schema=schema)
+            try:
+                for piece in stream:
+                    if stopped.is_set():
+                        return
+                    pieces.put((stopped, piece, None))
+                with self._lock:
+                    self._latencies.append(time.monotonic() - start)
+                pieces.put((stopped, None, None))
+            except Exception as e:
+                pieces.put((stopped, None, e))
+            finally:
+                close = getattr(stream, 'close', None)
+                if close:
+                    close()
+
+        def launch():
+            stopped = threading.Event()
+            producers.append(stopped)
+            self._executor.submit(produce, stopped)
+            return stopped
+
+        start = time.monotonic()
+        deadline = start + self.timeout
+        hedge_at = self.hedge_delay()
+        primary = launch()
+        followed = None  # the producer whose pieces are passed on
+        try:
+            while True:
+                now = time.monotonic()
+                timeout = deadline - now
+                if followed is None and hedge_at is not None:
+                    timeout = min(timeout, start + hedge_at - now)
+                try:
+                    source, piece, error = pieces.get(timeout=max(0.0, timeout))
+                except queue.Empty:
+                    if followed is None and hedge_at is not None and time.monotonic() < deadline:
+                        # Nothing from the primary yet: race a duplicate against it
+                        self._count('hedges')
+                        launch()
+                        hedge_at = None
+                        continue
+                    self._count('timeouts')
+                    raise DeadlineExceeded(f"Model call exceeded its {self.timeout:.0f}s deadline")
+                if followed is not None and source is not followed:
+                    continue
+                if error is not None:
+                    producers.remove(source)
+                    if followed is None and producers:
+                        # The other stream hasn't failed yet
+                        continue
+                    raise error
+                if followed is None:
+                    followed = source
+                    if source is not primary:
+                        self._count('hedge_wins')
+                    for stopped in producers:
+                        if stopped is not source:
+                            stopped.set()
+                if piece is None:
+                    return
+                yield piece
+        finally:
+            for stopped in producers:
+                stopped.set()
+
+    def stats(self) -> Dict[str, Any]:
+        """Call counters and the current hedging delay"""
+        with self._lock:
+            stats = dict(self._counters)
+        delay = self.hedge_delay()
+        stats['hedge_after_ms'] = round(delay * 1000) if delay is not None else None
+        return stats
+
+def resilient(backend: LLMBackend) -> LLMBackend:
+    """
+    Wrap a backend with the deadline, retry and hedging settings from the environment
+
+    LLM_CALL_TIMEOUT is each attempt's deadline in seconds, LLM_RETRIES the
+    number of retries on transient errors, LLM_RETRY_BACKOFF and
+    LLM_RETRY_BACKOFF_MAX the first and longest pause. LLM_HEDGE=1 turns on
+    hedging after LLM_HEDGE_AFTER_MS, or the recent p95 latency if unset.
+    """
+    hedge_after_ms = os.getenv('LLM_HEDGE_AFTER_MS')
+    return ResilientBackend(
+        backend,
+        timeout=float(os.getenv('LLM_CALL_TIMEOUT', 60)),
+        retries=int(os.getenv('LLM_RETRIES', 2)),
+        backoff=float(os.getenv('LLM_RETRY_BACKOFF', 1.0)),
+        backoff_max=float(os.getenv('LLM_RETRY_BACKOFF_MAX', 10)),
+        hedge=os.getenv('LLM_HEDGE', '').lower() in ('1', 'true', 'yes'),
+        hedge_after=float(hedge_after_ms) / 1000 if hedge_after_ms else None
+    )
@@ -0,0 +1,334 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+class SessionStore:
+    """Stores upload sessions (processed text plus file metadata) with expiry"""
+
+    def __init__(self, ttl_seconds: Optional[int] = None):
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else int(os.getenv('SESSION_TTL', 3600))
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Return session data and extend its expiry, or None if missing or expired"""
+        raise NotImplementedError
+
+    def set(self, session_id: str, data: Dict[str, Any]) -> None:
+        """Create or replace a session"""
+        raise NotImplementedError
+
+    def add(self, session_id: str, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Create a session unless one already exists, atomically
+
+        An existing session (even one expired but not yet swept) is kept and
+        its expiry extended, so concurrent uploads of the same document don't
+        replace each other's session and orphan its file.
+
+        Returns:
+            The existing session's data, or None if data was stored
+        """
+        raise NotImplementedError
+
+    def delete(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Remove a session and return its data"""
+        raise NotImplementedError
+
+    def pop_expired(self) -> List[Dict[str, Any]]:
+        """Remove expired (or evicted) sessions and return their data for cleanup"""
+        raise NotImplementedError
+
+    def after_fork(self) -> None:
+        """Reset per-process resources in a forked worker (nothing to do by default)"""
+
+class MemorySessionStore(SessionStore):
+    """Per-process session store with LRU eviction and sliding TTL"""
+
+    def __init__(self, ttl_seconds: Optional[int] = None, max_entries: Optional[int] = None):
+        super().__init__(ttl_seconds)
+        self.max_entries = max_entries if max_entries is not None else int(os.getenv('SESSION_MAX_ENTRIES', 1000))
+        self._sessions: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._evicted: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return None
+            data, expires_at = entry
+            if expires_at < now:
+                return None
+            self._sessions[session_id] = (data, now + self.ttl_seconds)
+            self._sessions.move_to_end(session_id)
+            return data
+
+    def set(self, session_id: str, data: Dict[str, Any]) -> None:
+        with self._lock:
+            self._store(session_id, data)
+
+    def add(self, session_id: str, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is not None:
+                self._store(session_id, entry[0])
+                return entry[0]
+            self._store(session_id, data)
+            return None
+
+    def _store(self, session_id: str, data: Dict[str, Any]) -> None:
+        self._sessions[session_id] = (data, time.time() + self.ttl_seconds)
+        self._sessions.move_to_end(session_id)
+        while len(self._sessions) > self.max_entries:
+            _, (evicted, _) = self._sessions.popitem(last=False)
+            self._evicted.append(evicted)
+
+    def delete(self, session_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._sessions.pop(session_id, None)
+            return entry[0] if entry else None
+
+    def pop_expired(self) -> List[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            expired = [sid for sid, (_, expires_at) in self._sessions.items() if expires_at < now]
+            removed = [self._sessions.pop(sid)[0] for sid in expired]
+            removed.extend(self._evicted)
+            self._evicted = []
+        return removed
+
+class SQLiteSessionStore(SessionStore):
+    """Session store shared by all workers on a host through a SQLite file"""
+
+    def __init__(self, db_path: Optional[str] = None, ttl_seconds: Optional[int] = None):
+        super().__init__(ttl_seconds)
+        self.db_path = db_path or os.getenv('SESSION_DB_PATH', 'cache/sessions.db')
+
+        directory = os.path.dirname(self.db_path)
+        if directory and self.db_path != ':memory:':
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=10)
+        self._pid = os.getpid()
+        if self.db_path != ':memory:':
+            self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS sessions (
+                session_id TEXT PRIMARY KEY,
+                data TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_sessions_expiry ON sessions (expires_at)')
+        self._conn.commit()
+
+    def after_fork(self) -> None:
+        if self.db_path == ':memory:' or self._pid == os.getpid():
+            return
+        # Same as QuestionCache.after_fork: a connection of our own, the inherited one left untouched
+        with self._lock:
+            self._inherited_conn = self._conn
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=10)
+            self._pid = os.getpid()
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT data FROM sessions WHERE session_id = ? AND expires_at >= ?', (session_id, now)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                'UPDATE sessions SET expires_at = ? WHERE session_id = ?', (now + self.ttl_seconds, session_id)
+            )
+            self._conn.commit()
+        return json.loads(row[0])
+
+    def set(self, session_id: str, data: Dict[str, Any]) -> None:
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO sessions (session_id, data, expires_at) VALUES (?, ?, ?)',
+                (session_id, json.dumps(data, ensure_ascii=False), time.time() + self.ttl_seconds)
+            )
+            self._conn.commit()
+
+    def add(self, session_id: str, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        expires_at = time.time() + self.ttl_seconds
+        with self._lock:
+            # Take the write lock up front so another worker can't insert in between
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                row = self._conn.execute('SELECT data FROM sessions WHERE session_id = ?', (session_id,)).fetchone()
+                if row is None:
+                    self._conn.execute(
+                        'INSERT INTO sessions (session_id, data, expires_at) VALUES (?, ?, ?)',
+                        (session_id, json.dumps(data, ensure_ascii=False), expires_at)
+                    )
+                else:
+                    self._conn.execute('UPDATE sessions SET expires_at = ? WHERE session_id = ?',
+                                       (expires_at, session_id))
+                self._conn.commit()
+            except BaseException:
+                self._conn.rollback()
+                raise
+        return json.loads(row[0]) if row else None
+
+    def delete(self, session_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute('SELECT data FROM sessions WHERE session_id = ?', (session_id,)).fetchone()
+            self._conn.execute('DELETE FROM sessions WHERE session_id = ?', (session_id,))
+            self._conn.commit()
+        return json.loads(row[0]) if row else None
+
+    def pop_expired(self) -> List[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            # One write transaction, so a session revived by add() in another
+            # worker is either swept whole or not at all
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                rows = self._conn.execute('SELECT data FROM sessions WHERE expires_at < ?', (now,)).fetchall()
+                self._conn.execute('DELETE FROM sessions WHERE expires_at < ?', (now,))
+                self._conn.commit()
+            except BaseException:
+                self._conn.rollback()
+                raise
+        return [json.loads(row[0]) for row in rows]
+
+class RedisSessionStore(SessionStore):
+    """
+    Session store on a Redis-compatible server
+
+    Expiry times are kept in a sorted set so the sweeper can find expired
+    sessions (and their uploaded files) before Redis drops the keys itself.
+    """
+
+    def __init__(self, client, ttl_seconds: Optional[int] = None, prefix: str = 'mcq:session:'):
+        super().__init__(ttl_seconds)
+        self.client = client
+        self.prefix = prefix
+        self.expiry_key = prefix + 'expiry'
+        # Let Redis hold keys a little past their expiry so the sweeper can still read them
+        self.grace_seconds = 600
+
+    def _key(self, session_id: str) -> str:
+        return self.prefix + session_id
+
+    @staticmethod
+    def _decode(raw) -> Optional[Dict[str, Any]]:
+        if raw is None:
+            return None
+        if isinstance(raw, bytes):
+            raw = raw.decode('utf-8')
+        return json.loads(raw)
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        score = self.client.zscore(self.expiry_key, session_id)
+        if score is None or score < now:
+            return None
+        data = self._decode(self.client.get(self._key(session_id)))
+        if data is not None:
+            self.client.zadd(self.expiry_key, {session_id: now + self.ttl_seconds})
+            self.client.expire(self._key(session_id), self.ttl_seconds + self.grace_seconds)
+        return data
+
+    def set(self, session_id: str, data: Dict[str, Any]) -> None:
+        self.client.set(self._key(session_id), json.dumps(data, ensure_ascii=False),
+                        ex=self.ttl_seconds + self.grace_seconds)
+        self.client.zadd(self.expiry_key, {session_id: time.time() + self.ttl_seconds})
+
+    def add(self, session_id: str, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        stored = self.client.set(self._key(session_id), json.dumps(data, ensure_ascii=False),
+                                 ex=self.ttl_seconds + self.grace_seconds, nx=True)
+        existing = None if stored else self._decode(self.client.get(self._key(session_id)))
+        if not stored and existing is None:
+            # Swept between the two calls: nothing left to keep
+            self.set(session_id, data)
+            return None
+        self.client.zadd(self.expiry_key, {session_id: time.time() + self.ttl_seconds})
+        if existing is not None:
+            self.client.expire(self._key(session_id), self.ttl_seconds + self.grace_seconds)
+        return existing
+
+    def delete(self, session_id: str) -> Optional[Dict[str, Any]]:
+        data = self._decode(self.client.get(self._key(session_id)))
+        self.client.delete(self._key(session_id))
+        self.client.zrem(self.expiry_key, session_id)
+        return data
+
+    def pop_expired(self) -> List[Dict[str, Any]]:
+        removed = []
+        for session_id in self.client.zrangebyscore(self.expiry_key, 0, time.time()):
+            if isinstance(session_id, bytes):
+                session_id = session_id.decode('utf-8')
+            # zrem returns 0 if another worker's sweeper already claimed this session
+            if not self.client.zrem(self.expiry_key, session_id):
+                continue
+            data = self._decode(self.client.get(self._key(session_id)))
+            self.client.delete(self._key(session_id))
+            if data is not None:
+                removed.append(data)
+        return removed
+
+class SessionSweeper:
+    """Background thread that drops expired sessions and deletes their uploaded files"""
+
+    def __init__(self, store: SessionStore, file_handler, interval: Optional[int] = None):
+        self.store = store
+        self.file_handler = file_handler
+        self.interval = interval if interval is not None else int(os.getenv('SESSION_SWEEP_INTERVAL', 300))
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def sweep(self) -> int:
+        """Remove expired sessions once; returns the number removed"""
+        expired = self.store.pop_expired()
+        for data in expired:
+            filepath = data.get('filepath')
+            if filepath:
+                self.file_handler.cleanup_file(filepath)
+        if expired:
+            print(f"Session sweeper removed {len(expired)} expired session(s)")
+        return len(expired)
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.sweep()
+            except Exception as e:
+                print(f"Session sweep failed: {str(e)}")
+
+    def start(self) -> None:
+        """Start sweeping in a daemon thread (no-op if already running)"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name='session-sweeper', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+def create_session_store() -> SessionStore:
+    """
+    Build the session store selected by the SESSION_STORE environment variable
+
+    SESSION_STORE is one of "sqlite" (default), "memory" or "redis"; the Redis
+    store connects to REDIS_URL.
+    """
+    backend = os.getenv('SESSION_STORE', 'sqlite').lower()
+    if backend == 'memory':
+        return MemorySessionStore()
+    if backend == 'redis':
+        import redis
+        return RedisSessionStore(redis.Redis.from_url(os.getenv('REDIS_URL', 'redis://localhost:6379/0')))
+    if backend == 'sqlite':
+        return SQLiteSessionStore()
+    raise ValueError(f"Unsupported session store: {backend}")
@@ -5,6 +5,7 @@ let currentQuestionIndex = 0;
 let currentBatchIndex = 0;
 let userAnswers = {};
 let quizScore = 0;
+let generationInProgress = false;
 let quizHistory = JSON.parse(localStorage.getItem('quizHistory') || '[]');
 let performanceStats = JSON.parse(localStorage.getItem('performanceStats') || '{}');
 
@@ -103,6 +104,7 @@ function processFile(file) {
     // Store file for later use
     window.uploadedFile = file;
     window.contentType = 'file';
+    currentSessionId = null;
     
     // Display file info
     displayFileInfo(file);
@@ -135,6 +137,7 @@ function removeFile() {
     fileInfo.style.display = 'none';
     window.uploadedFile = null;
     window.contentType = null;
+    currentSessionId = null;
     hideSection('settings-section');
     
     // Reset upload area to show it's clickable again
@@ -311,6 +314,8 @@ function nextBatch() {
         updateProgress();
         // Scroll to top of quiz container for better mobile experience
         scrollToQuizTop();
+    } else if (generationInProgress) {
+        showToast('More questions are on the way...', 'info');
     } else {
         showResults();
     }
@@ -526,6 +531,7 @@ function uploadNewFile() {
     window.uploadedFile = null;
     window.uploadedContent = null;
     window.contentType = null;
+    currentSessionId = null;
 }
 
 // Utility functions
@@ -827,48 +833,151 @@ async function generateMCQ() {
         formData.append('difficulty', difficulty);
         formData.append('time_limit', timeLimit);
         formData.append('question_types', JSON.stringify(questionTypes));
+        formData.append('stream', '1');
         
-        // Add content based on type
+        // Add content based on type; files are referenced by their upload session
         if (window.contentType === 'text') {
             formData.append('text_content', window.uploadedContent);
         } else {
-            formData.append('file', window.uploadedFile);
+            formData.append('session_id', await ensureUploadSession());
         }
         
-        const response = await fetch('/generate-mcq', {
+        const postGenerate = () => fetch('/generate-mcq', {
             method: 'POST',
+            headers: { 'Accept': 'application/x-ndjson' },
             body: formData
         });
         
-        const data = await response.json();
+        let response = await postGenerate();
+        if (response.status === 404 && window.contentType !== 'text') {
+            // Unknown or expired session: upload the file and retry once
+            formData.set('session_id', await ensureUploadSession(true));
+            response = await postGenerate();
+        }
         
-        if (data.success) {
-            currentQuestions = data.questions;
-            currentQuestionIndex = 0;
-            currentBatchIndex = 0;
-            userAnswers = {};
-            quizScore = 0;
-            
-            // Start timer if time limit is set
-            if (timeLimit > 0) {
-                startTimer(parseInt(timeLimit));
+        const contentType = response.headers.get('Content-Type') || '';
+        if (!contentType.includes('application/x-ndjson')) {
+            // Validation errors are still returned as a single JSON object
+            const data = await response.json();
+            showToast(data.error || 'Failed to generate questions', 'error');
+            showSection('settings-section');
+            hideSection('loading-section');
+            return;
+        }
+        
+        currentQuestions = [];
+        currentQuestionIndex = 0;
+        currentBatchIndex = 0;
+        userAnswers = {};
+        quizScore = 0;
+        generationInProgress = true;
+        
+        await readQuestionStream(response, function(question) {
+            currentQuestions.push(question);
+            if (currentQuestions.length === 1) {
+                // Start the quiz as soon as the first question arrives
+                hideSection('loading-section');
+                if (timeLimit > 0) {
+                    startTimer(parseInt(timeLimit));
+                }
+                startQuiz();
+            } else {
+                onQuestionStreamed(currentQuestions.length - 1);
             }
-            
-            showToast(`Generated ${data.total_questions} questions!`, 'success');
-            startQuiz();
+        });
+        
+        generationInProgress = false;
+        
+        if (currentQuestions.length > 0) {
+            updateBatchNavigation();
+            updateBatchCounter();
+            showToast(`Generated ${currentQuestions.length} questions!`, 'success');
         } else {
-            showToast(data.error || 'Failed to generate questions', 'error');
+            showToast('Failed to generate questions', 'error');
             showSection('settings-section');
         }
     } catch (error) {
+        generationInProgress = false;
         console.error('Generation error:', error);
-        showToast('Failed to generate questions. Please try again.', 'error');
-        showSection('settings-section');
+        showToast(error.message || 'Failed to generate questions. Please try again.', 'error');
+        if (currentQuestions.length === 0) {
+            showSection('settings-section');
+        }
     }
     
     hideSection('loading-section');
 }
 
+// Resolve the upload session for the selected file. Sessions are keyed by the
+// file's SHA-256, so the digest is tried first and the file is only uploaded
+// when the server doesn't already have its extracted text.
+async function ensureUploadSession(forceUpload = false) {
+    if (currentSessionId && !forceUpload) {
+        return currentSessionId;
+    }
+    
+    if (!forceUpload && window.crypto && window.crypto.subtle) {
+        const buffer = await window.uploadedFile.arrayBuffer();
+        const hash = await window.crypto.subtle.digest('SHA-256', buffer);
+        currentSessionId = Array.from(new Uint8Array(hash))
+            .map(b => b.toString(16).padStart(2, '0'))
+            .join('');
+        return currentSessionId;
+    }
+    
+    const uploadData = new FormData();
+    uploadData.append('file', window.uploadedFile);
+    const response = await fetch('/upload', {
+        method: 'POST',
+        body: uploadData
+    });
+    const data = await response.json();
+    if (!data.success) {
+        throw new Error(data.error || 'Failed to upload file');
+    }
+    currentSessionId = data.session_id;
+    return currentSessionId;
+}
+
+// Read an NDJSON question stream, calling onQuestion for every question line
+async function readQuestionStream(response, onQuestion) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    
+    const handleLine = (line) => {
+        if (!line.trim()) return;
+        const message = JSON.parse(line);
+        if (message.type === 'question') {
+            onQuestion(message.question);
+        } else if (message.type === 'error') {
+            throw new Error(message.error);
+        }
+    };
+    
+    while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        const lines = buffer.split('\n');
+        buffer = lines.pop();
+        lines.forEach(handleLine);
+    }
+    handleLine(buffer + decoder.decode());
+}
+
+// Keep the quiz view in sync while more questions stream in
+function onQuestionStreamed(index) {
+    const start = currentBatchIndex * QUESTIONS_PER_BATCH;
+    if (index >= start && index < start + QUESTIONS_PER_BATCH) {
+        renderBatch();
+    } else {
+        updateBatchNavigation();
+        updateBatchCounter();
+    }
+    updateProgress();
+}
+
 // Timer functionality
 let timerInterval = null;
 let timeRemaining = 0;
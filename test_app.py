@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Test the Flask endpoints through the test client, on the offline mock model
+"""
+
+import io
+import os
+import json
+import tempfile
+from llm_backend import MockBackend
+from gemini_mcq_generator import GeminiMCQGenerator
+
+# In-memory stores for the app's module-level components; only applied while
+# app is imported so other tests keep their own environment
+_TEST_ENV = {
+    'QUESTION_CACHE_PATH': ':memory:',
+    'QUESTION_BANK_PATH': ':memory:',
+    'SESSION_STORE': 'memory',
+    'JOB_STORE': 'memory',
+    'WARM_UP': 'off'
+}
+
+STUDY_TEXT = (
+    "The Bangladesh Civil Service was established in 1972. The preliminary examination "
+    "contains two hundred multiple choice questions. Successful candidates sit the written "
+    "examination. The Public Service Commission conducts the recruitment process. "
+    "Officers are assigned to different cadres after the viva voce. "
+)
+
+def _import_app():
+    saved = {key: os.environ.get(key) for key in _TEST_ENV}
+    os.environ.update(_TEST_ENV)
+    try:
+        import app as app_module
+    finally:
+        for key, value in saved.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+    app_module.mcq_generator._gemini_generator = GeminiMCQGenerator(backend=MockBackend())
+    app_module.app.config['UPLOAD_FOLDER'] = tempfile.mkdtemp()
+    return app_module
+
+app_module = _import_app()
+client = app_module.app.test_client()
+
+def _upload(content=STUDY_TEXT, filename='notes.txt'):
+    return client.post('/upload', data={'file': (io.BytesIO(content.encode('utf-8')), filename)},
+                       content_type='multipart/form-data')
+
+def test_concurrent_uploads_share_one_session():
+    """Two uploads of a document that both miss the session lookup keep one session and one file"""
+    print("🧪 Testing concurrent uploads of one document")
+    content = STUDY_TEXT + "Race one."
+    store = app_module.session_store
+    lookup = store.get
+    store.get = lambda session_id: None  # as if both requests checked before either stored
+    try:
+        first = _upload(content).get_json()
+        second = _upload(content).get_json()
+    finally:
+        store.get = lookup
+
+    assert first['success'] and second['success']
+    assert first['session_id'] == second['session_id']
+    session = store.get(first['session_id'])
+    assert os.path.exists(session['filepath'])
+    saved = [name for name in os.listdir(app_module.app.config['UPLOAD_FOLDER']) if name.endswith('_notes.txt')]
+    assert saved == [os.path.basename(session['filepath'])], saved
+    print("✅ The second upload's file was removed")
+
+def test_generate_from_upload_session():
+    """Generation reuses an upload's text by session_id or file_digest, and reports expired sessions"""
+    print("🧪 Testing upload sessions")
+    upload = _upload(STUDY_TEXT + "Session reuse.").get_json()
+    assert upload['session_id'] == upload['file_digest']
+
+    for field in ('session_id', 'file_digest'):
+        response = client.post('/generate-mcq', data={field: upload['session_id'], 'num_questions': 3})
+        assert response.status_code == 200, response.get_json()
+        assert response.get_json()['total_questions'] == 3
+
+    app_module.session_store.delete(upload['session_id'])
+    expired = client.post('/generate-mcq', data={'session_id': upload['session_id'], 'num_questions': 3})
+    assert expired.status_code == 404
+    assert expired.get_json()['session_expired'] is True
+    print("✅ Sessions reused and expiry reported")
+
+def test_reupload_skips_extraction():
+    """Uploading a document again is answered from its session without saving or extracting it"""
+    print("🧪 Testing re-upload short-circuit")
+    content = STUDY_TEXT + "Uploaded twice."
+    first = _upload(content).get_json()
+    folder = app_module.app.config['UPLOAD_FOLDER']
+    files_before = sorted(os.listdir(folder))
+
+    handler = app_module.file_handler
+    extract = handler.extract_text
+    calls = []
+    handler.extract_text = lambda filepath: calls.append(filepath) or extract(filepath)
+    try:
+        second = _upload(content, filename='renamed.txt').get_json()
+    finally:
+        handler.extract_text = extract
+
+    assert second['success'] and second['session_id'] == first['session_id']
+    assert second['text_preview'] == first['text_preview']
+    assert calls == [] and sorted(os.listdir(folder)) == files_before
+    print("✅ Re-upload reused the session")
+
+def _ndjson_lines(response):
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson', response.mimetype
+    body = response.get_data(as_text=True)
+    assert body.endswith('\n')
+    return [json.loads(line) for line in body.splitlines()]
+
+def _check_stream(lines, num_questions):
+    questions, done = lines[:-1], lines[-1]
+    assert questions and all(line['type'] == 'question' for line in questions), lines
+    assert [line['index'] for line in questions] == list(range(len(questions)))
+    assert len(questions) == num_questions
+    assert done == {'type': 'done', 'success': True, 'total_questions': len(questions)}
+
+def test_generate_mcq_streams_ndjson():
+    """stream=1 and an NDJSON Accept header both give one line per question and a done line"""
+    print("🧪 Testing NDJSON streaming")
+    flag = client.post('/generate-mcq', data={'text_content': STUDY_TEXT + "Stream flag.", 'num_questions': 4,
+                                              'stream': '1'})
+    _check_stream(_ndjson_lines(flag), 4)
+
+    accept = client.post('/generate-mcq', data={'text_content': STUDY_TEXT + "Accept header.", 'num_questions': 4},
+                         headers={'Accept': 'application/x-ndjson'})
+    _check_stream(_ndjson_lines(accept), 4)
+
+    upload = client.post('/generate-mcq', data={'file': (io.BytesIO(STUDY_TEXT.encode('utf-8')), 'notes.txt'),
+                                                'num_questions': 3, 'stream': '1'},
+                         content_type='multipart/form-data')
+    _check_stream(_ndjson_lines(upload), 3)
+
+    plain = client.post('/generate-mcq', data={'text_content': STUDY_TEXT + "Stream flag.", 'num_questions': 4})
+    assert plain.mimetype == 'application/json' and plain.get_json()['success']
+    print("✅ Streamed responses are NDJSON")
+
+if __name__ == "__main__":
+    test_concurrent_uploads_share_one_session()
+    test_generate_from_upload_session()
+    test_reupload_skips_extraction()
+    test_generate_mcq_streams_ndjson()
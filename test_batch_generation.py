@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Test batched multi-document generation without calling Gemini
+"""
+
+import re
+import json
+import hashlib
+import threading
+from gemini_mcq_generator import GeminiMCQGenerator
+from llm_backend import LLMBackend
+
+QUESTIONS = [
+    ("When was the civil service reorganised", "In 1972"),
+    ("Which body conducts the recruitment examination", "The Public Service Commission"),
+    ("How many stages does selection have", "Three stages"),
+    ("What does the preliminary test consist of", "Multiple choice questions"),
+    ("Who appoints officers to a cadre", "The government"),
+    ("Where is the training academy located", "Savar"),
+]
+
+class ScriptedBackend(LLMBackend):
+    """Model backend that records every prompt and answers with distinct questions"""
+    name = 'recording'
+    
+    def __init__(self):
+        self.prompts = []
+        self.lock = threading.Lock()
+    
+    def generate(self, prompt, schema=None):
+        with self.lock:
+            self.prompts.append(prompt)
+        count = int(re.search(r'Generate exactly (\d+)', prompt).group(1))
+        documents = re.findall(r'Document (\d+):\n(.*)', prompt)
+        
+        def questions(text):
+            label = hashlib.md5(text.encode('utf-8')).hexdigest()[:8]
+            picked = [QUESTIONS[(int(label, 16) + i) % len(QUESTIONS)] for i in range(count)]
+            return [{
+                "question": f"{question} ({label})?",
+                "options": [f"A) {answer}", "B) Two", "C) Three", "D) Four"],
+                "correct_answer": "A",
+                "explanation": f"From {text.split()[0]}."
+            } for question, answer in picked]
+        
+        if documents:
+            payload = {number: questions(text) for number, text in documents}
+        else:
+            payload = questions(re.search(r'Text: (.*)', prompt).group(1))
+        return json.dumps(payload)
+
+def _generator(backend=None):
+    generator = GeminiMCQGenerator(backend=backend or ScriptedBackend())
+    generator.chunk_size = 500
+    generator.batch_max_questions = 12
+    return generator
+
+def test_small_documents_share_requests():
+    """Small documents are grouped per language; large ones are generated on their own"""
+    print("🧪 Testing batch grouping")
+    texts = {f"chapter-{i}": f"chapter{i} " + "The civil service of Bangladesh. " * 5 for i in range(7)}
+    texts["bangla"] = "বাংলা " + "বিসিএস পরীক্ষা বাংলাদেশের সরকারি চাকরির পরীক্ষা। " * 3
+    texts["long"] = "long " + " ".join(f"Section {i} of the syllabus covers another subject." for i in range(30))
+    
+    backend = ScriptedBackend()
+    results = _generator(backend).generate_batch_with_source(texts, num_questions=3)
+    
+    assert list(results) == list(texts)
+    for key, (questions, source) in results.items():
+        # The long document goes through chunked generation and its merge
+        assert source == "gemini" and (len(questions) == 3 or key == "long" and questions), key
+    assert results["chapter-5"][0][0]["explanation"] == "From chapter5."
+    
+    # 7 English chapters at 4 per request -> 2 shared requests; Bangla and long alone
+    shared = [p for p in backend.prompts if 'Document 1:' in p]
+    print(f"   {len(backend.prompts)} model calls, {len(shared)} shared")
+    assert len(shared) == 2
+    assert not any('বাংলা' in p and 'chapter' in p for p in shared)
+    print("✅ Small documents share model requests")
+
+def test_missing_documents_are_retried():
+    """A document left out of the shared response is generated on its own"""
+    print("🧪 Testing batch retry")
+    generator = _generator()
+    group = [("a", "first text"), ("b", "second text")]
+    answered = generator._parse_group_response(json.dumps({"1": [{
+        "question": "Only one?", "options": ["A) x", "B) y", "C) z", "D) w"], "correct_answer": "A"
+    }]}), group, 3)
+    assert list(answered) == ["a"]
+    assert generator._parse_group_response("not json", group, 3) == {}
+    print("✅ Unanswered documents are left for retry")
+
+if __name__ == "__main__":
+    test_small_documents_share_requests()
+    test_missing_documents_are_retried()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Test how chunked generation plans model calls over a document and merges their results
+"""
+
+import os
+import re
+from gemini_mcq_generator import GeminiMCQGenerator
+from llm_backend import MockBackend
+
+# 40 sentences of about 60 characters; with a 130-character chunk size each chunk holds two
+DOCUMENT = " ".join(f"Section {i} describes one stage of the civil service recruitment." for i in range(40))
+
+def _generator(chunk_size=130, max_chunk_calls=8):
+    generator = GeminiMCQGenerator(backend=MockBackend())
+    generator.chunk_size = chunk_size
+    generator.max_chunk_calls = max_chunk_calls
+    return generator
+
+def _sections(chunk):
+    return [int(number) for number in re.findall(r'Section (\d+)', chunk)]
+
+def _question(text):
+    return {"question": text, "options": ["A) a", "B) b", "C) c", "D) d"], "correct_answer": "A", "explanation": ""}
+
+def test_chunks_cover_whole_document():
+    """Capped calls are spread from the start to the end of the document, in order"""
+    print("🧪 Testing chunk spread")
+    plan = _generator(max_chunk_calls=4)._plan_chunks(DOCUMENT, 20)
+    assert len(plan) == 4
+    firsts = [_sections(chunk)[0] for chunk, _ in plan]
+    assert firsts == sorted(firsts) and firsts[0] == 0
+    # 20 chunks, 4 calls: one from each quarter of the document
+    assert [first // 10 for first in firsts] == [0, 1, 2, 3], firsts
+    print(f"✅ Chunks start at sections {firsts}")
+
+def test_shares_add_up():
+    """Every planned chunk gets at least one question and the shares sum to the request"""
+    print("🧪 Testing question shares")
+    generator = _generator()
+    for num_questions in (1, 3, 8, 10, 25, 50):
+        shares = [share for _, share in generator._plan_chunks(DOCUMENT, num_questions)]
+        assert sum(shares) == num_questions, (num_questions, shares)
+        assert min(shares) >= 1
+        assert len(shares) == min(8, num_questions)
+    # A short document is a single chunk asked for everything
+    assert generator._plan_chunks("A short text about the examination.", 7) == [
+        ("A short text about the examination.", 7)]
+    print("✅ Shares add up")
+
+def test_max_chunk_calls_setting():
+    """GEMINI_MAX_CHUNK_CALLS caps the number of model calls per document"""
+    print("🧪 Testing GEMINI_MAX_CHUNK_CALLS")
+    saved = os.environ.get('GEMINI_MAX_CHUNK_CALLS')
+    os.environ['GEMINI_MAX_CHUNK_CALLS'] = '3'
+    try:
+        generator = GeminiMCQGenerator(backend=MockBackend())
+    finally:
+        if saved is None:
+            del os.environ['GEMINI_MAX_CHUNK_CALLS']
+        else:
+            os.environ['GEMINI_MAX_CHUNK_CALLS'] = saved
+    generator.chunk_size = 130
+    plan = generator._plan_chunks(DOCUMENT, 30)
+    assert len(plan) == 3 and sum(share for _, share in plan) == 30
+    print("✅ Model calls capped")
+
+def test_merge_round_robin_and_dedup():
+    """Merged questions alternate between chunks, skip near-duplicates and stop at the request"""
+    print("🧪 Testing question merging")
+    first = [_question("When was the civil service established?"), _question("Who conducts the examination?"),
+             _question("How many questions are in the preliminary test?")]
+    second = [_question("Which stage follows the written examination?"),
+              _question("When was the civil service established ?"),  # near-duplicate of first[0]
+              _question("Where are new officers trained?")]
+    third = [_question("What is a cadre?")]
+
+    merged = _generator()._merge_question_sets([first, second, third], 10)
+    assert [q["question"] for q in merged] == [
+        first[0]["question"], second[0]["question"], third[0]["question"],
+        first[1]["question"],
+        first[2]["question"], second[2]["question"]
+    ]
+    assert _generator()._merge_question_sets([first, second, third], 4) == merged[:4]
+    assert _generator()._merge_question_sets([], 5) == []
+    print("✅ Round-robin merge with de-duplication")
+
+def test_streaming_overestimate_keeps_count():
+    """A high chunk estimate still streams the requested number of questions"""
+    print("🧪 Testing streamed generation with a high chunk estimate")
+    chunks = [
+        "The commission publishes the circular in January. Applicants register online with their university "
+        "certificates. Admit cards arrive by post before the preliminary test. Candidates bring a black pen "
+        "to the hall. Invigilators collect mobile phones at the gate. Results appear on the official website.",
+        "The written examination lasts for several days. Psychology tests measure reasoning under pressure. "
+        "Interview boards question candidates about current affairs. Medical fitness is checked at a government "
+        "hospital. Police verification follows the final selection. Foundation training takes place in Savar."
+    ]
+    for expected_chunks in (None, 20):
+        results = list(_generator().iter_questions_from_chunks(iter(chunks), 10, expected_chunks=expected_chunks))
+        assert len(results) == 10, (expected_chunks, len(results))
+        assert {source for _, source in results} == {"gemini"}
+        assert len({question["question"] for question, _ in results}) == 10
+    print("✅ Unused shares went to the chunks that ran")
+
+if __name__ == "__main__":
+    test_chunks_cover_whole_document()
+    test_shares_add_up()
+    test_max_chunk_calls_setting()
+    test_merge_round_robin_and_dedup()
+    test_streaming_overestimate_keeps_count()
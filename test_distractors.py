@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Test the offline distractor engine used by the template fallback generators
+"""
+
+import random
+from document_index import DocumentIndex
+from distractors import (blank_out, date_question, number_distractors, number_question, shuffled_options,
+                         term_distractors, term_question, year_distractors)
+
+TEXT = (
+    "The Bangladesh Civil Service was established in 1972, following independence. "
+    "The Public Service Commission was reorganised in 1977 and in 1990. "
+    "The preliminary examination consists of 200 multiple choice questions and lasts 120 minutes. "
+    "The Public Service Commission conducts the Preliminary, Written and Viva examinations. "
+    "Dhaka hosts the Public Service Commission and the Secretariat."
+)
+
+def test_numeric_distractors():
+    """Years and numbers come from the document first, then from nearby values"""
+    print("🧪 Testing numeric distractors")
+    index = DocumentIndex(TEXT)
+    assert year_distractors("1972", index) == ["1977", "1990", "1973"]
+    assert year_distractors("2024", DocumentIndex("It happened in 2024.")) == ["2025", "2023", "2026"]
+    assert number_distractors("200", index) == ["120", "300", "100"]
+    assert number_distractors("1977", index)[0] == "1972"
+    assert number_distractors("15", DocumentIndex("Only 15 seats.")) == ["25", "5", "35"]
+    print("✅ Numeric distractors plausible")
+
+def test_bangla_digit_distractors():
+    """Distractors for a Bangla-digit answer are written in Bangla digits too"""
+    print("🧪 Testing Bangla-digit distractors")
+    index = DocumentIndex("বাংলাদেশ ১৯৭১ সালে স্বাধীন হয়. সংবিধান ১৯৭২ সালে গৃহীত হয়. আসন সংখ্যা ৩০০ টি.")
+    assert number_distractors("১৯৭২", index) == ["১৯৭১", "১৯৭৩", "১৯৭৪"]
+    assert number_distractors("৩০০", index) == ["৪০০", "২০০", "৫০০"]
+    # Years written in ASCII digits elsewhere in the document are converted
+    mixed = DocumentIndex("The constitution was adopted in 1972. সংবিধান ১৯৭৫ সালে সংশোধিত হয়.")
+    assert year_distractors("১৯৭৫", mixed)[0] == "১৯৭২"
+    assert year_distractors("1972", mixed)[0] == "1975"
+    print("✅ Distractors match the answer's digits")
+
+def test_term_distractors():
+    """Related terms are preferred; terms visible in the question are not used"""
+    print("🧪 Testing term distractors")
+    index = DocumentIndex(TEXT)
+    distractors = term_distractors("dhaka", index)
+    assert len(distractors) == 3 and "Dhaka" not in distractors
+    assert not {"Public", "Service", "Commission", "Secretariat"} & set(distractors)
+    assert term_distractors("missing", index) == []
+    print(f"✅ Term distractors: {distractors}")
+
+def test_questions_shuffle_answer():
+    """Fill-in-the-blank questions hide the answer and put it at a random letter"""
+    print("🧪 Testing generated questions")
+    index = DocumentIndex(TEXT)
+    letters = set()
+    rng = random.Random(7)
+    for _ in range(40):
+        question = number_question("200", index, rng)
+        assert "200" not in question["question"] and "_____" in question["question"]
+        correct = question["options"]["ABCD".index(question["correct_answer"])]
+        assert correct == f"{question['correct_answer']}) 200"
+        letters.add(question["correct_answer"])
+    assert letters == set("ABCD")
+
+    assert "_____" in date_question("1990", index)["question"]
+    assert term_question("dhaka", index)["question"].endswith('"_____ hosts the Public Service Commission and the Secretariat"')
+
+    options, letter = shuffled_options("x", ["a", "b", "c"], random.Random(1))
+    assert options[" ABCD".index(letter) - 1] == f"{letter}) x"
+    assert blank_out("Sylhet and sylhet", "Sylhet") == "_____ and _____"
+    assert blank_out("Sylheti", "Sylhet") is None
+    assert blank_out("সরকারি কর্মচারী সরকার নিয়োগ দেয়", "সরকার") == "সরকারি কর্মচারী _____ নিয়োগ দেয়"
+    long_statement = blank_out("word " * 100 + "target" + " word" * 100, "target")
+    assert long_statement.startswith("...") and long_statement.endswith("...") and len(long_statement) < 240
+    print("✅ Questions generated")
+
+if __name__ == "__main__":
+    test_numeric_distractors()
+    test_bangla_digit_distractors()
+    test_term_distractors()
+    test_questions_shuffle_answer()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Test the single-pass document index behind the template fallback generators
+"""
+
+from document_index import DocumentIndex, index_document
+from text_processor import TextProcessor
+from llm_backend import MockBackend
+from gemini_mcq_generator import GeminiMCQGenerator
+from question_strategies import strategies
+from question_schema import validate_question
+
+TEXT = (
+    "The Bangladesh Civil Service was established in 1972, following independence. "
+    "The examination is conducted in three stages: Preliminary, Written and Viva Voce. "
+    "The preliminary examination consists of 200 multiple choice questions. "
+    "A cadre refers to a branch of the civil service with its own duties. "
+    "In 2023 about 350000 candidates applied for 2163 posts."
+)
+
+def test_index_contents():
+    """Sentences, tokens, numbers and candidate sentences come out of one pass"""
+    print("🧪 Testing document index")
+    index = DocumentIndex("  " + TEXT)
+    assert len(index.sentences) == 5
+    assert index.sentence(0) == "The Bangladesh Civil Service was established in 1972, following independence"
+    assert index.sentence(4).startswith("In 2023")
+
+    assert index.dates == ["1972", "2023"]
+    assert index.numbers == ["1972", "200", "2023", "350000", "2163"]
+    assert index.token_sentences["examination"] == [1, 2]
+    assert index.first_sentence_with("Cadre") == index.sentence(3)
+    assert index.mentions("viva") and not index.mentions("taxation")
+    assert index.concepts(3) == ["civil", "service", "examination"]
+
+    assert index.sentence_texts(index.definitions) == [index.sentence(3)]
+    assert index.facts[:3] == [0, 1, 2]
+    assert index.long_sentences == [0, 1, 2, 3, 4]
+    print("✅ Index built")
+
+def test_bangla_years_indexed():
+    """Years written in Bangla digits count as dates"""
+    print("🧪 Testing Bangla-digit years")
+    index = DocumentIndex("বাংলাদেশ ১৯৭১ সালে স্বাধীন হয়. ২০২৩ সালে ৩৫০০০০ জন আবেদন করে. ১৮৫৭ সালের বিদ্রোহ.")
+    assert index.dates == ["১৯৭১", "২০২৩"]
+    assert index.numbers == ["১৯৭১", "২০২৩", "৩৫০০০০", "১৮৫৭"]
+    print("✅ Bangla years found")
+
+def test_bangla_words_kept_whole():
+    """Bangla vowel signs, virama and nukta stay part of tokens and surface forms"""
+    print("🧪 Testing Bangla surface forms")
+    index = DocumentIndex("১৯৭১ সালে স্বাধীনতা, অর্জিত হয়. স্বরাষ্ট্র মন্ত্রণালয়। পুলিশ পরিচালনা করে.")
+    assert index.surface_forms["স্বাধীনতা"] == "স্বাধীনতা"
+    assert index.surface_forms["মন্ত্রণালয়"] == "মন্ত্রণালয়"
+    assert index.surface_forms["স্বরাষ্ট্র"] == "স্বরাষ্ট্র"
+    assert index.mentions("পরিচালনা") and not index.mentions("পরিচালন")
+    print("✅ Bangla words intact")
+
+def test_index_cached_on_processed_text():
+    """Processed text is indexed once however many questions are drawn from it"""
+    print("🧪 Testing index caching")
+    processed = TextProcessor().process_text(TEXT)
+    index = index_document(processed)
+    assert index_document(processed) is index
+    assert index_document(str(processed)) is not index
+    print("✅ Index cached")
+
+def test_fallback_generators_use_index():
+    """The template fallback and the strategies behind it produce valid, distinct questions"""
+    print("🧪 Testing fallback generation")
+    processed = TextProcessor().process_text(TEXT * 3)
+    for generate in (GeminiMCQGenerator(backend=MockBackend())._generate_fallback_questions, strategies.generate):
+        questions = generate(processed, 6)
+        assert questions, generate.__qualname__
+        assert len({q["question"] + q["options"][0] for q in questions}) == len(questions)
+        for question in questions:
+            assert validate_question(question) == [], question
+    print("✅ Fallback questions generated")
+
+if __name__ == "__main__":
+    test_index_contents()
+    test_bangla_years_indexed()
+    test_bangla_words_kept_whole()
+    test_index_cached_on_processed_text()
+    test_fallback_generators_use_index()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Test the PDF text-quality heuristics used for engine selection
+"""
+
+import os
+import tempfile
+from file_handler import FileHandler, _text_defect_ratio, _needs_escalation
+
+def test_defect_ratio():
+    """Clean Bangla/English text passes; broken conjuncts and garbage glyphs don't"""
+    print("🧪 Testing PDF text defect heuristics")
+    
+    clean_bangla = "বাংলাদেশ সিভিল সার্ভিস (বিসিএস) বাংলাদেশের সর্বোচ্চ সরকারি চাকরির পরীক্ষা।"
+    # Visual-order extraction: vowel signs and hasanta land at the start of words
+    broken_bangla = "বাংলােদশ িসিভল সািভর্স ্র িবিসএস পরীক্ষা।"
+    english = "The BCS examination consists of three stages."
+    garbage = " �� text"
+    
+    cases = [
+        ("Clean Bangla", clean_bangla, False),
+        ("Broken Bangla", broken_bangla, True),
+        ("English", english, False),
+        ("Private-use glyphs", garbage, True),
+        ("Empty page", "  \n ", True)
+    ]
+    
+    for name, text, expected in cases:
+        ratio = _text_defect_ratio(text)
+        result = _needs_escalation(text, 0.02)
+        status = "✅" if result == expected else "❌"
+        print(f"{status} {name}: defect ratio {ratio:.3f}, escalate={result}")
+        assert result == expected, name
+
+def test_txt_stream_matches_extraction():
+    """A text file that stops being UTF-8 after the first block streams the same as it extracts"""
+    print("🧪 Testing mixed-encoding text streaming")
+    handler = FileHandler()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'notes.txt')
+        with open(path, 'wb') as file:
+            file.write("বিসিএস পরীক্ষা. ".encode('utf-8') * 8000)
+            file.write("Café résumé naïve.".encode('latin-1'))
+        streamed = ''.join(handler.iter_text(path))
+        assert streamed.strip() == handler.extract_text(path)
+        assert streamed.rstrip().endswith("Café résumé naïve.")
+
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write("বিসিএস পরীক্ষা. " * 8000)
+        assert ''.join(handler.iter_text(path)).strip() == handler.extract_text(path)
+    print("✅ Streaming picks the same encoding as extraction")
+
+def test_estimate_text_length():
+    """Text and DOCX estimates are in characters, close to what extraction produces"""
+    print("🧪 Testing text length estimates")
+    import docx
+    handler = FileHandler()
+    with tempfile.TemporaryDirectory() as tmp:
+        txt_path = os.path.join(tmp, 'notes.txt')
+        with open(txt_path, 'w', encoding='utf-8') as file:
+            file.write("বিসিএস পরীক্ষা. " * 8000)
+        docx_path = os.path.join(tmp, 'notes.docx')
+        document = docx.Document()
+        for _ in range(30):
+            document.add_paragraph("বিসিএস পরীক্ষা & the Public Service Commission. " * 5)
+        document.save(docx_path)
+
+        for path in (txt_path, docx_path):
+            estimate = handler.estimate_text_length(path)
+            actual = len(''.join(handler.iter_text(path)))
+            assert estimate is not None and abs(estimate - actual) <= actual * 0.05, (path, estimate, actual)
+            print(f"✅ {os.path.basename(path)}: estimated {estimate} characters, extracted {actual}")
+
+if __name__ == "__main__":
+    test_defect_ratio()
+    test_txt_stream_matches_extraction()
+    test_estimate_text_length()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Test the background generation job queue
+"""
+
+import os
+import sys
+import time
+import tempfile
+import subprocess
+from job_queue import JobQueue, InlineJobBackend, ThreadPoolJobBackend, MemoryJobStore, SQLiteJobStore
+
+def test_inline_backend():
+    """The inline stand-in runs jobs immediately and records results"""
+    print("🧪 Testing inline job backend")
+    queue = JobQueue(backend=InlineJobBackend(), store=MemoryJobStore())
+    
+    job_id = queue.enqueue(lambda n: {'total_questions': n}, 5)
+    job = queue.get(job_id)
+    assert job['status'] == JobQueue.DONE
+    assert job['result'] == {'total_questions': 5}
+    
+    def fail():
+        raise ValueError("Could not extract text from file")
+    
+    failed = queue.get(queue.enqueue(fail))
+    assert failed['status'] == JobQueue.FAILED
+    assert "Could not extract" in failed['error']
+    assert queue.get('missing') is None
+    print("✅ Inline backend records results and failures")
+
+def test_thread_pool_backend():
+    """Jobs on the worker pool move from queued/running to done"""
+    print("🧪 Testing thread pool job backend")
+    queue = JobQueue(backend=ThreadPoolJobBackend(max_workers=2), store=MemoryJobStore())
+    
+    job_ids = [queue.enqueue(time.sleep, 0.05) for _ in range(4)]
+    assert all(queue.get(job_id) is not None for job_id in job_ids)
+    
+    deadline = time.time() + 5
+    while time.time() < deadline and any(queue.get(j)['status'] != JobQueue.DONE for j in job_ids):
+        time.sleep(0.01)
+    
+    print(f"   Stats: {queue.stats()}")
+    assert queue.stats()[JobQueue.DONE] == 4
+    queue.backend.shutdown()
+    print("✅ Worker pool completes queued jobs")
+
+def test_finished_jobs_expire():
+    """Finished jobs are forgotten after the result TTL"""
+    print("🧪 Testing job result expiry")
+    queue = JobQueue(backend=InlineJobBackend(), result_ttl=0, store=MemoryJobStore())
+    job_id = queue.enqueue(lambda: None)
+    time.sleep(0.01)
+    queue.enqueue(lambda: None)  # enqueue prunes expired jobs
+    assert queue.get(job_id) is None
+    print("✅ Expired jobs are pruned")
+
+def test_jobs_shared_between_workers():
+    """A job run by one worker process can be polled from another"""
+    print("🧪 Testing jobs across two workers")
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = JobQueue(backend=InlineJobBackend(), store=SQLiteJobStore(os.path.join(tmp, 'jobs.db')))
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            status = 1
+            try:
+                os.close(read_fd)
+                queue.after_fork()
+                os.write(write_fd, queue.enqueue(lambda n: {'total_questions': n}, 7).encode())
+                status = 0
+            finally:
+                os._exit(status)
+        os.close(write_fd)
+        job_id = os.read(read_fd, 100).decode()
+        os.close(read_fd)
+        _, status = os.waitpid(pid, 0)
+        assert os.WEXITSTATUS(status) == 0
+
+        job = queue.get(job_id)
+        assert job['status'] == JobQueue.DONE and job['result'] == {'total_questions': 7}
+        assert queue.stats()[JobQueue.DONE] == 1
+    print("✅ Job status shared through SQLite")
+
+def test_jobs_of_stopped_workers_fail():
+    """A job left running by a worker that exited reports failure instead of hanging"""
+    print("🧪 Testing jobs of stopped workers")
+    queue = JobQueue(backend=InlineJobBackend(), store=SQLiteJobStore(':memory:'))
+    job_id = queue.enqueue(lambda: None)
+    child = subprocess.Popen([sys.executable, '-c', 'pass'])
+    child.wait()
+    queue.store.update(job_id, status=JobQueue.RUNNING, finished_at=None, owner_pid=child.pid)
+
+    job = queue.get(job_id)
+    assert job['status'] == JobQueue.FAILED and 'resubmit' in job['error']
+    assert queue.store.get(job_id)['status'] == JobQueue.FAILED
+    print("✅ Orphaned jobs fail")
+
+def test_memory_store_runs_one_gunicorn_worker():
+    """gunicorn.conf.py falls back to a single worker when job status is per process"""
+    print("🧪 Testing gunicorn worker fallback")
+    probe = "import runpy; print(runpy.run_path('gunicorn.conf.py')['workers'])"
+    def workers(job_store):
+        env = dict(os.environ, JOB_STORE=job_store, WEB_CONCURRENCY='4', GUNICORN_WORKER_CLASS='gthread')
+        result = subprocess.run([sys.executable, '-c', probe], capture_output=True, text=True, env=env,
+                                cwd=os.path.dirname(os.path.abspath(__file__)))
+        assert result.returncode == 0, result.stderr
+        return int(result.stdout.strip().splitlines()[-1])
+    assert workers('sqlite') == 4
+    assert workers('memory') == 1
+    print("✅ Memory job store forces one worker")
+
+if __name__ == "__main__":
+    test_inline_backend()
+    test_thread_pool_backend()
+    test_finished_jobs_expire()
+    test_jobs_shared_between_workers()
+    test_jobs_of_stopped_workers_fail()
+    test_memory_store_runs_one_gunicorn_worker()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Test incremental parsing of streamed model output
+"""
+
+import json
+import random
+import threading
+from json_stream import JSONObjectStream, iter_json_objects, parse_json_objects
+from llm_backend import LLMBackend
+from gemini_mcq_generator import GeminiMCQGenerator
+
+QUESTIONS = [
+    {
+        "question": "Which body conducts the {BCS} \"preliminary\" exam?",
+        "options": ["A) PSC", "B) UGC", "C) EC", "D) ACC"],
+        "correct_answer": "A",
+        "explanation": "The Public Service Commission [PSC] conducts it. Backslash: \\"
+    },
+    {
+        "question": "বাংলাদেশের রাজধানী কোনটি?",
+        "options": ["ক) ঢাকা", "খ) চট্টগ্রাম", "গ) খুলনা", "ঘ) রাজশাহী"],
+        "correct_answer": "A",
+        "explanation": "ঢাকা বাংলাদেশের রাজধানী।"
+    },
+    {
+        "question": "In which year did Bangladesh become independent?",
+        "options": ["A) 1947", "B) 1952", "C) 1971", "D) 1975"],
+        "correct_answer": "C",
+        "explanation": "Independence was won in 1971."
+    }
+]
+
+def random_pieces(text, rng):
+    """Split text at random points, as a streaming API would"""
+    pieces, start = [], 0
+    while start < len(text):
+        end = start + rng.randint(1, 12)
+        pieces.append(text[start:end])
+        start = end
+    return pieces
+
+def test_stream_matches_whole_parse():
+    """Any split of the response yields the same questions as parsing it whole"""
+    print("🧪 Testing incremental parsing")
+    response = "```json\n" + json.dumps(QUESTIONS, ensure_ascii=False, indent=2) + "\n```"
+    assert parse_json_objects(response) == QUESTIONS
+
+    rng = random.Random(3)
+    for _ in range(200):
+        assert list(iter_json_objects(random_pieces(response, rng))) == QUESTIONS
+    assert list(iter_json_objects(response)) == QUESTIONS  # one character at a time
+    print("✅ Incremental parsing matches")
+
+def test_tolerates_broken_responses():
+    """Prose, wrappers, trailing commas, garbage and truncation only lose the broken part"""
+    print("🧪 Testing malformed responses")
+    body = json.dumps(QUESTIONS, ensure_ascii=False)
+
+    assert parse_json_objects('Sure! Here are your "questions":\n' + body + '\nHope this helps {') == QUESTIONS
+    assert parse_json_objects(json.dumps({"questions": QUESTIONS})) == QUESTIONS
+    assert parse_json_objects(body[:-1].replace('"}', '",}')) == QUESTIONS
+
+    truncated = body[:body.index("In which year")]
+    assert parse_json_objects(truncated) == QUESTIONS[:2]
+
+    broken = body.replace('"correct_answer": "A", "explanation": "ঢাকা', '"correct_answer": A, "explanation": "ঢাকা')
+    assert parse_json_objects(broken) == [QUESTIONS[0], QUESTIONS[2]]
+    print("✅ Malformed responses handled")
+
+def test_memory_is_bounded():
+    """Completed questions are dropped from the buffer"""
+    print("🧪 Testing buffer trimming")
+    stream = JSONObjectStream()
+    stream.feed("[")
+    for _ in range(1000):
+        stream.feed(json.dumps(QUESTIONS[2]) + ",")
+    assert len(stream._buffer) < 10
+    print("✅ Buffer stays small")
+
+class SlowStreamingBackend(LLMBackend):
+    """Streams the questions piece by piece and waits after the first one"""
+
+    name = 'slow'
+
+    def __init__(self):
+        self.first_question_read = threading.Event()
+
+    def generate(self, prompt, schema=None):
+        return json.dumps(QUESTIONS)
+
+    def stream(self, prompt, schema=None):
+        body = json.dumps(QUESTIONS)
+        split = body.index('}, {') + 1
+        yield body[:split]
+        # Blocks until the generator's reader has already received question one
+        assert self.first_question_read.wait(5)
+        yield body[split:]
+
+def test_questions_emitted_before_stream_ends():
+    """The generator yields a question while the rest of the response is still streaming"""
+    print("🧪 Testing early emission")
+    backend = SlowStreamingBackend()
+    generator = GeminiMCQGenerator(backend=backend)
+    questions = []
+    for question, source in generator.iter_questions_with_source("The Public Service Commission conducts the BCS examination. " * 3, 3):
+        questions.append(question)
+        backend.first_question_read.set()
+    assert [q['question'] for q in questions] == [q['question'] for q in QUESTIONS]
+    print("✅ Questions emitted early")
+
+if __name__ == "__main__":
+    test_stream_matches_whole_parse()
+    test_tolerates_broken_responses()
+    test_memory_is_bounded()
+    test_questions_emitted_before_stream_ends()
@@ -3,22 +3,25 @@
 Test language detection for Bangla text
 """
 
+import random
+from text_processor import TextProcessor, ProcessedText, LANGUAGE_SAMPLE_WINDOWS, LANGUAGE_SAMPLE_WINDOW_SIZE
+
+# Improved language detection function from gemini_mcq_generator.py
+def is_bangla(text):
+    bangla_chars = sum(1 for c in text if '\u0980' <= c <= '\u09FF')
+    total_chars = len([c for c in text if c.isalpha() or '\u0980' <= c <= '\u09FF'])
+    
+    if total_chars == 0:
+        return False
+    
+    bangla_ratio = bangla_chars / total_chars
+    
+    # More sensitive detection: if more than 15% of alphabetic characters are Bangla
+    return bangla_ratio > 0.15 or bangla_chars > 5
+
 def test_language_detection():
     """Test the improved language detection logic"""
     
-    # Improved language detection function from gemini_mcq_generator.py
-    def is_bangla(text):
-        bangla_chars = sum(1 for c in text if '\u0980' <= c <= '\u09FF')
-        total_chars = len([c for c in text if c.isalpha() or '\u0980' <= c <= '\u09FF'])
-        
-        if total_chars == 0:
-            return False
-        
-        bangla_ratio = bangla_chars / total_chars
-        
-        # More sensitive detection: if more than 15% of alphabetic characters are Bangla
-        return bangla_ratio > 0.15 or bangla_chars > 5
-    
     # Test cases
     test_cases = [
         {
@@ -65,5 +68,46 @@ def test_language_detection():
             print(f"   Bangla ratio: {bangla_chars/total_alpha:.2f}")
         print()
 
+def test_detector_matches_reference():
+    """TextProcessor.detect_language agrees with the character-by-character reference"""
+    print("🧪 Testing precompiled language detector")
+    processor = TextProcessor()
+    rng = random.Random(11)
+    pieces = ["বিসিএস", "পরীক্ষা", "প্রশ্ন", "২০০টি", "BCS", "exam", "200", "(", ")", "।", ".", "Dhaka", "ঢাকা", "_x"]
+    for _ in range(3000):
+        text = ' '.join(rng.choice(pieces) for _ in range(rng.randint(0, 12)))
+        expected = "bn" if is_bangla(text) else "en"
+        assert processor.detect_language(text) == expected, text
+    print("✅ Detector matches the reference")
+
+def test_detection_is_sampled_and_cached():
+    """Long documents are sampled, processed text remembers its language, chunks get their own"""
+    print("🧪 Testing sampling, caching and per-chunk language")
+    processor = TextProcessor()
+    english = "The Bangladesh Civil Service examination has three stages. " * 40
+    bangla = "বাংলাদেশ সিভিল সার্ভিস বাংলাদেশের সর্বোচ্চ সরকারি চাকরির পরীক্ষা। " * 40
+    
+    document = processor.process_text((english + bangla) * 2000)
+    assert isinstance(document, ProcessedText) and document.language is None
+    samples = []
+    sample = processor._language_sample
+    processor._language_sample = lambda text: samples.append(sample(text)) or samples[-1]
+    assert processor.detect_language(document) == "bn"
+    assert processor.detect_language(document) == "bn"
+    assert document.language == "bn"
+    # Only the windows were scanned, and only once
+    assert len(samples) == 1
+    windows = LANGUAGE_SAMPLE_WINDOWS * LANGUAGE_SAMPLE_WINDOW_SIZE
+    assert len(samples[0]) == windows + LANGUAGE_SAMPLE_WINDOWS - 1 < len(document)
+    print(f"   {len(document) / 1e6:.1f}M characters judged on {len(samples[0])} sampled")
+    
+    # Mixed documents: each chunk is judged on its own text
+    chunks = processor.split_into_chunks(processor.process_text(english + bangla), 1500)
+    languages = [processor.detect_language(chunk) for chunk in chunks]
+    assert languages[0] == "en" and languages[-1] == "bn"
+    print("✅ Sampling, caching and per-chunk detection work")
+
 if __name__ == "__main__":
-    test_language_detection() 
\ No newline at end of file
+    test_language_detection()
+    test_detector_matches_reference()
+    test_detection_is_sampled_and_cached() 
\ No newline at end of file
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Test that the document engines and the Gemini SDK are only imported on first use
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+HEAVY_MODULES = ['fitz', 'pdfplumber', 'PyPDF2', 'docx', 'google.generativeai']
+
+def loaded_after(code):
+    """Heavy modules present in a fresh interpreter after running code"""
+    probe = code + f"\nimport sys, json\nprint(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+    env = dict(os.environ, GEMINI_API_KEY='test-key', LLM_BACKEND='gemini')
+    result = subprocess.run([sys.executable, '-c', probe], capture_output=True, text=True, env=env,
+                            cwd=os.path.dirname(os.path.abspath(__file__)))
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def test_imports_are_deferred():
+    """Building the generators and the file handler loads none of the heavy modules"""
+    print("🧪 Testing deferred imports")
+    assert loaded_after(
+        "from file_handler import FileHandler\n"
+        "from mcq_generator import MCQGenerator\n"
+        "FileHandler()\n"
+        "generator = MCQGenerator()\n"
+        "generator.gemini_generator\n"
+    ) == []
+    print("✅ Nothing heavy imported at start-up")
+
+def test_warm_up_loads_them():
+    """The warm-up hooks import the document engines and the model SDK"""
+    print("🧪 Testing warm-up")
+    loaded = loaded_after(
+        "from file_handler import FileHandler\n"
+        "from llm_backend import create_backend, backend_stats, warm_up_backend\n"
+        "FileHandler().warm_up()\n"
+        "backend = create_backend()\n"
+        "assert backend_stats(backend)['GeminiBackend']['structured_output'] == 'SDK not loaded yet'\n"
+        "warm_up_backend(backend)\n"
+    )
+    assert set(loaded) == set(HEAVY_MODULES), loaded
+    print("✅ Warm-up loads everything")
+
+if __name__ == "__main__":
+    test_imports_are_deferred()
+    test_warm_up_loads_them()
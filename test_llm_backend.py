@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Test generation end to end against the offline mock model backend
+"""
+
+import os
+import json
+import time
+import tempfile
+from llm_backend import BackendError, FaultInjectingBackend, MockBackend, RecordingBackend, ReplayBackend
+from gemini_mcq_generator import GeminiMCQGenerator
+
+TEXT = (
+    "The Bangladesh Civil Service was established in 1972. The preliminary examination "
+    "contains two hundred multiple choice questions. Successful candidates sit the written "
+    "examination. The Public Service Commission conducts the recruitment process. "
+    "Officers are assigned to different cadres after the viva voce."
+)
+
+SECOND_TEXT = (
+    "Dhaka is the capital and largest city of Bangladesh. The Padma is one of the major "
+    "rivers flowing through the country. Bangladesh became independent in 1971."
+)
+
+def test_mock_backend_answers_in_gemini_format():
+    """The mock returns a JSON array the generator's parser accepts"""
+    print("🧪 Testing mock backend responses")
+    generator = GeminiMCQGenerator(backend=MockBackend())
+    questions = generator._generate_chunk(TEXT, 3, "Generate questions in English.")
+    assert len(questions) == 3
+    for question in questions:
+        assert question['question'].startswith("Which word completes")
+        answer = question['options'][ord(question['correct_answer']) - ord('A')][3:]
+        assert answer in question['explanation']
+    print("✅ Mock backend responses parse")
+
+def test_full_generation_offline():
+    """Chunked and batched generation run offline and report the model as the source"""
+    print("🧪 Testing offline generation")
+    generator = GeminiMCQGenerator(backend=MockBackend())
+    generator.chunk_size = 150
+    
+    questions, source = generator.generate_questions_with_source(TEXT, 4)
+    assert source == "gemini" and len(questions) == 4
+    
+    generator.chunk_size = 1000
+    results = generator.generate_batch_with_source({"a": TEXT, "b": SECOND_TEXT}, 2)
+    assert all(source == "gemini" and len(qs) == 2 for qs, source in results.values())
+    assert results["b"][0][0]['explanation'].startswith('The text states: "Dhaka')
+    
+    bangla = json.loads(MockBackend().generate("Generate exactly 1 question.\nText: বিসিএস পরীক্ষা বাংলাদেশের সরকারি চাকরির প্রধান পরীক্ষা। প্রতিবছর হাজার শিক্ষার্থী অংশগ্রহণ করে।"))
+    assert len(bangla) == 1 and "_____" in bangla[0]['question']
+    print("✅ Offline generation works")
+
+def test_record_and_replay():
+    """Recorded exchanges are played back by prompt, unknown prompts rotate through them"""
+    print("🧪 Testing record and replay")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "recording.jsonl")
+        recorder = RecordingBackend(MockBackend(), path)
+        first = recorder.generate("Generate exactly 2 questions.\nText: " + TEXT)
+        second = recorder.generate("Generate exactly 1 questions.\nText: " + SECOND_TEXT)
+        
+        replay = ReplayBackend(path)
+        assert replay.generate("Generate exactly 1 questions.\nText: " + SECOND_TEXT) == second
+        assert replay.generate("Generate exactly 2 questions.\nText: " + TEXT) == first
+        assert [replay.generate("unseen prompt") for _ in range(3)] == [first, second, first]
+        
+        try:
+            ReplayBackend(path, strict=True).generate("unseen prompt")
+            assert False, "strict replay should reject unknown prompts"
+        except BackendError:
+            pass
+    print("✅ Record and replay work")
+
+def test_fault_injection():
+    """Injected latency delays every call and injected errors fail the expected share"""
+    print("🧪 Testing latency and error injection")
+    slow = FaultInjectingBackend(MockBackend(), latency_ms=20)
+    start = time.perf_counter()
+    slow.generate("Text: " + TEXT)
+    assert time.perf_counter() - start >= 0.02
+    
+    flaky = FaultInjectingBackend(MockBackend(), error_rate=0.3, seed=7)
+    failures = 0
+    for _ in range(1000):
+        try:
+            flaky.generate("Text: " + SECOND_TEXT)
+        except BackendError:
+            failures += 1
+    assert 250 < failures < 350
+    
+    # A failing backend sends the generator to its template fallback instead of erroring
+    generator = GeminiMCQGenerator(backend=FaultInjectingBackend(MockBackend(), error_rate=1.0))
+    questions, source = generator.generate_questions_with_source(TEXT, 2)
+    assert source == "fallback" and questions
+    print("✅ Fault injection works")
+
+if __name__ == "__main__":
+    test_mock_backend_answers_in_gemini_format()
+    test_full_generation_offline()
+    test_record_and_replay()
+    test_fault_injection()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Test page-parallel PDF extraction on the process pool
+"""
+
+import os
+import time
+import tempfile
+import fitz
+import file_handler
+from file_handler import FileHandler
+
+def fake_page_range(filepath, start, end, mode, threshold):
+    """Stands in for _extract_page_range in the pool workers; the first range finishes last"""
+    if start == 0:
+        time.sleep(0.2)
+    return [(number, f"page {number} from {os.getpid()}", 0.001 * (number + 1), 'fake')
+            for number in range(start, end)]
+
+def crash_page_range(filepath, start, end, mode, threshold):
+    """Kills its pool worker, as a crash in a PDF library would"""
+    os._exit(1)
+
+def refuse_page_range(filepath, start, end, mode, threshold):
+    raise AssertionError("small documents should not use the process pool")
+
+def _write_pdf(path, page_count):
+    with fitz.open() as doc:
+        for number in range(page_count):
+            doc.new_page().insert_text((72, 72), f"Page {number + 1} of the civil service guide.")
+        doc.save(path)
+
+def _with_range_extractor(extractor, run):
+    original = file_handler._extract_page_range
+    file_handler._extract_page_range = extractor
+    try:
+        return run()
+    finally:
+        file_handler._extract_page_range = original
+
+def test_large_pdf_uses_pool():
+    """Pages of a large PDF come back from worker processes, in page order, with timings"""
+    print("🧪 Testing process-pool PDF extraction")
+    handler = FileHandler(pdf_workers=2)
+    handler.parallel_min_pages = 8
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'guide.pdf')
+        _write_pdf(path, 12)
+        try:
+            pages = _with_range_extractor(fake_page_range, lambda: handler.extract_pdf_pages(path))
+        finally:
+            handler._get_pdf_pool().shutdown()
+
+    assert [page['page'] for page in pages] == list(range(12))
+    assert all(page['engine'] == 'fake' and page['seconds'] > 0 for page in pages)
+    worker_pids = {page['text'].rsplit(' ', 1)[1] for page in pages}
+    assert str(os.getpid()) not in worker_pids
+    print(f"✅ 12 pages in order from {len(worker_pids)} worker process(es)")
+
+def test_broken_pool_is_replaced():
+    """A pool whose worker died is dropped, the pages are read here and the next document gets a new pool"""
+    print("🧪 Testing recovery from a broken PDF pool")
+    handler = FileHandler(pdf_workers=2)
+    handler.parallel_min_pages = 8
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'guide.pdf')
+        _write_pdf(path, 12)
+        pages = _with_range_extractor(crash_page_range, lambda: handler.extract_pdf_pages(path))
+        assert [page['page'] for page in pages] == list(range(12))
+        assert "Page 12 of the civil service guide." in pages[11]['text']
+        assert handler._pdf_pool is None
+
+        try:
+            pages = _with_range_extractor(fake_page_range, lambda: handler.extract_pdf_pages(path))
+        finally:
+            handler._get_pdf_pool().shutdown()
+    assert all(page['engine'] == 'fake' for page in pages)
+    print("✅ Broken pool replaced")
+
+def test_small_pdf_stays_serial():
+    """Documents below PDF_PARALLEL_MIN_PAGES are read in this process"""
+    print("🧪 Testing serial PDF extraction")
+    handler = FileHandler(pdf_workers=2)
+    handler.parallel_min_pages = 8
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'notes.pdf')
+        _write_pdf(path, 3)
+        pages = _with_range_extractor(refuse_page_range, lambda: handler.extract_pdf_pages(path))
+
+    assert [page['page'] for page in pages] == [0, 1, 2]
+    assert all(page['engine'] == 'pymupdf' and page['seconds'] >= 0 for page in pages)
+    assert "Page 2 of the civil service guide." in pages[1]['text']
+    assert handler._pdf_pool is None
+    print("✅ Small PDF read serially")
+
+if __name__ == "__main__":
+    test_large_pdf_uses_pool()
+    test_broken_pool_is_replaced()
+    test_small_pdf_stays_serial()
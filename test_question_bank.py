@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Test the persistent question bank
+"""
+
+from question_bank import QuestionBank
+
+BANGLA_TEXT = (
+    "বিসিএস পরীক্ষা বাংলাদেশের সরকারি চাকরির প্রধান পরীক্ষা. বিসিএস পরীক্ষা তিন ধাপে হয়. "
+    "প্রিলিমিনারি পরীক্ষায় ২০০টি প্রশ্ন থাকে."
+)
+ENGLISH_TEXT = (
+    "The Bangladesh Civil Service was established in 1972. The preliminary examination "
+    "has 200 questions. The written examination follows the preliminary examination."
+)
+
+def _question(text, answer="A"):
+    return {
+        "question": text,
+        "options": ["A) One", "B) Two", "C) Three", "D) Four"],
+        "correct_answer": answer,
+        "explanation": "Stated in the text."
+    }
+
+def test_add_and_assemble_for_document():
+    """Questions are stored once per text and reassembled for the same document"""
+    print("🧪 Testing document quizzes")
+    bank = QuestionBank(db_path=':memory:')
+    questions = [
+        _question("When was the Bangladesh Civil Service established?"),
+        _question("How many questions does the preliminary examination have?"),
+        _question("Which examination follows the preliminary examination?")
+    ]
+    
+    assert bank.add_questions(ENGLISH_TEXT, questions, "medium") == 3
+    # Re-adding (even with different punctuation or case) stores nothing new
+    assert bank.add_questions(ENGLISH_TEXT, [_question("when was the Bangladesh civil service established")], "medium") == 0
+    
+    assert bank.questions_for_document(ENGLISH_TEXT, 4, "medium") is None
+    assert bank.questions_for_document(ENGLISH_TEXT, 2, "hard") is None
+    quiz = bank.questions_for_document(ENGLISH_TEXT, 3, "medium")
+    assert sorted(q['question'] for q in quiz) == sorted(q['question'] for q in questions)
+    print("✅ Document quizzes assembled from the bank")
+
+def test_rotation_language_and_topic():
+    """Least served questions come first; language and topic filters apply"""
+    print("🧪 Testing bank queries")
+    bank = QuestionBank(db_path=':memory:')
+    bank.add_questions(ENGLISH_TEXT, [
+        _question("When was the Bangladesh Civil Service established?"),
+        _question("Which examination follows the preliminary examination?")
+    ], "easy")
+    bank.add_questions(BANGLA_TEXT, [
+        _question("বিসিএস পরীক্ষা কয় ধাপে হয়?"),
+        _question("প্রিলিমিনারি পরীক্ষায় কয়টি প্রশ্ন থাকে?")
+    ], "easy")
+    
+    first = bank.find_questions(1, language="en")
+    second = bank.find_questions(1, language="en")
+    assert first[0]['question'] != second[0]['question']
+    
+    bangla = bank.find_questions(10, language="bn", difficulty="easy")
+    assert len(bangla) == 2
+    
+    assert [q['question'] for q in bank.find_questions(10, topic="প্রিলিমিনারি")] == ["প্রিলিমিনারি পরীক্ষায় কয়টি প্রশ্ন থাকে?"]
+    assert len(bank.find_questions(10, topic="examination", language="en")) == 1
+    assert bank.find_questions(10, topic="nonexistent") == []
+    
+    stats = bank.stats()
+    print(f"   Stats: {stats}")
+    assert stats['questions'] == 4 and stats['documents'] == 2
+    assert stats['by_language'] == {'bn': 2, 'en': 2}
+    print("✅ Rotation, language and topic queries work")
+
+if __name__ == "__main__":
+    test_add_and_assemble_for_document()
+    test_rotation_language_and_topic()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Test the persistent question-set cache
+"""
+
+import time
+from question_cache import QuestionCache
+
+SAMPLE_QUESTIONS = [
+    {
+        "question": "When was the BCS established?",
+        "options": ["A) 1972", "B) 1971", "C) 1973", "D) 1970"],
+        "correct_answer": "A",
+        "explanation": "BCS was established in 1972."
+    }
+]
+
+def test_cache_hit_and_key():
+    """Identical text and settings share a key; different settings do not"""
+    print("🧪 Testing cache keys and hits")
+    cache = QuestionCache(db_path=':memory:', max_entries=10, ttl_seconds=60)
+    
+    key = QuestionCache.make_key("বিসিএস পরীক্ষা.", 10, "medium")
+    assert key == QuestionCache.make_key("বিসিএস পরীক্ষা.", 10, "medium")
+    assert key != QuestionCache.make_key("বিসিএস পরীক্ষা.", 5, "medium")
+    assert key != QuestionCache.make_key("বিসিএস পরীক্ষা.", 10, "hard")
+    
+    assert cache.get(key) is None
+    cache.set(key, SAMPLE_QUESTIONS)
+    assert cache.get(key) == SAMPLE_QUESTIONS
+    
+    stats = cache.stats()
+    print(f"   Stats: {stats}")
+    assert stats['hits'] == 1 and stats['misses'] == 1
+    print("✅ Cache hit/miss behaves correctly")
+
+def test_lru_eviction():
+    """Least recently used entries are evicted once the cache is full"""
+    print("🧪 Testing LRU eviction")
+    cache = QuestionCache(db_path=':memory:', max_entries=2, ttl_seconds=60)
+    
+    cache.set("a", SAMPLE_QUESTIONS)
+    time.sleep(0.01)
+    cache.set("b", SAMPLE_QUESTIONS)
+    time.sleep(0.01)
+    cache.get("a")  # "b" is now least recently used
+    time.sleep(0.01)
+    cache.set("c", SAMPLE_QUESTIONS)
+    
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
+    assert cache.get("c") is not None
+    print("✅ LRU eviction keeps recently used entries")
+
+def test_ttl_expiry():
+    """Entries older than the TTL are treated as misses"""
+    print("🧪 Testing TTL expiry")
+    cache = QuestionCache(db_path=':memory:', max_entries=10, ttl_seconds=0)
+    cache.set("a", SAMPLE_QUESTIONS)
+    time.sleep(0.01)
+    assert cache.get("a") is None
+    print("✅ Expired entries are dropped")
+
+if __name__ == "__main__":
+    test_cache_hit_and_key()
+    test_lru_eviction()
+    test_ttl_expiry()
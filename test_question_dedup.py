@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Test MinHash/LSH near-duplicate question detection
+"""
+
+import time
+import random
+from question_dedup import NearDuplicateIndex, MinHashLSH, deduplicate_questions, normalize_text, shingle_set
+from question_bank import QuestionBank
+
+def _question(text, answer_text="1972"):
+    return {
+        "question": text,
+        "options": [f"A) {answer_text}", "B) 1971", "C) 1973", "D) 1970"],
+        "correct_answer": "A",
+        "explanation": "Stated in the text."
+    }
+
+def test_bangla_normalisation():
+    """Bangla vowel signs stay inside words; zero-width joiners and punctuation are ignored"""
+    print("🧪 Testing Bangla-aware normalisation")
+    assert normalize_text("বিসিএস পরীক্ষা কয় ধাপে হয়?") == "বিসিএস পরীক্ষা কয় ধাপে হয়"
+    assert normalize_text("র‌্যাব!!") == normalize_text("র্যাব")
+    assert shingle_set("When was BCS established?") == shingle_set("when was  BCS established")
+    print("✅ Normalisation keeps Bangla words whole")
+
+def test_near_duplicates_dropped():
+    """Paraphrased and repeated questions are dropped; different facts are kept"""
+    print("🧪 Testing near-duplicate detection")
+    questions = [
+        _question("When was the BCS established?"),
+        _question("In which year was the BCS established?"),
+        _question("when was the BCS established"),
+        _question("What is the capital of Bangladesh?", "Dhaka"),
+        _question("What is the currency of Bangladesh?", "Taka"),
+        _question("বিসিএস পরীক্ষা কয় ধাপে হয়?", "তিন"),
+        _question("বিসিএস পরীক্ষা কয় ধাপে হয়।", "তিন"),
+    ]
+    kept = [q['question'] for q in deduplicate_questions(questions)]
+    print(f"   Kept: {kept}")
+    assert kept == [
+        "When was the BCS established?",
+        "What is the capital of Bangladesh?",
+        "What is the currency of Bangladesh?",
+        "বিসিএস পরীক্ষা কয় ধাপে হয়?",
+    ]
+    print("✅ Near-duplicates dropped")
+
+def test_band_keys_are_stable():
+    """Signatures don't depend on the process, so band keys can be persisted"""
+    shingles = shingle_set("How many questions are in the BCS preliminary examination?")
+    assert MinHashLSH().band_keys(MinHashLSH().signature(shingles)) == \
+        MinHashLSH().band_keys(MinHashLSH().signature(set(shingles)))
+
+def test_scales_to_thousands():
+    """Thousands of distinct questions are indexed without pairwise comparison"""
+    print("🧪 Testing de-duplication throughput")
+    rng = random.Random(3)
+    words = [''.join(rng.choice('abcdefghijklmnop') for _ in range(rng.randint(3, 9))) for _ in range(3000)]
+    texts = ["What is " + ' '.join(rng.choice(words) for _ in range(8)) + "?" for _ in range(3000)]
+    
+    index = NearDuplicateIndex()
+    started = time.perf_counter()
+    kept = sum(index.add(text) for text in texts)
+    repeats = sum(index.add(text) for text in texts[:500])
+    elapsed = time.perf_counter() - started
+    print(f"   Indexed {len(texts)} questions in {elapsed:.2f}s")
+    assert kept == len(texts) and repeats == 0
+    print("✅ De-duplication scales")
+
+def test_bank_skips_near_duplicates():
+    """The question bank rejects paraphrases of questions it already holds"""
+    print("🧪 Testing question bank de-duplication")
+    bank = QuestionBank(db_path=':memory:')
+    text = "The Bangladesh Civil Service was established in 1972. Dhaka is the capital of Bangladesh."
+    assert bank.add_questions(text, [_question("When was the BCS established?")], "easy") == 1
+    assert bank.add_questions(text, [
+        _question("In which year was the BCS established?"),
+        _question("What is the capital of Bangladesh?", "Dhaka")
+    ], "hard") == 1
+    assert bank.count() == 2
+    print("✅ Bank keeps one copy of each question")
+
+if __name__ == "__main__":
+    test_bangla_normalisation()
+    test_near_duplicates_dropped()
+    test_band_keys_are_stable()
+    test_scales_to_thousands()
+    test_bank_skips_near_duplicates()
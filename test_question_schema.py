@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Test structured-output validation and parse-strategy metrics
+"""
+
+import json
+from question_schema import QUESTION_LIST_SCHEMA, api_schema, batch_schema, compile_schema, validate_question
+from metrics import parse_strategies
+from llm_backend import LLMBackend, MockBackend
+from gemini_mcq_generator import GeminiMCQGenerator
+
+VALID = {
+    "question": "In which year did Bangladesh become independent?",
+    "options": ["A) 1947", "B) 1952", "C) 1971", "D) 1975"],
+    "correct_answer": "C",
+    "explanation": "Independence was won in 1971."
+}
+
+TEXT = (
+    "The Bangladesh Civil Service was established in 1972. The preliminary examination "
+    "contains two hundred multiple choice questions. The Public Service Commission conducts "
+    "the recruitment process."
+)
+
+class FixedBackend(LLMBackend):
+    """Returns the same response to every prompt and remembers the schema it was asked for"""
+
+    name = 'fixed'
+
+    def __init__(self, response):
+        self.response = response
+        self.schemas = []
+
+    def generate(self, prompt, schema=None):
+        self.schemas.append(schema)
+        return self.response
+
+def test_validator():
+    """The compiled validator accepts schema-valid questions and names the problem otherwise"""
+    print("🧪 Testing compiled schema validator")
+    assert validate_question(VALID) == []
+    assert validate_question({**VALID, "correct_answer": "E"}) == [".correct_answer: not one of ['A', 'B', 'C', 'D']"]
+    assert validate_question({**VALID, "options": VALID["options"][:3]}) == [".options: expected 4-4 items"]
+    assert validate_question({k: v for k, v in VALID.items() if k != "explanation"}) == [".explanation: missing"]
+    assert validate_question({**VALID, "options": ["A) x", "B) y", 3, "D) z"]}) == [".options[2]: expected string"]
+    assert validate_question("not a question") == ["value: expected object"]
+
+    validate_list = compile_schema(QUESTION_LIST_SCHEMA)
+    assert validate_list([VALID, VALID]) == []
+    assert validate_list({"questions": [VALID]}) == ["value: expected array"]
+    assert compile_schema(batch_schema(2))({"1": [VALID]}) == [".2: missing"]
+
+    converted = api_schema(QUESTION_LIST_SCHEMA)
+    assert converted["type"] == "ARRAY" and converted["items"]["properties"]["options"] == {
+        "type": "ARRAY", "items": {"type": "STRING"}
+    }
+    print("✅ Validator works")
+
+def test_structured_mode_and_metrics():
+    """Structured mode requests the schema, drops invalid questions and counts each strategy"""
+    print("🧪 Testing structured generation metrics")
+    parse_strategies.reset()
+    invalid = {**VALID, "question": "Which body conducts the exam?", "correct_answer": "ক"}
+    backend = FixedBackend(json.dumps([VALID, invalid]))
+    generator = GeminiMCQGenerator(backend=backend)
+    generator.structured_output = True
+    assert generator._generate_chunk(TEXT, 2, "Generate questions in English.") == [VALID]
+    assert backend.schemas == [QUESTION_LIST_SCHEMA]
+
+    generator.structured_output = False
+    assert len(generator._generate_chunk(TEXT, 2, "Generate questions in English.")) == 2
+    assert backend.schemas[-1] is None
+
+    plain = FixedBackend("Q1. Which body conducts the exam?\nA) PSC\nB) UGC\nC) EC\nD) ACC\nAnswer: A\n"
+                         "Q2. Which year?\nA) 1947\nB) 1952\nC) 1971\nD) 1975\nCorrect answer: (C)\n"
+                         "Q3. Unanswered?\nA) a\nB) b\nC) c\nD) d\n")
+    questions = GeminiMCQGenerator(backend=plain)._generate_chunk(TEXT, 3, "")
+    assert [q["correct_answer"] for q in questions] == ["A", "C"]
+
+    GeminiMCQGenerator(backend=FixedBackend("I cannot help with that."))._generate_chunk(TEXT, 1, "")
+    GeminiMCQGenerator(backend=MockBackend()).generate_batch_with_source({"a": TEXT, "b": TEXT + " Dhaka is the capital."}, 1)
+
+    assert parse_strategies.snapshot() == {
+        "structured": 2, "schema_rejected": 1, "json": 1, "manual": 1, "failed": 1
+    }, parse_strategies.snapshot()
+    print("✅ Strategies counted")
+
+if __name__ == "__main__":
+    test_validator()
+    test_structured_mode_and_metrics()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Test the fallback question strategy registry and lazy Gemini generator construction
+"""
+
+import random
+from collections import Counter
+from question_strategies import StrategyRegistry, strategies
+from question_schema import validate_question
+from mcq_generator import MCQGenerator
+
+TEXT = (
+    "The Bangladesh Civil Service was established in 1972, following independence. "
+    "The examination is conducted in three stages: Preliminary, Written and Viva Voce. "
+    "The preliminary examination consists of 200 multiple choice questions. "
+    "A cadre refers to a branch of the civil service with its own duties. "
+    "In 2023 about 350000 candidates applied for 2163 posts. "
+)
+
+def numbered(name):
+    """A strategy that always produces a fresh question tagged with its name"""
+    counter = iter(range(10 ** 6))
+    def create(index, rng):
+        number = next(counter)
+        return {"question": f"{name} question {number} " + "x" * number, "options": ["A) a", "B) b", "C) c", "D) d"],
+                "correct_answer": "A", "explanation": ""}
+    return create
+
+def test_weights_and_disabling():
+    """Questions are shared out by weight, and weight 0 disables a strategy"""
+    print("🧪 Testing strategy weights")
+    registry = StrategyRegistry()
+    registry.register('heavy', weight=3)(numbered('heavy'))
+    registry.register('light')(numbered('light'))
+    registry.register('off')(numbered('off'))
+    registry.configure("off=0, missing=2")
+
+    questions = registry.generate(TEXT, 8)
+    counts = Counter(question["question"].split()[0] for question in questions)
+    assert counts == {'heavy': 6, 'light': 2}, counts
+
+    stats = registry.stats()
+    assert stats['heavy']['calls'] == 6 and stats['heavy']['questions'] == 6
+    assert stats['heavy']['avg_ms'] is not None and stats['off']['calls'] == 0
+    print("✅ Weights respected")
+
+def test_exhausted_strategies_sit_out():
+    """A strategy with nothing to offer stops being asked after a few misses"""
+    print("🧪 Testing exhausted strategies")
+    registry = StrategyRegistry()
+    registry.register('empty')(lambda index, rng: None)
+    registry.register('working')(numbered('working'))
+    assert len(registry.generate(TEXT, 10)) == 10
+    assert registry.stats()['empty']['calls'] == 3
+
+    registry = StrategyRegistry()
+    registry.register('empty')(lambda index, rng: None)
+    assert registry.generate(TEXT, 5) == []
+    print("✅ Exhausted strategies dropped")
+
+def test_default_strategies():
+    """The shared strategies produce valid, distinct questions with varied answer letters"""
+    print("🧪 Testing default strategies")
+    assert strategies.names == ['fact', 'concept', 'date', 'number', 'definition', 'comparison', 'process', 'generic']
+    questions = strategies.generate(TEXT * 2, 10, random.Random(5))
+    assert len(questions) == 10
+    for question in questions:
+        assert validate_question(question) == [], question
+    assert len({question["correct_answer"] for question in questions}) > 1
+    print("✅ Default strategies work")
+
+def test_gemini_generator_built_lazily():
+    """MCQGenerator only builds its Gemini generator when first needed"""
+    print("🧪 Testing lazy Gemini generator")
+    generator = MCQGenerator()
+    assert generator._gemini_generator is None
+    assert generator.create_quiz_session([])["total_questions"] == 0
+    assert generator._gemini_generator is None
+    assert generator.gemini_generator is generator.gemini_generator
+    print("✅ Gemini generator built on demand")
+
+if __name__ == "__main__":
+    test_weights_and_disabling()
+    test_exhausted_strategies_sit_out()
+    test_default_strategies()
+    test_gemini_generator_built_lazily()
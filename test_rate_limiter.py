@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Test the token bucket, the adaptive concurrency governor and the rate-limited backend
+"""
+
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from llm_backend import BackendError, LLMBackend
+from rate_limiter import ConcurrencyGovernor, RateLimitExceeded, RateLimitedBackend, TokenBucket
+
+class CountingBackend(LLMBackend):
+    """Sleeps per call, fails on request, and records the peak number of concurrent calls"""
+
+    name = 'counting'
+
+    def __init__(self, delay=0.02, fail=False):
+        self.delay = delay
+        self.fail = fail
+        self.active = 0
+        self.peak = 0
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def generate(self, prompt, schema=None):
+        with self._lock:
+            self.active += 1
+            self.calls += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            time.sleep(self.delay)
+            if self.fail:
+                raise BackendError("429 Resource has been exhausted")
+            return "[]"
+        finally:
+            with self._lock:
+                self.active -= 1
+
+def test_token_bucket_rate():
+    """A burst drains the bucket, then tokens arrive at the configured rate"""
+    print("🧪 Testing token bucket")
+    bucket = TokenBucket(rate=50, capacity=5)
+    start = time.perf_counter()
+    for _ in range(15):
+        assert bucket.acquire(timeout=1)
+    elapsed = time.perf_counter() - start
+    # 5 from the burst, 10 more at 50/s
+    assert 0.15 < elapsed < 0.5, elapsed
+
+    slow = TokenBucket(rate=1, capacity=1)
+    assert slow.acquire(timeout=0)
+    assert not slow.acquire(timeout=0.1)
+    print("✅ Token bucket enforces its rate")
+
+def test_governor_aimd():
+    """Successes grow the limit additively, a burst of failures halves it once"""
+    print("🧪 Testing AIMD governor")
+    governor = ConcurrencyGovernor(max_limit=8, initial_limit=2)
+    for _ in range(20):
+        assert governor.acquire(timeout=0)
+        governor.release(time.monotonic(), succeeded=True)
+    assert governor.limit == 6, governor.limit
+
+    started = time.monotonic()
+    for _ in range(3):
+        assert governor.acquire(timeout=0)
+    for _ in range(3):
+        governor.release(started, succeeded=False)
+    assert governor.limit == 3, governor.limit
+
+    slow = ConcurrencyGovernor(max_limit=8, initial_limit=4, latency_target=0.01)
+    assert slow.acquire(timeout=0)
+    slow.release(time.monotonic() - 1, succeeded=True)
+    assert slow.limit == 2
+    print("✅ Governor adapts its limit")
+
+def test_shared_limit_across_threads():
+    """Threads sharing one backend never exceed the governor's limit"""
+    print("🧪 Testing concurrency cap across threads")
+    inner = CountingBackend(delay=0.02)
+    backend = RateLimitedBackend(inner, governor=ConcurrencyGovernor(max_limit=3, initial_limit=3), max_wait=5)
+    with ThreadPoolExecutor(max_workers=12) as executor:
+        list(executor.map(backend.generate, ["prompt"] * 60))
+    assert inner.calls == 60 and inner.peak <= 3, inner.peak
+    print(f"✅ Peak concurrency {inner.peak}")
+
+def test_failures_shrink_and_max_wait():
+    """Quota errors cut concurrency; queued calls give up after max_wait"""
+    print("🧪 Testing backoff and max wait")
+    failing = RateLimitedBackend(CountingBackend(delay=0, fail=True),
+                                 governor=ConcurrencyGovernor(max_limit=8, initial_limit=8), max_wait=1)
+    for _ in range(4):
+        try:
+            failing.generate("prompt")
+        except BackendError:
+            pass
+    assert failing.stats()['limit'] == 1
+
+    limited = RateLimitedBackend(CountingBackend(delay=0), bucket=TokenBucket(rate=1, capacity=1), max_wait=0.05)
+    limited.generate("prompt")
+    start = time.perf_counter()
+    try:
+        limited.generate("prompt")
+        assert False, "second call should not get a token within max_wait"
+    except RateLimitExceeded:
+        pass
+    assert time.perf_counter() - start < 0.5
+    print("✅ Backoff and max wait work")
+
+def test_bucket_timeout_leaves_limit():
+    """Calls that never got a token don't count as successes for the governor"""
+    print("🧪 Testing bucket timeouts against the governor")
+    inner = CountingBackend(delay=0)
+    governor = ConcurrencyGovernor(max_limit=16, initial_limit=2)
+    backend = RateLimitedBackend(inner, bucket=TokenBucket(rate=0.01, capacity=1), governor=governor, max_wait=0.01)
+    backend.generate("prompt")
+    limit = governor.limit
+    for _ in range(20):
+        try:
+            backend.generate("prompt")
+            assert False, "the bucket is empty"
+        except RateLimitExceeded:
+            pass
+    assert inner.calls == 1
+    assert governor.limit == limit and governor.stats()['in_flight'] == 0
+    print("✅ Limit unchanged by calls that were never made")
+
+if __name__ == "__main__":
+    test_token_bucket_rate()
+    test_governor_aimd()
+    test_shared_limit_across_threads()
+    test_failures_shrink_and_max_wait()
+    test_bucket_timeout_leaves_limit()
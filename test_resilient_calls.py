@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Test per-call deadlines, retries and hedged model calls
+"""
+
+import time
+import threading
+from llm_backend import BackendError, LLMBackend
+from resilient_calls import DeadlineExceeded, ResilientBackend, is_transient
+
+class ScriptedBackend(LLMBackend):
+    """Plays a list of (delay, outcome) steps; an Exception outcome is raised"""
+
+    name = 'scripted'
+
+    def __init__(self, steps):
+        self.steps = list(steps)
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def generate(self, prompt, schema=None):
+        with self._lock:
+            delay, outcome = self.steps[min(self.calls, len(self.steps) - 1)]
+            self.calls += 1
+        time.sleep(delay)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+class InvalidArgument(Exception):
+    """Stands in for google.api_core's non-retryable InvalidArgument"""
+
+def test_deadline_bounds_latency():
+    """A hung call is abandoned at its deadline and retried"""
+    print("🧪 Testing per-call deadline")
+    backend = ResilientBackend(ScriptedBackend([(1.0, '[]')]), timeout=0.1, retries=1, backoff=0.01)
+    start = time.perf_counter()
+    try:
+        backend.generate("prompt")
+        assert False, "call should time out"
+    except DeadlineExceeded:
+        pass
+    assert time.perf_counter() - start < 0.5
+    assert backend.stats()['timeouts'] == 2 and backend.stats()['retries'] == 1
+    print("✅ Deadline enforced")
+
+def test_retries_transient_errors_only():
+    """Transient failures are retried with backoff, permanent ones raise at once"""
+    print("🧪 Testing retries")
+    flaky = ScriptedBackend([(0, BackendError("503 Service Unavailable")),
+                             (0, BackendError("503 Service Unavailable")), (0, '[{"ok": 1}]')])
+    backend = ResilientBackend(flaky, retries=2, backoff=0.01)
+    assert backend.generate("prompt") == '[{"ok": 1}]'
+    assert flaky.calls == 3
+
+    broken = ScriptedBackend([(0, InvalidArgument("API key not valid"))])
+    try:
+        ResilientBackend(broken, retries=3, backoff=0.01).generate("prompt")
+        assert False, "permanent errors should not be retried"
+    except InvalidArgument:
+        pass
+    assert broken.calls == 1
+
+    assert is_transient(RuntimeError("429 Resource has been exhausted"))
+    assert not is_transient(ValueError("Invalid JSON payload"))
+    print("✅ Retries work")
+
+def test_hedged_request_wins():
+    """A slow primary is raced by a hedge and the first valid answer is returned"""
+    print("🧪 Testing hedged requests")
+    inner = ScriptedBackend([(0.5, '["slow"]'), (0.01, '["fast"]')])
+    backend = ResilientBackend(inner, timeout=2, hedge=True, hedge_after=0.05)
+    start = time.perf_counter()
+    assert backend.generate("prompt") == '["fast"]'
+    assert time.perf_counter() - start < 0.3
+    assert backend.stats()['hedges'] == 1 and backend.stats()['hedge_wins'] == 1
+
+    # Without a fixed delay, hedging waits for latency history and then uses its p95
+    adaptive = ResilientBackend(ScriptedBackend([(0, '[]')]), hedge=True)
+    assert adaptive.hedge_delay() is None
+    for _ in range(20):
+        adaptive.generate("prompt")
+    assert adaptive.hedge_delay() is not None
+
+    # An answer that fails validation doesn't count
+    garbage = ScriptedBackend([(0, 'Sorry, I cannot help with that.'), (0, '[]')])
+    assert ResilientBackend(garbage, retries=1, backoff=0.01).generate("prompt") == '[]'
+    print("✅ Hedging works")
+
+def test_stream_not_started_after_deadline():
+    """A stream attempt that timed out while queued for a thread never calls the model"""
+    print("🧪 Testing queued stream attempts")
+    inner = ScriptedBackend([(0, '[]')])
+    backend = ResilientBackend(inner, timeout=0.05, retries=0, max_workers=1)
+    release = threading.Event()
+    busy = backend._executor.submit(release.wait)
+    try:
+        list(backend.stream("prompt"))
+        assert False, "the only worker thread is busy"
+    except DeadlineExceeded:
+        pass
+    release.set()
+    busy.result()
+    backend._executor.submit(lambda: None).result()  # the queued attempt has had its turn
+    assert inner.calls == 0
+    print("✅ Abandoned stream attempts skipped")
+
+def test_stream_hedged_until_first_piece():
+    """A stream with no first piece by the hedge delay is raced by a duplicate"""
+    print("🧪 Testing hedged streams")
+    inner = ScriptedBackend([(0.5, '["slow"]'), (0.01, '["fast"]')])
+    backend = ResilientBackend(inner, timeout=2, hedge=True, hedge_after=0.05)
+    start = time.perf_counter()
+    assert list(backend.stream("prompt")) == ['["fast"]']
+    assert time.perf_counter() - start < 0.3
+    assert backend.stats()['hedges'] == 1 and backend.stats()['hedge_wins'] == 1
+
+    # A duplicate that fails doesn't sink the stream still running
+    inner = ScriptedBackend([(0.2, '["slow"]'), (0, BackendError("503 Service Unavailable"))])
+    backend = ResilientBackend(inner, timeout=2, retries=0, hedge=True, hedge_after=0.05)
+    assert list(backend.stream("prompt")) == ['["slow"]']
+    assert backend.stats()['hedge_wins'] == 0
+    print("✅ Streams hedged before their first piece")
+
+if __name__ == "__main__":
+    test_deadline_bounds_latency()
+    test_retries_transient_errors_only()
+    test_hedged_request_wins()
+    test_stream_not_started_after_deadline()
+    test_stream_hedged_until_first_piece()
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Test the session stores and the expired-session sweeper
+"""
+
+import os
+import time
+import tempfile
+from session_store import MemorySessionStore, SQLiteSessionStore, RedisSessionStore, SessionSweeper
+
+class FakeRedis:
+    """Minimal in-memory stand-in for the redis-py commands the store uses"""
+    
+    def __init__(self):
+        self.values = {}
+        self.sorted_sets = {}
+    
+    def get(self, key):
+        value = self.values.get(key)
+        return value.encode('utf-8') if value is not None else None
+    
+    def set(self, key, value, ex=None, nx=False):
+        if nx and key in self.values:
+            return None
+        self.values[key] = value
+        return True
+    
+    def expire(self, key, seconds):
+        return key in self.values
+    
+    def delete(self, key):
+        return 1 if self.values.pop(key, None) is not None else 0
+    
+    def zadd(self, key, mapping):
+        self.sorted_sets.setdefault(key, {}).update(mapping)
+    
+    def zscore(self, key, member):
+        return self.sorted_sets.get(key, {}).get(member)
+    
+    def zrem(self, key, member):
+        return 1 if self.sorted_sets.get(key, {}).pop(member, None) is not None else 0
+    
+    def zrangebyscore(self, key, low, high):
+        members = self.sorted_sets.get(key, {})
+        return [m.encode('utf-8') for m, score in sorted(members.items(), key=lambda x: x[1]) if low <= score <= high]
+
+class RecordingFileHandler:
+    """Records cleanup_file calls instead of touching the filesystem"""
+    
+    def __init__(self):
+        self.cleaned = []
+    
+    def cleanup_file(self, filepath):
+        self.cleaned.append(filepath)
+        return True
+
+def _stores(ttl_seconds):
+    return {
+        'memory': MemorySessionStore(ttl_seconds=ttl_seconds, max_entries=10),
+        'sqlite': SQLiteSessionStore(db_path=':memory:', ttl_seconds=ttl_seconds),
+        'redis': RedisSessionStore(FakeRedis(), ttl_seconds=ttl_seconds)
+    }
+
+def test_round_trip():
+    """Every store returns what was stored and forgets deleted sessions"""
+    print("🧪 Testing session round trip")
+    data = {'text': 'বিসিএস পরীক্ষা.', 'filename': 'guide.pdf', 'filepath': 'uploads/x_guide.pdf'}
+    for name, store in _stores(ttl_seconds=60).items():
+        store.set('abc', data)
+        assert store.get('abc') == data, name
+        assert store.delete('abc') == data, name
+        assert store.get('abc') is None, name
+        print(f"✅ {name} store round trip")
+
+def test_add_keeps_existing_session():
+    """add() stores only the first of two uploads of a document, even past expiry"""
+    print("🧪 Testing insert-if-absent")
+    first = {'text': 'বিসিএস পরীক্ষা.', 'filepath': 'uploads/first.pdf'}
+    second = {'text': 'বিসিএস পরীক্ষা.', 'filepath': 'uploads/second.pdf'}
+    for name, store in _stores(ttl_seconds=60).items():
+        assert store.add('doc', first) is None, name
+        assert store.add('doc', second) == first, name
+        assert store.get('doc') == first, name
+        print(f"✅ {name} store keeps the first session")
+
+    for name, store in _stores(ttl_seconds=0).items():
+        store.add('doc', first)
+        time.sleep(0.01)
+        # Expired but not yet swept: the session (and its file) is taken over, not orphaned
+        assert store.add('doc', second) == first, name
+        file_handler = RecordingFileHandler()
+        SessionSweeper(store, file_handler, interval=3600).sweep()
+        assert file_handler.cleaned == ['uploads/first.pdf'], name
+
+def test_expiry_and_sweeper():
+    """Expired sessions are unreadable and the sweeper deletes their files"""
+    print("🧪 Testing session expiry and sweeping")
+    for name, store in _stores(ttl_seconds=0).items():
+        store.set('old', {'text': 'x', 'filepath': 'uploads/old.pdf'})
+        time.sleep(0.01)
+        assert store.get('old') is None, name
+        
+        file_handler = RecordingFileHandler()
+        sweeper = SessionSweeper(store, file_handler, interval=3600)
+        assert sweeper.sweep() == 1, name
+        assert file_handler.cleaned == ['uploads/old.pdf'], name
+        assert sweeper.sweep() == 0, name
+        print(f"✅ {name} store expiry and sweep")
+
+def test_memory_lru_eviction():
+    """The memory store evicts least recently used sessions and hands them to the sweeper"""
+    print("🧪 Testing memory store LRU eviction")
+    store = MemorySessionStore(ttl_seconds=60, max_entries=2)
+    store.set('a', {'filepath': 'a.pdf'})
+    store.set('b', {'filepath': 'b.pdf'})
+    store.get('a')
+    store.set('c', {'filepath': 'c.pdf'})
+    
+    assert store.get('b') is None
+    assert store.get('a') is not None
+    assert [d['filepath'] for d in store.pop_expired()] == ['b.pdf']
+    print("✅ Evicted sessions are cleaned up")
+
+def test_sqlite_shared_between_connections():
+    """Two store instances on the same file see each other's sessions"""
+    print("🧪 Testing SQLite store sharing")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'sessions.db')
+        first = SQLiteSessionStore(db_path=path, ttl_seconds=60)
+        second = SQLiteSessionStore(db_path=path, ttl_seconds=60)
+        first.set('shared', {'text': 'hello'})
+        assert second.get('shared') == {'text': 'hello'}
+    print("✅ SQLite sessions are visible across workers")
+
+def test_sqlite_after_fork():
+    """A forked worker gets its own connection and still sees the parent's sessions"""
+    print("🧪 Testing SQLite store after fork")
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SQLiteSessionStore(db_path=os.path.join(tmp, 'sessions.db'), ttl_seconds=60)
+        store.set('before', {'text': 'parent'})
+        inherited = store._conn
+        store.after_fork()
+        assert store._conn is inherited  # same process: nothing to do
+
+        pid = os.fork()
+        if pid == 0:
+            status = 1
+            try:
+                store.after_fork()
+                if store._conn is not inherited and store.get('before') == {'text': 'parent'}:
+                    store.set('after', {'text': 'child'})
+                    status = 0
+            finally:
+                os._exit(status)
+        _, status = os.waitpid(pid, 0)
+        assert os.WEXITSTATUS(status) == 0
+        assert store.get('after') == {'text': 'child'}
+    print("✅ Forked workers reconnect")
+
+if __name__ == "__main__":
+    test_round_trip()
+    test_add_keeps_existing_session()
+    test_expiry_and_sweeper()
+    test_memory_lru_eviction()
+    test_sqlite_shared_between_connections()
+    test_sqlite_after_fork()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Test that the text cleaning pipelines (whole-document, streamed and the
+original multi-pass reference) agree
+"""
+
+import random
+from text_processor import TextProcessor
+from bench_text_processor import process_text_multipass
+
+SAMPLE_PAGES = [
+    "১. বাংলাদেশ সিভিল সার্ভিস (বিসিএস) বাংলাদেশের সর্বোচ্চ সরকারি চাকরির পরীক্ষা।\n",
+    "- The BCS examination consists of three stages!! Preliminary, Written and Viva Voce...\n",
+    "2. The preliminary examination has 200 MCQs; candidates   who pass sit the written exam.\n",
+    "প্রতিবছর হাজার হাজার শিক্ষার্থী এই পরীক্ষায় অংশগ্রহণ করে © ২০২৩\n"
+]
+
+def _random_pieces(rng, alphabet):
+    text = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 300)))
+    cuts = sorted(rng.sample(range(len(text) + 1), min(len(text) + 1, rng.randint(0, 6))))
+    return text, [text[a:b] for a, b in zip([0] + cuts, cuts + [len(text)])]
+
+def test_iter_process_matches_process_text():
+    """Joined iter_process output equals process_text on the joined input"""
+    print("🧪 Testing streamed text processing")
+    processor = TextProcessor()
+    
+    streamed = ''.join(processor.iter_process(SAMPLE_PAGES, block_size=40))
+    assert streamed == processor.process_text(''.join(SAMPLE_PAGES))
+    
+    rng = random.Random(7)
+    alphabet = list("ab XY 12 . , ; ! ? - * ( ) \n\t ©€ বাংলা িসিভ ্র ০১২ । ॥ ") + ['‌']
+    for _ in range(500):
+        text, pieces = _random_pieces(rng, alphabet)
+        streamed = ''.join(processor.iter_process(pieces, block_size=rng.randint(1, 40)))
+        assert streamed == processor.process_text(text), repr(text)
+    print("✅ iter_process matches process_text")
+
+def test_process_text_matches_multipass():
+    """Precompiled cleaning passes give byte-identical output to the original pipeline"""
+    print("🧪 Testing precompiled normaliser")
+    processor = TextProcessor()
+    
+    sample = ''.join(SAMPLE_PAGES)
+    assert processor.process_text(sample) == process_text_multipass(sample)
+    
+    rng = random.Random(11)
+    alphabet = list(" \t\n\r\x0b.,;:!?-*()0123456789abAB_অআকখা্ািৃ।॥©—…–#@") + ['‌']
+    for _ in range(5000):
+        text = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 60)))
+        assert processor.process_text(text) == process_text_multipass(text), repr(text)
+    print("✅ process_text matches the multi-pass pipeline")
+
+def test_iter_chunks_matches_split_into_chunks():
+    """Incremental chunking gives the same chunks as split_into_chunks"""
+    print("🧪 Testing incremental chunking")
+    processor = TextProcessor()
+    processed = processor.process_text(''.join(SAMPLE_PAGES))
+    
+    for chunk_size in (20, 100, 1000):
+        segments = processor.iter_process(SAMPLE_PAGES, block_size=40)
+        streamed = list(processor.iter_chunks(segments, chunk_size))
+        assert streamed == processor.split_into_chunks(processed, chunk_size), chunk_size
+        print(f"✅ chunk_size={chunk_size}: {len(streamed)} chunks")
+
+if __name__ == "__main__":
+    test_iter_process_matches_process_text()
+    test_process_text_matches_multipass()
+    test_iter_chunks_matches_split_into_chunks()
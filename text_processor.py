@@ -1,20 +1,53 @@
 import re
 import string
-from typing import List
+from typing import List, Iterable, Iterator
+
+# A whitespace run with a letter on both sides: no cleaning pattern can match
+# across it, so the text can be cut there and the halves cleaned separately.
+# Bangla digits are excluded because \d matches them.
+_SAFE_LETTER = r'(?:[^\W\d_]|[\u0980-\u09E5\u09F0-\u09FF])'
+_SAFE_SPLIT = re.compile(rf'(?<={_SAFE_LETTER})\s+(?={_SAFE_LETTER})')
+_SENTENCE_SPLIT = re.compile(r'[.!?।॥]')
+
+# Precompiled cleaning passes used by process_text. They reproduce the original
+# sequence of re.sub calls without the redundant whitespace and per-line passes.
+_LIST_MARKER = re.compile(r'\b\d+\s*\.\s*')
+_LEADING_BULLET = re.compile(r'^\s*[-*]\s*')
+# Only whitespace that actually changes: runs and anything other than a plain space
+_WHITESPACE = re.compile(r'\s{2,}|[^\S ]')
+_NOISE_CHAR = re.compile(r'[^\w\s\.\,\;\:\!\?\-\(\)\u0980-\u09FF\u2000-\u206F]')
+# "!" and "?" end sentences like "." and ";" separates like ","; runs of either
+# collapse to one mark followed by a single space
+_PUNCTUATION = re.compile(r'\s*(?:[.!?]+|([,;])[,;]*)\s*')
+
+def _punctuation_replacement(match) -> str:
+    return ', ' if match.group(1) else '. '
+
+# Language detection counts characters by deleting everything else in C:
+# what survives _NOT_BANGLA is Bangla, what survives _NOT_LETTER is letters
+# (any script) plus the whole Bangla block, marks and digits included
+_NOT_BANGLA = re.compile(r'[^\u0980-\u09FF]+')
+_NOT_LETTER = re.compile(r'[^\w\u0980-\u09FF]+|[0-9_]+')
+LANGUAGE_SAMPLE_WINDOWS = 8
+LANGUAGE_SAMPLE_WINDOW_SIZE = 512
+
+class ProcessedText(str):
+    """
+    Cleaned text as returned by TextProcessor.process_text
+
+    Behaves exactly like str; detect_language() caches its answer on the
+    object, so the pipeline stages that need the language (prompting,
+    batching, the question bank) detect it once per document. The fallback
+    generators' DocumentIndex is cached the same way (see index_document).
+    """
+
+    language = None
+    document_index = None
 
 class TextProcessor:
     """Processes and cleans extracted text for MCQ generation"""
     
     def __init__(self):
-        # Updated patterns to preserve Bangla characters
-        self.noise_patterns = [
-            r'\b\d+\s*\.\s*',  # Remove numbered lists
-            r'^\s*[-*]\s*',    # Remove bullet points
-            r'\s+',            # Multiple spaces
-            # More conservative pattern that preserves Bangla and other Unicode characters
-            r'[^\w\s\.\,\;\:\!\?\-\(\)\u0980-\u09FF\u2000-\u206F]',  # Preserve Bangla Unicode range
-        ]
-        
         # Updated sentence endings to include Bangla punctuation
         self.sentence_endings = ['.', '!', '?', '।', '॥']  # Including Bengali punctuation
     
@@ -31,65 +64,88 @@ class TextProcessor:
         if not text:
             return ""
         
-        # Convert to string if not already
-        text = str(text)
-        
-        # Remove extra whitespace and normalize
-        text = self._normalize_whitespace(text)
-        
-        # Remove noise patterns (more carefully for Bangla)
-        text = self._remove_noise(text)
-        
-        # Clean up punctuation
-        text = self._clean_punctuation(text)
-        
-        # Remove empty lines and normalize paragraphs
-        text = self._normalize_paragraphs(text)
+        # Remove list markers, bullets, extra whitespace and noise; clean up punctuation
+        text = self._clean_block(str(text), at_start=True).strip()
         
         # Ensure proper sentence endings
-        text = self._ensure_sentence_endings(text)
-        
-        return text.strip()
+        return ProcessedText(self._ensure_sentence_endings(text))
     
-    def _normalize_whitespace(self, text: str) -> str:
-        """Normalize whitespace characters"""
-        # Replace multiple spaces with single space
-        text = re.sub(r'\s+', ' ', text)
+    def iter_process(self, pieces: Iterable[str], block_size: int = 64 * 1024) -> Iterator[str]:
+        """
+        Clean a stream of raw text pieces without holding the whole document
         
-        # Remove leading/trailing whitespace from each line
-        lines = text.split('\n')
-        lines = [line.strip() for line in lines]
+        Pieces are concatenated as given (FileHandler.iter_text output) and cut
+        at whitespace between two letters, which no cleaning pattern can span.
+        The yielded segments join to exactly what process_text returns for the
+        concatenated input.
         
-        return '\n'.join(lines)
-    
-    def _remove_noise(self, text: str) -> str:
-        """Remove noise patterns from text while preserving Bangla"""
-        for pattern in self.noise_patterns:
-            text = re.sub(pattern, ' ', text)
-        
-        return text
-    
-    def _clean_punctuation(self, text: str) -> str:
-        """Clean up punctuation marks"""
-        # Remove multiple punctuation marks
-        text = re.sub(r'[\.\!\?]+', '.', text)
-        text = re.sub(r'[\,\;]+', ',', text)
+        Args:
+            pieces: Raw extracted text, piece by piece
+            block_size: Approximate amount of raw text cleaned at a time
+            
+        Yields:
+            Consecutive segments of the cleaned text
+        """
+        buffer = ""
+        at_start = True
+        last_char = ""
         
-        # Ensure proper spacing around punctuation
-        text = re.sub(r'\s*([\.\!\?\,\;])\s*', r'\1 ', text)
+        for piece in pieces:
+            buffer += str(piece)
+            if len(buffer) < block_size:
+                continue
+            
+            split_at = self._find_safe_split(buffer)
+            if split_at is None:
+                continue
+            head, buffer = buffer[:split_at], buffer[split_at:]
+            
+            segment = self._clean_block(head, at_start)
+            if at_start:
+                segment = segment.lstrip()
+                at_start = not segment
+            if segment:
+                last_char = segment[-1]
+                yield segment
         
-        return text
+        # Final block: strip the tail and apply the sentence ending like process_text
+        segment = self._clean_block(buffer, at_start).rstrip()
+        if at_start:
+            segment = segment.lstrip()
+        if segment:
+            last_char = segment[-1]
+        if last_char and last_char not in self.sentence_endings:
+            segment += '.'
+        if segment:
+            yield segment
     
-    def _normalize_paragraphs(self, text: str) -> str:
-        """Normalize paragraph structure"""
-        # Split into paragraphs
-        paragraphs = text.split('\n')
-        
-        # Remove empty paragraphs
-        paragraphs = [p.strip() for p in paragraphs if p.strip()]
+    def _find_safe_split(self, buffer: str) -> int:
+        """Position of the last whitespace run between two letters, or None"""
+        # Look near the end first so blocks stay close to block_size
+        for window_start in (max(0, len(buffer) - 4096), 0):
+            last = None
+            for last in _SAFE_SPLIT.finditer(buffer, window_start):
+                pass
+            if last is not None:
+                return last.start()
+        return None
+    
+    def _clean_block(self, text: str, at_start: bool) -> str:
+        """
+        Apply the cleaning steps of process_text to one block, without the final strip
         
-        # Join paragraphs with proper spacing
-        return ' '.join(paragraphs)
+        Args:
+            text: Raw text
+            at_start: Whether the block starts the document (leading bullets are removed)
+        """
+        if at_start:
+            text = text.lstrip()
+        text = _LIST_MARKER.sub(' ', text)
+        if at_start:
+            text = _LEADING_BULLET.sub(' ', text, count=1)
+        text = _WHITESPACE.sub(' ', text)
+        text = _NOISE_CHAR.sub(' ', text)
+        return _PUNCTUATION.sub(_punctuation_replacement, text)
     
     def _ensure_sentence_endings(self, text: str) -> str:
         """Ensure text ends with proper sentence ending"""
@@ -98,6 +154,42 @@ class TextProcessor:
         
         return text
     
+    def detect_language(self, text: str) -> str:
+        """
+        Detect whether text is mainly Bangla or English
+        
+        Long texts are judged on LANGUAGE_SAMPLE_WINDOWS evenly spaced windows
+        rather than every character. The result is cached on ProcessedText.
+        
+        Returns:
+            "bn" if more than 15% of alphabetic characters (or more than 5
+            characters in all) are Bangla, otherwise "en"
+        """
+        if isinstance(text, ProcessedText) and text.language is not None:
+            return text.language
+        
+        sample = self._language_sample(text)
+        bangla_chars = len(_NOT_BANGLA.sub('', sample))
+        total_chars = len(_NOT_LETTER.sub('', sample))
+        
+        if total_chars == 0:
+            language = "en"
+        else:
+            language = "bn" if bangla_chars / total_chars > 0.15 or bangla_chars > 5 else "en"
+        
+        if isinstance(text, ProcessedText):
+            text.language = language
+        return language
+    
+    @staticmethod
+    def _language_sample(text: str) -> str:
+        """The whole text if short, otherwise evenly spaced windows of it"""
+        windows, size = LANGUAGE_SAMPLE_WINDOWS, LANGUAGE_SAMPLE_WINDOW_SIZE
+        if len(text) <= windows * size:
+            return text
+        step = (len(text) - size) // (windows - 1)
+        return ' '.join(text[i * step:i * step + size] for i in range(windows))
+    
     def extract_key_concepts(self, text: str, max_concepts: int = 20) -> List[str]:
         """
         Extract key concepts from text for MCQ generation
@@ -159,4 +251,48 @@ class TextProcessor:
         if current_chunk:
             chunks.append(current_chunk.strip())
         
-        return chunks 
\ No newline at end of file
+        return chunks
+    
+    def iter_chunks(self, segments: Iterable[str], chunk_size: int = 1000) -> Iterator[str]:
+        """
+        Incremental version of split_into_chunks for streamed text
+        
+        Only the trailing partial sentence is held between segments, so each
+        chunk is yielded as soon as the text after it starts arriving.
+        
+        Args:
+            segments: Processed text, segment by segment (see iter_process)
+            chunk_size: Maximum size of each chunk
+            
+        Yields:
+            Text chunks identical to split_into_chunks on the joined text
+        """
+        pending = ""
+        current_chunk = ""
+        
+        def add_sentence(sentence):
+            nonlocal current_chunk
+            sentence = sentence.strip()
+            if not sentence:
+                return None
+            if len(current_chunk) + len(sentence) < chunk_size:
+                current_chunk += sentence + ". "
+                return None
+            finished = current_chunk.strip() if current_chunk else None
+            current_chunk = sentence + ". "
+            return finished
+        
+        for segment in segments:
+            sentences = _SENTENCE_SPLIT.split(pending + segment)
+            # The last piece may continue in the next segment
+            pending = sentences.pop()
+            for sentence in sentences:
+                chunk = add_sentence(sentence)
+                if chunk:
+                    yield chunk
+        
+        chunk = add_sentence(pending)
+        if chunk:
+            yield chunk
+        if current_chunk:
+            yield current_chunk.strip()